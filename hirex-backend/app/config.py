@@ -5,22 +5,80 @@ import os
 from pathlib import Path
 from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import field_validator
+from pydantic import field_validator, model_validator
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR_DEFAULT = ROOT / "data"
-RESUME_DIR_DEFAULT = DATA_DIR_DEFAULT / "resumes"
+
+# Locations under DATA_DIR; each follows the configured DATA_DIR unless set itself
+DATA_PATHS = {
+    "RESUME_DIR": "resumes",
+    "FAISS_INDEX_PATH": "faiss_index.bin",
+    "FAISS_META_PATH": "faiss_meta.jsonl",
+    "FAISS_SHARD_DIR": "faiss_shards",
+    "PROFILE_DIR": "profiles",
+}
 
 class Settings(BaseSettings):
     # ---- Core paths / storage ----
     DATA_DIR: str = DATA_DIR_DEFAULT.as_posix()
-    RESUME_DIR: str = RESUME_DIR_DEFAULT.as_posix()
+    RESUME_DIR: str = ""                  # "" = <DATA_DIR>/resumes
+    RESUME_CACHE_MAX_AGE: int = 3600      # seconds browsers may reuse a resume download unchecked
     DB_URL: str = f"sqlite:///{(DATA_DIR_DEFAULT / 'hirex.db').as_posix()}"
+    DB_WAL: bool = True                   # SQLite: WAL journal, readers never block on the writer
+    DB_SYNCHRONOUS: str = "NORMAL"        # SQLite: NORMAL is durable across app crashes in WAL mode
+    DB_MMAP_SIZE: int = 268_435_456       # SQLite: bytes of the DB file memory-mapped per connection
+    DB_CACHE_SIZE_KB: int = 65_536        # SQLite: page cache per connection
+    DB_BUSY_TIMEOUT_MS: int = 10_000      # wait this long for a lock (or the writer) before failing
+    DB_READ_POOL_SIZE: int = 8            # pooled read-only connections
+    DB_THREADS: int = 0                   # worker threads for DB reads from async code (0 = read pool size; writes get 1)
 
     # ---- Embeddings / Vector index ----
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
-    FAISS_INDEX_PATH: str = (DATA_DIR_DEFAULT / "faiss_index.bin").as_posix()
-    FAISS_META_PATH: str = (DATA_DIR_DEFAULT / "faiss_meta.jsonl").as_posix()
+    FAISS_INDEX_PATH: str = ""            # "" = <DATA_DIR>/faiss_index.bin
+    FAISS_META_PATH: str = ""             # "" = <DATA_DIR>/faiss_meta.jsonl
+    FAISS_SHARD_DIR: str = ""             # "" = <DATA_DIR>/faiss_shards
+    FAISS_SHARD_SIZE: int = 50_000        # candidate ids per shard (id-range partitioning)
+    FAISS_SEARCH_THREADS: int = 0         # shard fan-out threads (0 = cpu count)
+    INDEX_WRITE_MAX_BATCH: int = 256      # vectors per group commit of the index writer
+    INDEX_WRITE_MAX_WAIT_MS: float = 5.0  # how long the first write waits for company
+    EMBED_MAX_BATCH: int = 32             # texts per coalesced forward pass
+    EMBED_MAX_WAIT_MS: float = 2.0        # how long the first request waits for company
+    EMBED_MAX_CONCURRENCY: int = 1        # concurrent forward passes per process
+    EMBED_TORCH_THREADS: int = 0          # 0 = cpu count / WEB_CONCURRENCY
+    INDEX_REPAIR_WORKERS: int = 2         # threads re-embedding missing vectors (services/consistency.py)
+    INDEX_REPAIR_BATCH: int = 64          # candidates loaded + embedded per task
+    INDEX_CHECK_ON_STARTUP: bool = False  # diff index vs. DB in the background after startup, log drift
+
+    # ---- Recruiter search ----
+    SEARCH_POOL_SIZE: int = 200           # candidates retrieved before filtering/ranking
+    SEARCH_CACHE_SIZE: int = 256          # cached responses (0 disables)
+    SEARCH_CURSOR_TTL: int = 600          # seconds a next_cursor stays valid
+    SEARCH_BATCH_MAX: int = 64            # queries per /recruiters/query/batch call
+    SEARCH_PAGE_MAX: int = 200            # largest top_k / page_size a request may ask for
+    PLANNER_FILTER_FIRST_MAX: int = 2000  # go filter-first when filters match at most this many
+
+    # ---- Cross-encoder rerank (optional) ----
+    RERANK_ENABLED: bool = False
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_TOP_N: int = 20                # only the head of the ranking is rescored
+    RERANK_BUDGET_MS: float = 150.0       # hard per-request budget; leftovers keep blend order
+    RERANK_BATCH_SIZE: int = 8
+
+    # ---- Re-extraction (services/reextract.py) ----
+    REEXTRACT_BATCH_SIZE: int = 1000      # rows read, derived and written per transaction
+    REEXTRACT_WORKERS: int = 0            # process pool size (0 = cpu count)
+
+    # ---- Observability ----
+    METRICS_ENABLED: bool = True          # Prometheus text format at GET /metrics
+    PROFILING_ENABLED: bool = False       # cProfile flagged/sampled requests (off = not installed)
+    PROFILE_HEADER: str = "X-HireX-Profile"
+    PROFILE_SAMPLE_RATE: float = 0.0      # fraction of requests profiled without the header
+    PROFILE_DIR: str = ""                 # "" = <DATA_DIR>/profiles
+    PROFILE_KEEP: int = 50                # newest profiles kept on disk
+
+    # ---- Admin ----
+    ADMIN_TOKEN: Optional[str] = None     # /admin/* requires X-Admin-Token; unset = /admin/* is 404
 
     # ---- Auth / JWT ----
     JWT_SECRET: str = os.environ.get("JWT_SECRET", "dev-secret-change-me")
@@ -57,6 +115,13 @@ class Settings(BaseSettings):
     def prefer_secret_key(cls, v):
         return os.environ.get("SECRET_KEY") or v
 
+    @model_validator(mode="after")
+    def paths_under_data_dir(self):
+        for field, name in DATA_PATHS.items():
+            if not getattr(self, field):
+                setattr(self, field, (Path(self.DATA_DIR) / name).as_posix())
+        return self
+
 settings = Settings()
 
 # Ensure directories exist
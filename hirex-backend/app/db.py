@@ -1,9 +1,15 @@
 # app/db.py
 from __future__ import annotations
 
+import functools
 from datetime import datetime
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
 
+import anyio
+from anyio.lowlevel import RunVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
 from sqlmodel import SQLModel, Field, Session, create_engine
 
 from .config import settings
@@ -56,23 +62,144 @@ class Candidate(SQLModel, table=True):
     keywords: str = "[]"
     education_text: Optional[str] = None
 
-    # Raw
-    resume_path: str
-    parsed_text: str
+    # Raw (full text is out of row, see ResumeText)
+    resume_path: str                # content-addressed blob (app.utils.files)
+    file_sha256: Optional[str] = None
+    file_size: Optional[int] = None
+    mime_type: Optional[str] = None
+    file_name: Optional[str] = None  # original upload name
+    extractor_version: Optional[str] = None  # services.extraction.EXTRACTOR_VERSION that derived the fields
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
-# Engine
-engine = create_engine(settings.DB_URL, echo=False)
+class ResumeText(SQLModel, table=True):
+    """Compressed resume text, one row per candidate (app.services.textstore)."""
+    __tablename__ = "resume_text"
+
+    candidate_id: int = Field(primary_key=True, foreign_key="candidate.id")
+    codec: str = "zlib"             # zstd | zlib
+    size: int = 0                   # uncompressed bytes
+    data: bytes = b""
+
+
+# -----------------------------------------------------------------------------
+# Engines
+#   engine       -> the single writer (all INSERT/UPDATE/DELETE, auth flows, DDL)
+#   read_engine  -> pooled read-only connections for search / download / paging
+# On SQLite the writer is one pooled connection whose transactions start with
+# BEGIN IMMEDIATE, so write locks are taken up front (no deadlocked lock upgrades);
+# in WAL mode readers keep reading the last committed snapshot while it commits.
+# Other backends get one ordinary engine for both roles.
+# -----------------------------------------------------------------------------
+def _sqlite_pragmas(read_only: bool):
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.DB_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA synchronous = {settings.DB_SYNCHRONOUS}",
+        f"PRAGMA cache_size = -{int(settings.DB_CACHE_SIZE_KB)}",  # negative = KiB
+        f"PRAGMA mmap_size = {int(settings.DB_MMAP_SIZE)}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if settings.DB_WAL and not read_only:
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")  # persistent in the file; init_db() connects the writer first
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    return pragmas
+
+
+def _sqlite_engine(url: str, read_only: bool) -> Engine:
+    eng = create_engine(
+        url,
+        echo=False,
+        poolclass=QueuePool,
+        pool_size=settings.DB_READ_POOL_SIZE if read_only else 1,
+        max_overflow=0,
+        pool_timeout=settings.DB_BUSY_TIMEOUT_MS / 1000.0,  # waiting for the writer counts as busy
+        pool_pre_ping=False,
+        connect_args={"check_same_thread": False, "timeout": settings.DB_BUSY_TIMEOUT_MS / 1000.0},
+    )
+    pragmas = _sqlite_pragmas(read_only)
+
+    @event.listens_for(eng, "connect")
+    def _on_connect(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None  # we emit BEGIN ourselves (below)
+        cur = dbapi_conn.cursor()
+        for p in pragmas:
+            cur.execute(p)
+        cur.close()
+
+    @event.listens_for(eng, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN" if read_only else "BEGIN IMMEDIATE")
+
+    return eng
+
+
+def _make_engines(url: str):
+    u = make_url(url)
+    if u.get_backend_name() != "sqlite":
+        eng = create_engine(url, echo=False, pool_pre_ping=True)
+        return eng, eng
+    if u.database in (None, "", ":memory:"):
+        # Each connection would be a separate in-memory DB; keep one shared engine
+        eng = create_engine(url, echo=False, connect_args={"check_same_thread": False})
+        return eng, eng
+    return _sqlite_engine(url, read_only=False), _sqlite_engine(url, read_only=True)
+
+
+engine, read_engine = _make_engines(settings.DB_URL)
 
 
 def init_db() -> None:
-    """Create all tables if they don't exist."""
+    """Create missing tables, then apply pending schema migrations (app.migrations)."""
+    from .migrations import upgrade
+
     SQLModel.metadata.create_all(engine)
+    upgrade(engine)
 
 
 def get_session():
     """FastAPI dependency to yield a SQLModel Session bound to our engine."""
     with Session(engine) as session:
         yield session
+
+
+def get_read_session():
+    """Like get_session, on the pooled read-only connections."""
+    with Session(read_engine) as session:
+        yield session
+
+
+# -----------------------------------------------------------------------------
+# Async access
+# Async endpoints never touch a Session directly: they hand a plain sync function
+# to run_db (reads) or run_db_write (anything that writes), which runs it on a
+# worker thread. Each side has its own limiter sized to its connection pool: reads
+# to the read pool, writes to 1 (there is one writer connection). A burst queues
+# on its limiter without holding a thread, and a queue of uploads waiting for the
+# writer can never take the slots searches need.
+# -----------------------------------------------------------------------------
+T = TypeVar("T")
+_read_limiter: RunVar[anyio.CapacityLimiter] = RunVar("hirex_db_read_limiter")
+_write_limiter: RunVar[anyio.CapacityLimiter] = RunVar("hirex_db_write_limiter")
+
+
+def _limiter(var: RunVar, size: int) -> anyio.CapacityLimiter:
+    try:
+        return var.get()
+    except LookupError:
+        limiter = anyio.CapacityLimiter(size)
+        var.set(limiter)
+        return limiter
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking read-only DB function off the event loop, on the read limiter."""
+    limiter = _limiter(_read_limiter, settings.DB_THREADS or settings.DB_READ_POOL_SIZE)
+    return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs), limiter=limiter)
+
+
+async def run_db_write(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Like run_db for functions that write: one at a time, matching the single writer."""
+    limiter = _limiter(_write_limiter, 1)
+    return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs), limiter=limiter)
@@ -1,8 +1,11 @@
+import asyncio
+import heapq
 import json
 import logging
+import mimetypes
 import zipfile
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 # app/main.py
 from dotenv import load_dotenv
@@ -12,41 +15,54 @@ load_dotenv()  # loads .env from project root
 from .config import settings
 from fastapi.middleware.cors import CORSMiddleware
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import Session, select
 
 from .config import settings
-from .db import init_db, engine, Candidate
-from .utils.files import save_upload
-from .services import parser
-from .services.skills import (
-    extract_skills as sk_extract,
-    extract_soft_skills as sk_soft,
-    to_json as to_json_list,
-)
-from .services.educations import (
-    extract_institutions as edu_extract,
-    extract_degrees,
-    extract_majors,
-    to_json as to_json_edu,
-)
+from .db import init_db, engine, read_engine, run_db, run_db_write, Candidate
+from .utils.downloads import ResumeFileResponse
+from .utils.files import StoredFile, file_fields, save_upload, store_stream
+from .services import consistency, parser
+from .services.extraction import build_candidate_record
 from .services.embeddings import Embedder
-from .services.indexer import FaissIndex
-from .services.prompt_parser import parse_prompt
-from .services.search import apply_filters, best_snippet
+from .services.indexer import ShardedFaissIndex
+from .services.index_writer import IndexWriter
+from .services.lexical import BM25Index
+from .services.retrieval import hybrid_retrieve, hybrid_retrieve_many
+from .services.cache import ResultCache, bump_generation, corpus_generation, search_key
+from .services.pagination import CursorStore, PageState, Ranked, Scored, make_cursor, parse_cursor
+from .services.rerank import CrossEncoderReranker
+from .services.tracing import QueryTrace
+from .services import metrics
+from .services.metrics import (
+    INGEST_DOCS,
+    CallbackMetric,
+    MetricsMiddleware,
+    instrument_engine,
+    watch_event_loop,
+)
+from .services.prompt_parser import QueryPlan, plan_query, _plan
+from .services.search import apply_filters, best_snippet, structured_conditions
+from .services.stats import CorpusStats, STATS_COLUMNS
 from .services.ranking_profiles import PROFILES, DEFAULT_PROFILE
-from .services.ranking import compute_score
-from .services.roles import extract_roles_from_resume
+from .services.ranking import compute_score, fast_score, json_list_has
+from .services.textstore import iter_texts, load_texts, put_texts
 
 # ⬇️ NEW: auth tables + router
 from .models_auth import User, AuthTxn  # ensure tables are registered for create_all
 from .routes.auth import router as auth_router
+from .routes.admin import router as admin_router
+from .services.profiling import ProfilingMiddleware
 
 from .schemas import (
     UploadResponse,
     RecruiterQueryRequest,
+    RecruiterPageRequest,
+    RecruiterBatchRequest,
+    RecruiterBatchResponse,
     CandidateOut,
     RecruiterSearchResponse,
     StructuredFilters,
@@ -66,10 +82,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 
 # Routers
 app.include_router(auth_router)  # ⬅️ exposes /auth/register, /auth/login, /auth/verify, /auth/resend
+app.include_router(admin_router)  # /admin/profiles (+ later maintenance endpoints)
 
 # Logging
 logging.basicConfig(level=logging.INFO)
@@ -80,80 +101,177 @@ logger.setLevel(logging.INFO)
 init_db()
 _embedder = Embedder(settings.EMBEDDING_MODEL)
 _DIM = _embedder.encode(["test"]).shape[1]
-_index = FaissIndex.load(_DIM)
+_index = ShardedFaissIndex.load(_DIM)
+_writer = IndexWriter(_index)  # every index mutation goes through here (group commit)
+
+def _load_stats(session: Session) -> CorpusStats:
+    """Column statistics for the selectivity-aware planner."""
+    stats = CorpusStats()
+    stats.add_many(
+        dict(zip(STATS_COLUMNS, row))
+        for row in session.exec(select(*[getattr(Candidate, c) for c in STATS_COLUMNS])).all()
+    )
+    return stats
+
+
+# Lexical side of hybrid retrieval lives in memory; rebuild it from the DB at boot
+_lexical = BM25Index()
+with Session(read_engine) as _s:
+    _lexical.add_many(iter_texts(_s))
+    _stats = _load_stats(_s)
+
+
+def _after_reextract(job) -> None:
+    """Derived columns changed under us: refresh planner stats, invalidate cached searches."""
+    global _stats
+    with Session(read_engine) as session:
+        _stats = _load_stats(session)
+    bump_generation()
+
+
+app.state.after_reextract = _after_reextract  # called by POST /admin/reextract when a run ends
+app.state.writer = _writer                    # /admin/consistency checks and repairs the live index
+app.state.encode = _embedder.encode
+app.state.after_repair = lambda job: bump_generation()
+
+_search_cache = ResultCache(settings.SEARCH_CACHE_SIZE)
+_cursors = CursorStore(ttl_seconds=settings.SEARCH_CURSOR_TTL)
+_reranker = (
+    CrossEncoderReranker(settings.RERANK_MODEL, batch_size=settings.RERANK_BATCH_SIZE)
+    if settings.RERANK_ENABLED
+    else None
+)
+
+# Scrape-time views of live state (nothing is recorded on the hot path for these)
+def _cache_counters():
+    info = _plan.cache_info()
+    return {"search": (_search_cache.hits, _search_cache.misses), "plan": (info.hits, info.misses)}
+
+
+instrument_engine(engine)
+if read_engine is not engine:
+    instrument_engine(read_engine)
+CallbackMetric("hirex_faiss_vectors", "Vectors in the FAISS index.", "gauge",
+               lambda: [({}, _index.ntotal)])
+CallbackMetric("hirex_faiss_shards", "Loaded FAISS shards.", "gauge",
+               lambda: [({}, len(_index.shards))])
+CallbackMetric("hirex_index_write_pending", "Index writes queued for the next group commit.", "gauge",
+               lambda: [({}, _writer.pending)])
+CallbackMetric("hirex_cache_hits_total", "Cache hits.", "counter",
+               lambda: [({"cache": c}, h) for c, (h, _) in _cache_counters().items()])
+CallbackMetric("hirex_cache_misses_total", "Cache misses.", "counter",
+               lambda: [({"cache": c}, m) for c, (_, m) in _cache_counters().items()])
+CallbackMetric("hirex_cache_hit_ratio", "Cache hit ratio since start.", "gauge",
+               lambda: [({"cache": c}, h / (h + m)) for c, (h, m) in _cache_counters().items() if h + m])
 
 ALLOWED_EXTS = {
     ".pdf", ".docx", ".txt", ".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff",
 }
 
 
+@app.on_event("startup")
+async def _start_loop_watch():
+    if settings.METRICS_ENABLED:
+        app.state.loop_watch = asyncio.create_task(watch_event_loop())
+
+
+def _check_consistency() -> None:
+    drift = consistency.summary(consistency.check(_index))
+    if not drift["consistent"]:
+        logger.warning("FAISS index and candidate table disagree (POST /admin/consistency/repair): %s", drift)
+
+
+@app.on_event("startup")
+async def _start_consistency_check():
+    # full id diff: opt-in, and after startup so it never delays the first request
+    if settings.INDEX_CHECK_ON_STARTUP:
+        app.state.consistency_check = asyncio.create_task(run_db(_check_consistency))
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # -----------------------------------------------------------------------------
-# Helpers
+# DB access (sync; async endpoints call these through run_db)
 # -----------------------------------------------------------------------------
-def _build_candidate_record(text: str, path: str) -> dict:
-    meta = parser.rough_parse(text or Path(path).name)
-    skills = sk_extract(text or "")
-    soft_sk = sk_soft(text or "")
-    insts = edu_extract(text or "")
-    degrees = extract_degrees(text or "")
-    majors = extract_majors(text or "")
-
-    projects = parser.extract_projects(text or "")
-    exp_entries, computed_years = parser.extract_experience(text or "")
-    cgpa = parser.extract_cgpa(text or "")
-    hackwins = parser.extract_hackathons(text or "")
-    extra = parser.extracurricular_score(text or "")
-    por = parser.por_score(text or "")
-    lead = parser.leadership_score(text or "")
-    certs = parser.extract_certifications(text or "")
-    achv = parser.extract_achievements(text or "")
-    pubs = parser.extract_publications(text or "")
-
-    years = meta.get("years_experience") or computed_years or 0.0
-
-    # derive roles (from titles + skills)
-    roles = extract_roles_from_resume(text or "", skills)
-
-    rec = dict(
-        name=meta.get("name") or Path(path).stem,
-        email=meta.get("email"),
-        phone=meta.get("phone"),
-        location=None,
-        linkedin=meta.get("linkedin"),
-        github=meta.get("github"),
-        portfolio=meta.get("portfolio"),
-        years_experience=years,
-        cgpa=cgpa,
-        project_count=len(projects),
-        hackathon_wins=hackwins,
-        extracurricular_score=extra,
-        leadership_score=lead,
-        por_score=por,
-        notice_period_months=None,
-        skills=to_json_list(skills),
-        soft_skills=to_json_list(soft_sk),
-        institutions=to_json_edu(insts),
-        degrees=to_json_edu(degrees),
-        majors=to_json_edu(majors),
-        languages="[]",
-        certifications=json.dumps(certs, ensure_ascii=False),
-        achievements=json.dumps(achv, ensure_ascii=False),
-        publications=json.dumps(pubs, ensure_ascii=False),
-        education_entries=json.dumps([], ensure_ascii=False),  # simple for MVP
-        experience_entries=json.dumps(exp_entries, ensure_ascii=False),
-        projects=json.dumps(projects, ensure_ascii=False),
-        keywords="[]",
-        education_text=None,
-        resume_path=path,
-        parsed_text=text or "",
-        roles=json.dumps(roles, ensure_ascii=False),  # store roles
-    )
-    return rec
+def _insert_candidate(rec: dict) -> Candidate:
+    return _get_candidate(_insert_candidates([rec])[0])
+
+
+def _insert_candidates(records: List[dict]) -> List[Optional[int]]:
+    """Insert a batch (rows + out-of-row text) in one transaction; ids come back in input order."""
+    with Session(engine) as session:
+        cands = [Candidate(**rec) for rec in records]  # parsed_text is not a column; ignored here
+        session.add_all(cands)
+        session.flush()
+        ids = [c.id for c in cands]
+        put_texts(session, [(cid, rec["parsed_text"]) for cid, rec in zip(ids, records)])
+        session.commit()
+        return ids
+
+
+def _get_candidate(cand_id: int) -> Optional[Candidate]:
+    with Session(read_engine) as session:
+        return session.get(Candidate, cand_id)
+
+
+def _load_rows(ids) -> dict:
+    """Candidate rows by id (read pool)."""
+    if not ids:
+        return {}
+    with Session(read_engine) as session:
+        return {r.id: r for r in session.exec(select(Candidate).where(Candidate.id.in_(ids))).all()}
+
+
+def _load_texts(ids) -> dict:
+    """Resume texts by id, decompressed on demand (snippets, phrase filter, rerank)."""
+    if not ids:
+        return {}
+    with Session(read_engine) as session:
+        return load_texts(session, ids)
+
+
+def _parse_upload(stored: StoredFile):
+    """Disk + CPU half of a single upload: (text, record), or (None, None) if unreadable."""
+    text = parser.read_file_text(stored.path)
+    if not text:
+        return None, None
+    return text, {**build_candidate_record(text, stored.path, stored.filename), **file_fields(stored)}
+
+
+def _extract_zip(tmp_zip: Path):
+    """Stream each resume in a ZIP into the store and build its record: (records, failed)."""
+    records, failed = [], 0
+    with zipfile.ZipFile(tmp_zip, "r") as zf:
+        for member in zf.infolist():
+            if member.is_dir():
+                continue
+            suffix = Path(member.filename).suffix.lower()
+            if suffix not in ALLOWED_EXTS:
+                continue
+            with zf.open(member) as src:
+                stored = store_stream(src, Path(member.filename).name)
+            try:
+                text = parser.read_file_text(stored.path)
+                records.append({**build_candidate_record(text, stored.path, stored.filename), **file_fields(stored)})
+            except Exception:
+                failed += 1
+    return records, failed
+
+
+def _add_to_search_state(added: List[Tuple[int, dict]]) -> None:
+    """BM25 postings + planner stats for new (id, record) pairs; tokenizing is CPU work."""
+    _lexical.add_many((cid, rec["parsed_text"]) for cid, rec in added)
+    _stats.add_many(rec for _, rec in added)
 
 
 # -----------------------------------------------------------------------------
@@ -161,21 +279,19 @@ def _build_candidate_record(text: str, path: str) -> dict:
 # -----------------------------------------------------------------------------
 @app.post("/resumes/upload", response_model=UploadResponse)
 async def upload_resume(file: UploadFile = File(...)):
-    path = save_upload(file)
-    text = parser.read_file_text(path)
+    stored = await run_in_threadpool(save_upload, file)
+    text, rec = await run_in_threadpool(_parse_upload, stored)
     if not text:
+        INGEST_DOCS.inc(source="upload", outcome="failed")
         raise HTTPException(status_code=400, detail="Could not extract text from resume")
 
-    rec = _build_candidate_record(text, path)
-    with Session(engine) as session:
-        cand = Candidate(**rec)
-        session.add(cand)
-        session.commit()
-        session.refresh(cand)
+    cand = await run_db_write(_insert_candidate, rec)
 
-    vec = _embedder.encode([rec["parsed_text"]])
-    _index.add(vec, [{"id": cand.id, "name": cand.name}])
-    _index.save()
+    vec = await _embedder.aencode([rec["parsed_text"]])
+    await _writer.aadd(vec, [{"id": cand.id, "name": cand.name}])
+    await run_in_threadpool(_add_to_search_state, [(cand.id, rec)])
+    bump_generation()
+    INGEST_DOCS.inc(source="upload", outcome="accepted")
 
     return UploadResponse(
         id=cand.id,
@@ -190,59 +306,32 @@ async def upload_resume(file: UploadFile = File(...)):
 async def upload_zip(zipfile_upload: UploadFile = File(...)):
     tmp_zip = Path(settings.DATA_DIR) / ("tmp_" + zipfile_upload.filename)
     tmp_zip.parent.mkdir(parents=True, exist_ok=True)
-    with tmp_zip.open("wb") as f:
-        f.write(await zipfile_upload.read())
-
-    accepted_records, accepted_texts, accepted_names = [], [], []
-    failed = 0
-    extract_dir = Path(settings.RESUME_DIR) / ("batch_" + Path(zipfile_upload.filename).stem)
-    extract_dir.mkdir(parents=True, exist_ok=True)
-
+    await run_in_threadpool(tmp_zip.write_bytes, await zipfile_upload.read())
     try:
-        with zipfile.ZipFile(tmp_zip, "r") as zf:
-            for member in zf.infolist():
-                if member.is_dir():
-                    continue
-                suffix = Path(member.filename).suffix.lower()
-                if suffix not in ALLOWED_EXTS:
-                    continue
-                target_path = extract_dir / Path(member.filename).name
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-                with zf.open(member) as src, target_path.open("wb") as dst:
-                    dst.write(src.read())
-                try:
-                    text = parser.read_file_text(str(target_path))
-                    rec = _build_candidate_record(text, str(target_path))
-                    accepted_records.append(rec)
-                    if text and text.strip():
-                        accepted_texts.append(text)
-                        accepted_names.append(rec["name"])
-                except Exception:
-                    failed += 1
+        accepted_records, failed = await run_in_threadpool(_extract_zip, tmp_zip)
     finally:
         try:
             tmp_zip.unlink()
         except Exception:
             pass
 
-    ids: List[int] = []
-    with Session(engine) as session:
-        for rec in accepted_records:
-            cand = Candidate(**rec)
-            session.add(cand)
-        session.commit()
-        for rec in accepted_records:
-            obj = session.exec(
-                select(Candidate).where(Candidate.resume_path == rec["resume_path"])
-            ).first()
-            if obj:
-                ids.append(obj.id)
+    inserted = await run_db_write(_insert_candidates, accepted_records)
+    added = [(cid, rec) for cid, rec in zip(inserted, accepted_records) if cid is not None]
+    ids: List[int] = [cid for cid, _ in added]
+    await run_in_threadpool(_add_to_search_state, added)  # one pass for the whole ZIP
+    accepted_texts, metas = [], []
+    for cid, rec in added:
+        if rec["parsed_text"].strip():
+            accepted_texts.append(rec["parsed_text"])
+            metas.append({"id": cid, "name": rec["name"]})
 
     if accepted_texts:
-        vecs = _embedder.encode(accepted_texts)
-        metas = [{"id": ids[i], "name": accepted_names[i]} for i in range(len(accepted_texts))]
-        _index.add(vecs, metas)
-        _index.save()
+        vecs = await _embedder.aencode(accepted_texts)
+        await _writer.aadd(vecs, metas)
+    if ids:
+        bump_generation()
+    INGEST_DOCS.inc(len(accepted_records), source="zip", outcome="accepted")
+    INGEST_DOCS.inc(failed, source="zip", outcome="failed")
 
     return {
         "accepted": len(accepted_records),
@@ -255,53 +344,213 @@ async def upload_zip(zipfile_upload: UploadFile = File(...)):
 
 
 @app.get("/resumes/{cand_id}/download")
-async def download_resume(cand_id: int):
-    with Session(engine) as session:
-        cand = session.get(Candidate, cand_id)
-        if not cand:
-            raise HTTPException(status_code=404, detail="Not found")
-        p = Path(cand.resume_path)
-        if not p.exists():
-            raise HTTPException(status_code=404, detail="File missing")
-        return FileResponse(str(p), filename=p.name)
+async def download_resume(cand_id: int, request: Request):
+    """
+    Resume file with a strong ETag (its SHA-256), so previews revalidate to a bodyless
+    304; Range requests get 206 partial content.
+    """
+    cand = await run_db(_get_candidate, cand_id)
+    if not cand:
+        raise HTTPException(status_code=404, detail="Not found")
+    p = Path(cand.resume_path)
+    try:
+        st = await run_in_threadpool(p.stat)
+    except OSError:
+        raise HTTPException(status_code=404, detail="File missing")
+    # Rows from before the content-addressed store have no hash: fall back to a weak tag
+    etag = f'"{cand.file_sha256}"' if cand.file_sha256 else f'W/"{st.st_size:x}-{st.st_mtime_ns:x}"'
+    return ResumeFileResponse(
+        str(p),
+        request.headers,
+        size=st.st_size,
+        etag=etag,
+        media_type=cand.mime_type or mimetypes.guess_type(p.name)[0] or "application/octet-stream",
+        filename=cand.file_name or p.name,
+        max_age=settings.RESUME_CACHE_MAX_AGE,
+    )
 
 
 # -----------------------------------------------------------------------------
-# Recruiter query (POST) + optional GET wrapper
+# Recruiter search helpers
 # -----------------------------------------------------------------------------
-@app.post("/recruiters/query", response_model=RecruiterSearchResponse)
-async def recruiter_query(req: RecruiterQueryRequest):
+def _candidate_out(r: Candidate, score: float, parts: dict, ctx: dict, text: str = "") -> CandidateOut:
+    """Build the response item (reasons + snippet) for one ranked candidate."""
+    filters: StructuredFilters = ctx["filters"]
+    q_skills, req_roles = ctx["q_skills"], ctx["req_roles"]
+    r_skills = set(json.loads(r.skills or "[]"))
+    r_roles = set(json.loads(getattr(r, "roles", "[]") or "[]"))
+
+    reasons = [
+        f"score_parts={parts}",
+        f"skills_match={', '.join(sorted(list(q_skills & r_skills))) or '—'}",
+    ]
+    if req_roles:
+        reasons.append(f"Role match: {', '.join(sorted(list(r_roles & req_roles))) or '—'}")
+    if filters.min_cgpa is not None:
+        reasons.append(f"CGPA needed ≥{filters.min_cgpa}, found {r.cgpa or 'N/A'}")
+    if filters.min_projects:
+        reasons.append(f"Projects needed ≥{filters.min_projects}, found {r.project_count}")
+    if filters.min_hackathon_wins:
+        reasons.append(
+            f"Hackathon wins needed ≥{filters.min_hackathon_wins}, found {r.hackathon_wins}"
+        )
+
+    return CandidateOut(
+        id=r.id,
+        name=r.name,
+        email=r.email,
+        years_experience=r.years_experience,
+        skills=sorted(list(r_skills)),
+        institutions=list(json.loads(r.institutions or "[]")),
+        score=score,
+        reasons=reasons,
+        resume_path=f"/resumes/{r.id}/download",
+        snippet=best_snippet(text, filters.contains_phrase or ctx["prompt"]),
+    )
+
+
+def _score_parts(r: Candidate, semantic: float, ctx: dict) -> dict:
+    """Score breakdown for one winner (the ranking itself only keeps compact tuples)."""
+    _, parts = compute_score(
+        {
+            "years_experience": r.years_experience,
+            "cgpa": r.cgpa,
+            "institutions": json.loads(r.institutions or "[]"),
+            "extracurricular_score": r.extracurricular_score,
+        },
+        ctx["weights"],
+        semantic,
+    )
+    parts["role_bonus"] = 1.0 if _role_match(r, ctx["req_roles"]) else 0.0
+    return parts
+
+
+def _role_match(r: Candidate, req_roles: set) -> bool:
+    return bool(req_roles) and any(json_list_has(r.roles, role) for role in req_roles)
+
+
+def _cursor_alive(cursor: str) -> bool:
+    parsed = parse_cursor(cursor)
+    return bool(parsed) and _cursors.get(parsed[0]) is not None
+
+
+def _from_cache(req: RecruiterQueryRequest, trace: QueryTrace):
+    """(cache key, cached response or None). Entries whose cursor expired count as misses."""
+    with trace.stage("cache_lookup") as rec:
+        key = search_key(req.prompt, req.profile, req.candidate_ids, req.top_k, req.rerank, req.explain)
+        cached = _search_cache.get(key)
+        hit = cached is not None and (cached.next_cursor is None or _cursor_alive(cached.next_cursor))
+        rec["hit"] = trace.cache_hit = hit
+    if hit:
+        return key, cached.model_copy(update={"query": req.prompt})
+    return key, None
+
+
+def _choose_execution(plan: QueryPlan) -> dict:
     """
-    Chat-style endpoint. Example body:
-    {
-      "prompt": "mern developers from iit with minimum 4 years experience",
-      "top_k": 10,
-      "profile": "balanced",
-      "candidate_ids": [optional subset restriction]
+    Selectivity-aware planning: when the structured filters are estimated to match
+    few enough candidates, resolve them in the DB first and score that subset exactly
+    (ANN-first over a fixed pool could miss all of them). Otherwise go vector-first,
+    including when no filter has a SQL predicate (the DB could not narrow anything).
+    """
+    est = _stats.selectivity(plan) * _stats.total
+    filter_first = bool(structured_conditions(plan)) and est <= settings.PLANNER_FILTER_FIRST_MAX
+    return {
+        "plan": "filter-first" if filter_first else "vector-first",
+        "corpus_size": _stats.total,
+        "estimated_matches": round(est, 1),
+        "filter_first_max": settings.PLANNER_FILTER_FIRST_MAX,
     }
+
+
+def _filter_first(plan: QueryPlan, req: RecruiterQueryRequest, q_vec, trace: QueryTrace):
     """
+    Resolve structured filters in SQL, then score the subset exactly against stored
+    vectors. Returns (rows, id2sem), or None if the estimate was off and the subset
+    is larger than PLANNER_FILTER_FIRST_MAX (caller falls back to vector-first).
+    """
+    cap = settings.PLANNER_FILTER_FIRST_MAX
+    conds = structured_conditions(plan)
+    if req.candidate_ids:
+        conds.append(Candidate.id.in_(req.candidate_ids))
+    with trace.stage("filter_first_sql") as rec:
+        with Session(read_engine) as session:
+            rows = session.exec(select(Candidate).where(*conds).limit(cap + 1)).all()
+        rec["n_out"] = len(rows)
+    if len(rows) > cap:
+        return None
+    with trace.stage("exact_vector_scoring", n_in=len(rows)) as rec:
+        found, vecs = _index.vectors_for([r.id for r in rows])
+        sims = (vecs @ q_vec[0]).tolist() if found else []
+        rec["n_out"] = len(found)
+    return rows, dict(zip(found, sims))
+
+
+def _scan_pool(plan: QueryPlan, req: RecruiterQueryRequest, trace: QueryTrace):
+    """
+    Neither retriever matched anything (empty index, a prompt of stopwords): scan the
+    rows the structured filters allow, newest first, with skill overlap with the
+    prompt standing in for the semantic score. Returns (rows, id2sem).
+    """
+    conds = structured_conditions(plan)
+    if req.candidate_ids:
+        conds.append(Candidate.id.in_(req.candidate_ids))
+    limit = max(req.top_k, settings.SEARCH_POOL_SIZE)
+    with trace.stage("scan_fallback") as rec:
+        with Session(read_engine) as session:
+            rows = session.exec(
+                select(Candidate).where(*conds).order_by(Candidate.created_at.desc()).limit(limit)
+            ).all()
+        rec["n_out"] = len(rows)
+    q_skills = set(plan.query_skills)
+    id2sem = {
+        r.id: len(q_skills & set(json.loads(r.skills or "[]"))) / len(q_skills) if q_skills else 0.0
+        for r in rows
+    }
+    return rows, id2sem
+
+
+def _retrieve(req: RecruiterQueryRequest, plan: QueryPlan, trace: QueryTrace, q_vec=None):
+    """Stages 2-3: embed (unless the caller already did), pick the execution plan, fetch the pool."""
+    if q_vec is None:
+        with trace.stage("embed", n_in=1):
+            q_vec = _embedder.encode([req.prompt])
+
+    # 2) Choose filter-first vs vector-first from corpus statistics
+    with trace.stage("choose_plan"):
+        trace.plan = _choose_execution(plan)
+    subset = _filter_first(plan, req, q_vec, trace) if trace.plan["plan"] == "filter-first" else None
+    if subset is not None:
+        rows, id2sem = subset
+    else:
+        if trace.plan["plan"] == "filter-first":
+            trace.plan["plan"] = "vector-first (filter-first over cap)"
+
+        # 3a) Hybrid retrieval: dense (FAISS) + lexical (BM25), fused with RRF
+        ids, id2sem = hybrid_retrieve(
+            _index, _lexical, q_vec, req.prompt,
+            top_k=max(req.top_k, settings.SEARCH_POOL_SIZE), trace=trace,
+        )
 
-    # 1) Parse prompt -> structured filters
-    fdict = parse_prompt(req.prompt)
-    filters = StructuredFilters(**fdict)
-    logger.info("Parsed filters: %s", filters.model_dump())
-
-    # 2) Semantic retrieval first
-    q_vec = _embedder.encode([req.prompt])
-    D, metas = _index.search(q_vec, top_k=max(req.top_k, 200))
-    id2sem = {}
-    ids: List[int] = []
-    if metas and len(metas) > 0 and len(metas[0]) > 0:
-        for score, m in zip(D[0].tolist(), metas[0]):
-            id2sem[m["id"]] = float(score)
-        ids = [m["id"] for m in metas[0]]
-
-    # 3) Load candidates; if FAISS empty, fallback to scanning all
-    with Session(engine) as session:
-        if ids:
-            rows = session.exec(select(Candidate).where(Candidate.id.in_(ids))).all()
-        else:
-            rows = session.exec(select(Candidate)).all()
+        # 3b) Load only the fused pool
+        if not ids:
+            trace.plan["plan"] = "scan (no retrieval hits)"
+            return _scan_pool(plan, req, trace)
+        with trace.stage("db_load", n_in=len(ids)) as rec:
+            rows: List[Candidate] = list(_load_rows(ids).values())
+            rec["n_out"] = len(rows)
+    return rows, id2sem
+
+
+def _rank(
+    req: RecruiterQueryRequest,
+    plan: QueryPlan,
+    rows: List[Candidate],
+    id2sem: dict,
+    trace: QueryTrace,
+):
+    """Stages 4-7: subset/structured filters and scoring (rerank is _rerank)."""
+    filters = StructuredFilters(**plan.filters())
 
     # 4) Optional subset restriction (rank only from these resumes)
     if req.candidate_ids:
@@ -309,103 +558,361 @@ async def recruiter_query(req: RecruiterQueryRequest):
         rows = [r for r in rows if r.id in allow]
 
     # 5) Apply structured filters on the pool (incl. roles_any_of)
-    rows = apply_filters(
-        rows,
-        min_experience=filters.min_experience,
-        must_have=filters.must_have_skills,
-        education_any_of=filters.education_any_of,
-        location=filters.location,
-        min_projects=filters.min_projects,
-        min_cgpa=filters.min_cgpa,
-        min_hackathon_wins=filters.min_hackathon_wins,
-        contains_phrase=filters.contains_phrase,
-        require_extracurricular=filters.require_extracurricular,
-        require_por=filters.require_por,
-        roles_any_of=getattr(filters, "roles_any_of", []),  # pass roles
-    )
+    with trace.stage("apply_filters", n_in=len(rows)) as rec:
+        rows = apply_filters(
+            rows,
+            min_experience=filters.min_experience,
+            must_have=filters.must_have_skills,
+            education_any_of=filters.education_any_of,
+            location=filters.location,
+            min_projects=filters.min_projects,
+            min_cgpa=filters.min_cgpa,
+            min_hackathon_wins=filters.min_hackathon_wins,
+            contains_phrase=filters.contains_phrase,
+            require_extracurricular=filters.require_extracurricular,
+            require_por=filters.require_por,
+            roles_any_of=getattr(filters, "roles_any_of", []),  # pass roles
+            texts=_load_texts([r.id for r in rows]) if filters.contains_phrase else None,
+        )
+        rec["n_out"] = len(rows)
+
+    # 6) Choose scoring profile (weights)
+    weights = PROFILES.get((req.profile or DEFAULT_PROFILE), PROFILES[DEFAULT_PROFILE])
 
-    # 6) If no semantic scores (FAISS empty), create a tiny proxy from skill overlap
-    if not id2sem:
-        q_skills = set(sk_extract(req.prompt))
+    # 7) Score the whole pool as compact tuples (with small role bonus), then pick
+    #    the head by partial selection; parts are built for the head only
+    ctx = {
+        "prompt": req.prompt,
+        "filters": filters,
+        "q_skills": set(plan.query_skills),
+        "req_roles": set(plan.roles),
+        "weights": weights,
+    }
+    rerank = _rerank_enabled(req)
+    rows_by_id = {r.id: r for r in rows}
+    with trace.stage("compute_score", n_in=len(rows)) as rec:
+        scored: List[Scored] = []
         for r in rows:
-            r_skills = set(json.loads(r.skills or "[]"))
-            id2sem[r.id] = (
-                len(q_skills & r_skills) / max(1, len(q_skills)) if q_skills else 0.0
-            )
+            sem = id2sem.get(r.id, 0.0)
+            score = fast_score(r.years_experience, r.cgpa, r.institutions, r.extracurricular_score, weights, sem)
+            if _role_match(r, ctx["req_roles"]):
+                score = score + 0.05  # 5% bump
+            scored.append((r.id, round(float(score), 4), sem))
+        head_size = max(req.top_k, settings.RERANK_TOP_N if rerank else 0)
+        top = heapq.nlargest(head_size, scored, key=lambda s: s[1])  # == stable sort[:k]
+        in_head = {cid for cid, _, _ in top}
+        tail = [s for s in scored if s[0] not in in_head]
+        ranked: List[Ranked] = [
+            (cid, score, _score_parts(rows_by_id[cid], sem, ctx)) for cid, score, sem in top
+        ]
+        rec["n_out"] = len(ranked)
+    return ranked, tail, rows_by_id, ctx
 
-    # 7) Choose scoring profile (weights)
-    weights = PROFILES.get((req.profile or DEFAULT_PROFILE), PROFILES[DEFAULT_PROFILE])
 
-    # 8) Score & build response items (with small role bonus)
-    items: List[CandidateOut] = []
-    q_skills = set(sk_extract(req.prompt))
-    req_roles = set(getattr(filters, "roles_any_of", []) or [])
+def _rerank_enabled(req: RecruiterQueryRequest) -> bool:
+    return _reranker is not None and req.rerank is not False
 
-    for r in rows:
-        r_skills = set(json.loads(r.skills or "[]"))
-        r_insts = list(json.loads(r.institutions or "[]"))
-        r_roles = set(json.loads(getattr(r, "roles", "[]") or "[]"))
-        sem = id2sem.get(r.id, 0.0)
 
-        score, parts = compute_score(
-            {
-                "years_experience": r.years_experience,
-                "cgpa": r.cgpa,
-                "institutions": r_insts,
-                "extracurricular_score": r.extracurricular_score,
-            },
-            weights,
-            sem,
+async def _rerank(req: RecruiterQueryRequest, ranked: List[Ranked], trace: QueryTrace) -> dict:
+    """
+    Stage 8: optional cross-encoder rerank of the head, within a hard latency budget.
+    Texts come through the read limiter; the model runs on the plain threadpool so
+    a slow rerank doesn't hold a DB slot. Returns the texts it loaded (hydrate reuses them).
+    """
+    if not _rerank_enabled(req):
+        return {}
+    n = min(settings.RERANK_TOP_N, len(ranked))
+    with trace.stage("rerank", n_in=n, cpu=False):
+        texts = await run_db(_load_texts, [cid for cid, _, _ in ranked[:n]])
+        ranked[:n] = await run_in_threadpool(
+            _reranker.rerank, req.prompt, ranked[:n], texts, budget_ms=settings.RERANK_BUDGET_MS
         )
+    return texts
+
+
+async def _page_texts(ranked: List[Ranked], top_k: int, texts: dict) -> dict:
+    """Texts for the first page; only those the rerank didn't already load are read."""
+    need = [cid for cid, _, _ in ranked[:top_k] if cid not in texts]
+    return {**texts, **(await run_db(_load_texts, need))} if need else texts
+
+
+def _park(req: RecruiterQueryRequest, head: List[Ranked], tail: List[Scored], ctx: dict) -> Optional[str]:
+    """Keep the ranking server-side when there is more than one page."""
+    if len(head) + len(tail) <= req.top_k:
+        return None
+    token = _cursors.put(PageState(head, tail, ctx, req.top_k))
+    return make_cursor(token, req.top_k)
+
+
+async def _rank_and_page(
+    req: RecruiterQueryRequest,
+    plan: QueryPlan,
+    rows: List[Candidate],
+    id2sem: dict,
+    trace: QueryTrace,
+) -> RecruiterSearchResponse:
+    """Stages after retrieval: rank, rerank, then hydrate only the first page (stage 9)."""
+    ranked, tail, rows_by_id, ctx = await run_db(_rank, req, plan, rows, id2sem, trace)
+    texts = await _rerank(req, ranked, trace)
+    with trace.stage("load_texts", n_in=min(req.top_k, len(ranked)), cpu=False):
+        texts = await _page_texts(ranked, req.top_k, texts)
+    with trace.stage("hydrate", n_in=min(req.top_k, len(ranked))) as rec:
+        items = [
+            _candidate_out(rows_by_id[cid], score, parts, ctx, texts.get(cid, ""))
+            for cid, score, parts in ranked[: req.top_k]
+        ]
+        rec["n_out"] = len(items)
+    return RecruiterSearchResponse(
+        query=req.prompt,
+        filters=ctx["filters"],
+        total_returned=len(items),
+        total_matched=len(ranked) + len(tail),
+        items=items,
+        next_cursor=_park(req, ranked, tail, ctx),
+    )
 
-        # small score bonus if role matches prompt roles
-        role_match = 1.0 if (req_roles and (r_roles & req_roles)) else 0.0
-        if role_match:
-            score = score + 0.05  # 5% bump
-        parts["role_bonus"] = role_match
 
-        reasons = [
-            f"score_parts={parts}",
-            f"skills_match={', '.join(sorted(list(q_skills & r_skills))) or '—'}",
+# -----------------------------------------------------------------------------
+# Recruiter query (POST) + optional GET wrapper
+# -----------------------------------------------------------------------------
+@app.post("/recruiters/query", response_model=RecruiterSearchResponse)
+async def recruiter_query(req: RecruiterQueryRequest):
+    """
+    Chat-style endpoint. Example body:
+    {
+      "prompt": "mern developers from iit with minimum 4 years experience",
+      "top_k": 10,
+      "profile": "balanced",
+      "candidate_ids": [optional subset restriction],
+      "explain": false
+    }
+    With "explain": true the response carries the execution plan plus per-stage
+    wall/CPU timings and candidate counts; the same trace is logged for every request.
+    """
+    trace = QueryTrace("recruiter_query")
+
+    # 0) Serve repeated searches from cache (invalidated by corpus generation)
+    cache_key, cached = _from_cache(req, trace)
+    if cached is not None:
+        summary = trace.log(logger)
+        if req.explain:
+            cached.explain = summary
+        return cached
+    generation = corpus_generation()
+
+    # 1) Plan prompt -> structured filters, query skills, roles (LRU-cached)
+    with trace.stage("parse_prompt"):
+        plan = plan_query(req.prompt)
+    logger.info("Parsed filters: %s", plan.filters())
+
+    # 2-3) Execution plan + candidate pool
+    with trace.stage("embed", n_in=1, cpu=False):
+        q_vec = await _embedder.aencode([req.prompt])  # joins concurrent queries' micro-batch
+    rows, id2sem = await run_db(_retrieve, req, plan, trace, q_vec)
+
+    # 4-9) Filter, score, rerank and hydrate the first page
+    resp = await _rank_and_page(req, plan, rows, id2sem, trace)
+    summary = trace.log(logger)
+    _search_cache.put(cache_key, resp, generation=generation)
+    if req.explain:
+        resp = resp.model_copy(update={"explain": summary})  # the cached copy stays plan-free
+    return resp
+
+
+@app.post("/recruiters/query/batch", response_model=RecruiterBatchResponse)
+async def recruiter_query_batch(req: RecruiterBatchRequest):
+    """
+    Many recruiter queries in one call (e.g. one per open requisition).
+    Prompts are embedded in one forward pass, searched with one multi-query FAISS
+    call, and the union of candidate rows is loaded once; scoring stays per query.
+    """
+    if len(req.queries) > settings.SEARCH_BATCH_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.SEARCH_BATCH_MAX} queries per batch"
+        )
+
+    trace = QueryTrace("recruiter_query_batch")
+    results: List[Optional[RecruiterSearchResponse]] = [None] * len(req.queries)
+    pending = []  # (position, request, cache key)
+    for i, q in enumerate(req.queries):
+        key, cached = _from_cache(q, trace)
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append((i, q, key))
+    trace.cache_hit = not pending
+
+    plans_used: List[Optional[dict]] = [None] * len(req.queries)
+    if pending:
+        generation = corpus_generation()
+        with trace.stage("parse_prompt", n_in=len(pending)):
+            plans = [plan_query(q.prompt) for _, q, _ in pending]
+        with trace.stage("embed", n_in=len(pending), cpu=False):
+            q_vecs = await _embedder.aencode([q.prompt for _, q, _ in pending])
+
+        # Selective queries resolve their filters in SQL; the rest share one hybrid pass
+        with trace.stage("choose_plan", n_in=len(pending)):
+            explains = [_choose_execution(plan) for plan in plans]
+        pools: List[Optional[tuple]] = [
+            await run_db(_filter_first, plan, q, q_vecs[j: j + 1], trace) if ex["plan"] == "filter-first" else None
+            for j, ((_, q, _), plan, ex) in enumerate(zip(pending, plans, explains))
         ]
-        if req_roles:
-            reasons.append(f"Role match: {', '.join(sorted(list(r_roles & req_roles))) or '—'}")
-        if filters.min_cgpa is not None:
-            reasons.append(f"CGPA needed ≥{filters.min_cgpa}, found {r.cgpa or 'N/A'}")
-        if filters.min_projects:
-            reasons.append(f"Projects needed ≥{filters.min_projects}, found {r.project_count}")
-        if filters.min_hackathon_wins:
-            reasons.append(
-                f"Hackathon wins needed ≥{filters.min_hackathon_wins}, found {r.hackathon_wins}"
+        vector_first = [j for j, pool in enumerate(pools) if pool is None]
+        if vector_first:
+            retrieved = hybrid_retrieve_many(
+                _index,
+                _lexical,
+                q_vecs[vector_first],
+                [pending[j][1].prompt for j in vector_first],
+                [max(pending[j][1].top_k, settings.SEARCH_POOL_SIZE) for j in vector_first],
+                trace,
             )
 
-        items.append(
-            CandidateOut(
-                id=r.id,
-                name=r.name,
-                email=r.email,
-                years_experience=r.years_experience,
-                skills=sorted(list(r_skills)),
-                institutions=r_insts,
-                score=round(float(score), 4),
-                reasons=reasons,
-                resume_path=f"/resumes/{r.id}/download",
-                snippet=best_snippet(r.parsed_text, filters.contains_phrase or req.prompt),
+            union = sorted({cid for ids, _ in retrieved for cid in ids})
+            with trace.stage("db_load", n_in=len(union), cpu=False) as rec:
+                rows_by_id = await run_db(_load_rows, union)
+                rec["n_out"] = len(rows_by_id)
+            for j, (ids, id2sem) in zip(vector_first, retrieved):
+                if explains[j]["plan"] == "filter-first":
+                    explains[j]["plan"] = "vector-first (filter-first over cap)"
+                if not ids:
+                    explains[j]["plan"] = "scan (no retrieval hits)"
+                    pools[j] = await run_db(_scan_pool, plans[j], pending[j][1], trace)
+                    continue
+                pools[j] = ([rows_by_id[cid] for cid in ids if cid in rows_by_id], id2sem)
+
+        for (i, q, key), plan, ex, (rows, id2sem) in zip(pending, plans, explains, pools):
+            ex["candidates_retrieved"] = len(rows)
+            plans_used[i] = ex
+            results[i] = await _rank_and_page(q, plan, rows, id2sem, trace)
+            _search_cache.put(key, results[i], generation=generation)
+
+    summary = trace.log(logger)
+    for i, q in enumerate(req.queries):
+        if q.explain:
+            # fresh results are the objects just cached: explain goes on a per-response copy
+            explain = {**(plans_used[i] or {"cache_hit": True}), "batch": summary}
+            results[i] = results[i].model_copy(update={"explain": explain})
+    return RecruiterBatchResponse(results=results)
+
+
+def _stream_event(event: str, payload: dict, sse: bool) -> str:
+    data = json.dumps({"event": event, **payload}, ensure_ascii=False)
+    return f"event: {event}\ndata: {data}\n\n" if sse else data + "\n"
+
+
+@app.post("/recruiters/query/stream")
+async def recruiter_query_stream(req: RecruiterQueryRequest, request: Request, format: Optional[str] = None):
+    """
+    Streaming variant of /recruiters/query. Emits the parsed filters immediately,
+    then one ranked CandidateOut per line as it is hydrated, then a summary:
+      {"event": "filters", ...} / {"event": "item", "rank": n, "item": {...}} / {"event": "done", ...}
+    NDJSON by default; Server-Sent Events with ?format=sse or Accept: text/event-stream.
+    """
+    sse = format == "sse" or "text/event-stream" in request.headers.get("accept", "")
+
+    async def events():
+        trace = QueryTrace("recruiter_query_stream")
+        cache_key, cached = _from_cache(req, trace)
+        generation = corpus_generation()
+        with trace.stage("parse_prompt"):
+            plan = plan_query(req.prompt)
+        yield _stream_event(
+            "filters", {"query": req.prompt, "filters": plan.filters()}, sse
+        )
+
+        if cached is not None:
+            for rank, item in enumerate(cached.items, start=1):
+                yield _stream_event("item", {"rank": rank, "item": item.model_dump()}, sse)
+            resp = cached
+        else:
+            # Heavy stages run off the event loop so the filters line flushes right away
+            with trace.stage("embed", n_in=1, cpu=False):
+                q_vec = await _embedder.aencode([req.prompt])
+            rows, id2sem = await run_db(_retrieve, req, plan, trace, q_vec)
+            ranked, tail, rows_by_id, ctx = await run_db(_rank, req, plan, rows, id2sem, trace)
+            texts = await _rerank(req, ranked, trace)
+            items: List[CandidateOut] = []
+            with trace.stage("hydrate", n_in=min(req.top_k, len(ranked)), cpu=False) as rec:
+                texts = await _page_texts(ranked, req.top_k, texts)
+                for rank, (cid, score, parts) in enumerate(ranked[: req.top_k], start=1):
+                    item = _candidate_out(rows_by_id[cid], score, parts, ctx, texts.get(cid, ""))
+                    items.append(item)
+                    yield _stream_event("item", {"rank": rank, "item": item.model_dump()}, sse)
+                rec["n_out"] = len(items)
+            resp = RecruiterSearchResponse(
+                query=req.prompt,
+                filters=ctx["filters"],
+                total_returned=len(items),
+                total_matched=len(ranked) + len(tail),
+                items=items,
+                next_cursor=_park(req, ranked, tail, ctx),
             )
+            _search_cache.put(cache_key, resp, generation=generation)
+
+        summary = trace.log(logger)
+        yield _stream_event(
+            "done",
+            {
+                "total_returned": resp.total_returned,
+                "total_matched": resp.total_matched,
+                "next_cursor": resp.next_cursor,
+                "explain": summary if req.explain else None,
+            },
+            sse,
         )
 
-    # 9) Sort & truncate
-    items.sort(key=lambda x: x.score, reverse=True)
-    items = items[: req.top_k]
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
 
+@app.post("/recruiters/query/next", response_model=RecruiterSearchResponse)
+async def recruiter_query_next(req: RecruiterPageRequest):
+    """
+    Next page of an earlier /recruiters/query. Body: {"cursor": "<next_cursor>"}.
+    Only this page's rows are loaded and hydrated; the ranking is reused as-is
+    (the unranked tail is sorted the first time a page reaches past the head).
+    """
+    parsed = parse_cursor(req.cursor)
+    state = _cursors.get(parsed[0]) if parsed else None
+    if state is None:
+        raise HTTPException(status_code=410, detail="Cursor expired or unknown; rerun the query")
+    token, offset = parsed
+
+    page_size = req.page_size or state.page_size
+    head, tail = state.window(offset, page_size)
+    ids = [cid for cid, _, _ in head] + [cid for cid, _, _ in tail]
+    rows_by_id = await run_db(_load_rows, ids)
+    texts = await run_db(_load_texts, ids)
+    ctx = state.context
+    page = head + [
+        (cid, score, _score_parts(rows_by_id[cid], sem, ctx))
+        for cid, score, sem in tail
+        if cid in rows_by_id
+    ]
+    items = [
+        _candidate_out(rows_by_id[cid], score, parts, ctx, texts.get(cid, ""))
+        for cid, score, parts in page
+        if cid in rows_by_id
+    ]
+    end = offset + len(head) + len(tail)
     return RecruiterSearchResponse(
-        query=req.prompt, filters=filters, total_returned=len(items), items=items
+        query=ctx["prompt"],
+        filters=ctx["filters"],
+        total_returned=len(items),
+        total_matched=state.total,
+        items=items,
+        next_cursor=make_cursor(token, end) if end < state.total else None,
     )
 
 
 # Optional: GET wrapper for quick manual testing from the browser bar
 @app.get("/recruiters/query")
-async def recruiter_query_get(prompt: str, top_k: int = 50, profile: Optional[str] = None):
+async def recruiter_query_get(
+    prompt: str,
+    top_k: int = Query(50, ge=1, le=settings.SEARCH_PAGE_MAX),
+    profile: Optional[str] = None,
+):
     """
     Convenience GET so you can test in the browser:
     /recruiters/query?prompt=mern%20developers%20from%20iit%20with%204%20years&top_k=10
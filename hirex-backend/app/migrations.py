@@ -0,0 +1,238 @@
+"""
+Numbered schema migrations, applied at startup by init_db() after create_all().
+
+create_all() only creates missing tables; everything that changes an existing
+table (columns, indexes, data moves) is a migration here. Each one is recorded in
+schema_migrations and never runs twice; all of them are also safe on a fresh DB
+that create_all() just built, so a new deployment simply runs the whole list.
+
+    python -m app.migrations status      # applied / pending
+    python -m app.migrations upgrade     # apply pending (startup does this too)
+    python -m app.migrations explain     # EXPLAIN QUERY PLAN for our query shapes
+"""
+import argparse
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from .db import Candidate, engine as default_engine
+
+logger = logging.getLogger("hirex.migrations")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    fn: Callable
+    transactional: bool = True  # False: fn(engine) manages its own transactions
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str, transactional: bool = True):
+    def deco(fn):
+        assert all(m.version != version for m in MIGRATIONS), f"duplicate migration {version}"
+        MIGRATIONS.append(Migration(version, name, fn, transactional))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+    return deco
+
+
+# -----------------------------------------------------------------------------
+# Migrations (append only; never edit one that has shipped)
+# -----------------------------------------------------------------------------
+@migration(1, "resume_text_out_of_row", transactional=False)
+def _m0001(eng: Engine) -> None:
+    from .services.textstore import migrate_inline_text
+    migrate_inline_text(eng)
+
+
+def _add_candidate_columns(conn: Connection, columns: Dict[str, str]) -> None:
+    """ALTER TABLE candidate ADD COLUMN for each {name: SQL type} the table lacks."""
+    have = {c["name"] for c in inspect(conn).get_columns("candidate")}
+    for name, ddl in columns.items():
+        if name not in have:
+            conn.exec_driver_sql(f'ALTER TABLE candidate ADD COLUMN "{name}" {ddl}')
+
+
+@migration(2, "candidate_file_columns")
+def _m0002(conn: Connection) -> None:
+    # Spelled out, not read off the model: later model columns belong to later migrations
+    _add_candidate_columns(conn, {
+        "file_sha256": "VARCHAR",
+        "file_size": "INTEGER",
+        "mime_type": "VARCHAR",
+        "file_name": "VARCHAR",
+    })
+
+
+# Hot lookup and range-filter columns (see services.search.structured_conditions)
+CANDIDATE_INDEXES: Dict[str, Tuple[str, ...]] = {
+    "ix_candidate_resume_path": ("resume_path",),
+    "ix_candidate_file_sha256": ("file_sha256",),
+    "ix_candidate_years_experience": ("years_experience",),
+    "ix_candidate_cgpa": ("cgpa",),
+    "ix_candidate_project_count": ("project_count",),
+    "ix_candidate_hackathon_wins": ("hackathon_wins",),
+    "ix_candidate_created_at": ("created_at",),
+}
+
+
+@migration(3, "candidate_indexes")
+def _m0003(conn: Connection) -> None:
+    for name, cols in CANDIDATE_INDEXES.items():
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON candidate ({', '.join(cols)})")
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("ANALYZE candidate")  # give the planner row-count stats for the new indexes
+
+
+@migration(4, "candidate_extractor_version")
+def _m0004(conn: Connection) -> None:
+    _add_candidate_columns(conn, {"extractor_version": "VARCHAR"})
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_candidate_extractor_version ON candidate (extractor_version)"
+    )
+
+
+# -----------------------------------------------------------------------------
+# Runner
+# -----------------------------------------------------------------------------
+def _ensure_table(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at VARCHAR NOT NULL)"
+    )
+
+
+def applied_versions(conn: Connection) -> Dict[int, str]:
+    _ensure_table(conn)
+    return {v: at for v, at in conn.exec_driver_sql("SELECT version, applied_at FROM schema_migrations")}
+
+
+def _record(conn: Connection, m: Migration) -> None:
+    conn.execute(
+        text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :at)"),
+        {"v": m.version, "n": m.name, "at": datetime.utcnow().isoformat(timespec="seconds")},
+    )
+
+
+def upgrade(eng: Engine = default_engine) -> List[int]:
+    """
+    Apply pending migrations in order; returns the versions applied. Each
+    transactional migration re-checks its version inside its own write transaction,
+    so workers starting together apply it exactly once.
+    """
+    done: List[int] = []
+    for m in MIGRATIONS:
+        if m.transactional:
+            with eng.begin() as conn:
+                if m.version in applied_versions(conn):
+                    continue
+                m.fn(conn)
+                _record(conn, m)
+        else:
+            with eng.begin() as conn:
+                if m.version in applied_versions(conn):
+                    continue
+            m.fn(eng)  # idempotent by construction
+            with eng.begin() as conn:
+                if m.version in applied_versions(conn):
+                    continue
+                _record(conn, m)
+        logger.info("Applied migration %04d_%s", m.version, m.name)
+        done.append(m.version)
+    return done
+
+
+# -----------------------------------------------------------------------------
+# EXPLAIN QUERY PLAN for the statements the app actually issues
+# -----------------------------------------------------------------------------
+EXPLAIN_PROMPTS = [
+    "backend engineer with 5 years experience",
+    "ml engineer cgpa 8.5",
+    "candidates with at least 3 projects",
+    "won 2 hackathons",
+    "mern developers from iit with minimum 4 years experience",
+]
+
+
+def query_shapes() -> List[Tuple[str, object]]:
+    from sqlmodel import select as sm_select
+    from .services.prompt_parser import plan_query
+    from .services.search import structured_conditions
+
+    shapes: List[Tuple[str, object]] = [
+        ("load pool by id", sm_select(Candidate).where(Candidate.id.in_([1, 2, 3]))),
+        ("candidate by resume_path", sm_select(Candidate).where(Candidate.resume_path == "x")),
+        ("candidate by file hash", sm_select(Candidate.id).where(Candidate.file_sha256 == "x")),
+        ("newest candidates", sm_select(Candidate.id).order_by(Candidate.created_at.desc()).limit(50)),
+    ]
+    for prompt in EXPLAIN_PROMPTS:
+        conds = structured_conditions(plan_query(prompt))
+        if conds:
+            shapes.append((f"filter-first: {prompt}", sm_select(Candidate).where(*conds).limit(2001)))
+    return shapes
+
+
+_INDEX_RE = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+
+def explain(eng: Engine = default_engine) -> List[dict]:
+    """Plan of each query shape: which index (if any) SQLite picks."""
+    if eng.dialect.name != "sqlite":
+        raise SystemExit("explain is implemented for SQLite only")
+    out = []
+    with eng.connect() as conn:
+        for label, stmt in query_shapes():
+            sql = str(stmt.compile(eng, compile_kwargs={"literal_binds": True}))
+            steps = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+            uses = sorted({m.group(1) for s in steps for m in _INDEX_RE.finditer(s)})
+            out.append({
+                "query": label,
+                "plan": steps,
+                "indexes": uses,
+                "full_scan": any(s.startswith("SCAN") and "USING" not in s for s in steps),
+            })
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="HireX schema migrations")
+    ap.add_argument("command", choices=["status", "upgrade", "explain"])
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "upgrade":
+        from .db import init_db
+        init_db()
+    if args.command in ("status", "upgrade"):
+        with default_engine.begin() as conn:
+            applied = applied_versions(conn)
+        for m in MIGRATIONS:
+            state = f"applied {applied[m.version]}" if m.version in applied else "pending"
+            print(f"{m.version:04d}_{m.name:<32} {state}")
+    else:
+        with default_engine.connect() as conn:
+            names = {r[0] for r in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'candidate'")}
+        used = set()
+        for r in explain():
+            used.update(r["indexes"])
+            flag = "  FULL SCAN" if r["full_scan"] else ""
+            print(f"{r['query']}{flag}")
+            for step in r["plan"]:
+                print(f"    {step}")
+        unused = sorted(n for n in names - used if not n.startswith("sqlite_autoindex"))
+        print(f"\nindexes used: {', '.join(sorted(used)) or '-'}")
+        print(f"indexes unused by these shapes: {', '.join(unused) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# app/routes/admin.py
+from __future__ import annotations
+
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+from ..config import settings
+from ..services import consistency, profiling, reextract
+from ..services.extraction import EXTRACTOR_VERSION
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """
+    Admin endpoints require X-Admin-Token to match ADMIN_TOKEN. Without a configured
+    token they do not exist (404): closed by default, not open by default.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not (x_admin_token and secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN)):
+        raise HTTPException(status_code=401, detail="Admin token required")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+# ---------------------------------------------------------------------
+# Request profiles (see services/profiling.py)
+# ---------------------------------------------------------------------
+def _profiling_on() -> None:
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+
+@router.get("/profiles", dependencies=[Depends(_profiling_on)])
+def list_profiles():
+    return {"profiles": profiling.list_profiles()}
+
+
+@router.get("/profiles/{name}", dependencies=[Depends(_profiling_on)])
+def download_profile(name: str):
+    p = profiling.profile_path(name)
+    if p is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(p, media_type="application/octet-stream", filename=p.name)
+
+
+# ---------------------------------------------------------------------
+# Re-extraction after lexicon/parser changes (see services/reextract.py)
+# ---------------------------------------------------------------------
+class ReextractIn(BaseModel):
+    all: bool = False                  # every row, not just stale ones
+    batch_size: Optional[int] = None
+    workers: Optional[int] = None
+
+
+@router.post("/reextract", status_code=202)
+def start_reextract(request: Request, body: Optional[ReextractIn] = None):
+    body = body or ReextractIn()
+    job = reextract.start_background(
+        body.batch_size, body.workers, body.all,
+        on_done=getattr(request.app.state, "after_reextract", None),
+    )
+    if job is None:
+        raise HTTPException(status_code=409, detail="A re-extraction is already running")
+    return job.status()
+
+
+@router.get("/reextract")
+def reextract_status():
+    job = reextract.current()
+    return {
+        "extractor_version": EXTRACTOR_VERSION,
+        "stale": reextract.count_stale(),
+        "job": job.status() if job else None,
+    }
+
+
+# ---------------------------------------------------------------------
+# FAISS index vs candidate table (see services/consistency.py)
+# ---------------------------------------------------------------------
+@router.get("/consistency")
+def consistency_report(request: Request, full: bool = False):
+    report = consistency.check(request.app.state.writer.index)
+    job = consistency.current()
+    return {
+        "report": report if full else consistency.summary(report),
+        "repair": job.status() if job else None,
+    }
+
+
+@router.post("/consistency/repair", status_code=202)
+def start_repair(request: Request, workers: Optional[int] = None):
+    state = request.app.state
+    job = consistency.start_background(
+        state.writer, state.encode, workers, on_done=getattr(state, "after_repair", None),
+    )
+    if job is None:
+        raise HTTPException(status_code=409, detail="A repair is already running")
+    return job.status()
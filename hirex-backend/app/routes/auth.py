@@ -2,21 +2,24 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
+import logging
 import secrets, string, uuid
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from pydantic import BaseModel, EmailStr, constr
 from sqlmodel import Session, select
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 
-from ..db import get_session
+from ..db import engine, read_engine, run_db, run_db_write
 from ..models_auth import User, AuthTxn
 from ..utils.mailer import send_otp_email
 from ..config import settings
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
+logger = logging.getLogger("hirex.auth")
 
 # ---------------------------------------------------------------------
 # Password hashing
@@ -84,119 +87,125 @@ class TxnOut(BaseModel):
     transaction_id: str
 
 # ---------------------------------------------------------------------
-# Routes
+# DB work (sync; the async routes below run writes through run_db_write and
+# reads through run_db). bcrypt runs on the plain threadpool before, never
+# inside, the single-writer slot.
 # ---------------------------------------------------------------------
-@router.post("/register", response_model=TxnOut)
-def register(payload: RegisterIn, session: Session = Depends(get_session)):
-
-    # Does a user already exist?
-    existing = session.exec(select(User).where(User.email == payload.email)).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already in use")
-
-    # Create user
-    user = User(email=payload.email, password_hash=_hash_password(payload.password))
-    session.add(user)
-    try:
-        session.commit()
-    except Exception as e:
-        # Likely read-only DB or other constraint
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    session.refresh(user)
-
-    # New OTP txn
-    txn = _new_txn(session, user.id, email=user.email, purpose="signup")
-
-    # Email the OTP in background (only if enabled)
-    print(f"[DEBUG] Register: SMTP_ENABLED={settings.SMTP_ENABLED}, Email={user.email}")
-    if settings.SMTP_ENABLED:
-        print("[DEBUG] Register: Sending OTP email (sync)")
+def _register(email: str, password_hash: str) -> Tuple[str, str, str]:
+    with Session(engine) as session:
+        # Does a user already exist?
+        existing = session.exec(select(User).where(User.email == email)).first()
+        if existing:
+            raise HTTPException(status_code=400, detail="Email already in use")
+
+        # Create user
+        user = User(email=email, password_hash=password_hash)
+        session.add(user)
         try:
-            send_otp_email(user.email, txn.otp_code)
+            session.commit()
         except Exception as e:
-            print(f"[ERROR] Register: Failed to send email: {e}")
-            # We don't raise here to allow the user to be created, but they might need to resend.
-    else:
-        print("[DEBUG] Register: SMTP disabled, skipping email")
+            # Likely read-only DB or other constraint
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        session.refresh(user)
+
+        # New OTP txn
+        txn = _new_txn(session, user.id, email=user.email, purpose="signup")
+        return user.email, txn.otp_code, txn.transaction_id
+
+
+def _find_user(email: str) -> Optional[Tuple[int, str, str]]:
+    """(id, email, password hash) of the user with this email, if any."""
+    with Session(read_engine) as session:
+        user = session.exec(select(User).where(User.email == email)).first()
+        return (user.id, user.email, user.password_hash or "") if user else None
+
+
+def _login(user_id: int, email: str) -> Tuple[str, str, str]:
+    with Session(engine) as session:
+        txn = _new_txn(session, user_id, email=email, purpose="login")
+        return email, txn.otp_code, txn.transaction_id
+
+
+def _verify(payload: VerifyIn) -> None:
+    with Session(engine) as session:
+        txn = session.exec(
+            select(AuthTxn).where(AuthTxn.transaction_id == payload.transaction_id)
+        ).first()
+        if not txn:
+            raise HTTPException(status_code=400, detail="Invalid transaction")
+
+        # Expiry check
+        if txn.expires_at and datetime.utcnow() > txn.expires_at:
+            raise HTTPException(status_code=400, detail="Code expired")
+
+        # Code check
+        if txn.otp_code != payload.code:
+            txn.attempts = (txn.attempts or 0) + 1
+            session.add(txn)
+            session.commit()
+            raise HTTPException(status_code=400, detail="Incorrect code")
+
+        # Success — in a real app you'd mint a JWT/cookie here.
+        # Optionally delete the txn or mark it used:
+        # session.delete(txn); session.commit()
+
+
+def _resend(payload: ResendIn) -> Tuple[str, str]:
+    with Session(engine) as session:
+        txn = session.exec(
+            select(AuthTxn).where(AuthTxn.transaction_id == payload.transaction_id)
+        ).first()
+        if not txn:
+            raise HTTPException(status_code=400, detail="Invalid transaction")
+
+        # Optionally refresh OTP & expiry
+        txn.otp_code = _make_otp()
+        txn.expires_at = datetime.utcnow() + timedelta(minutes=10)
+        txn.attempts = 0
+        session.add(txn)
+        session.commit()
+        return txn.email, txn.otp_code
 
-    return TxnOut(transaction_id=txn.transaction_id)
 
+async def _email_otp(label: str, email: str, code: str) -> None:
+    """Send outside the DB session, so a slow SMTP server never holds the writer."""
+    if not settings.SMTP_ENABLED:
+        return
+    try:
+        await run_in_threadpool(send_otp_email, email, code)
+    except Exception:
+        logger.exception("%s: failed to send OTP email to %s", label, email)
 
+# ---------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------
+@router.post("/register", response_model=TxnOut)
+async def register(payload: RegisterIn):
+    password_hash = await run_in_threadpool(_hash_password, payload.password)
+    email, code, transaction_id = await run_db_write(_register, payload.email, password_hash)
+    # Email the OTP (only if enabled); the user exists either way and can resend
+    await _email_otp("Register", email, code)
+    return TxnOut(transaction_id=transaction_id)
 
 
 @router.post("/login", response_model=TxnOut)
-def login(payload: LoginIn, session: Session = Depends(get_session)):
-
-    user = session.exec(select(User).where(User.email == payload.email)).first()
-    if not user or not _verify_password(payload.password, user.password_hash or ""):
+async def login(payload: LoginIn):
+    user = await run_db(_find_user, payload.email)
+    if not user or not await run_in_threadpool(_verify_password, payload.password, user[2]):
         raise HTTPException(status_code=400, detail="Invalid credentials")
-
-    txn = _new_txn(session, user.id, email=user.email, purpose="login")
-    txn = _new_txn(session, user.id, email=user.email, purpose="login")
-    print(f"[DEBUG] Login: SMTP_ENABLED={settings.SMTP_ENABLED}, Email={user.email}")
-    if settings.SMTP_ENABLED:
-        print("[DEBUG] Login: Sending OTP email (sync)")
-        try:
-            send_otp_email(user.email, txn.otp_code)
-        except Exception as e:
-            print(f"[ERROR] Login: Failed to send email: {e}")
-    else:
-        print("[DEBUG] Login: SMTP disabled, skipping email")
-    return TxnOut(transaction_id=txn.transaction_id)
-
-
+    email, code, transaction_id = await run_db_write(_login, user[0], user[1])
+    await _email_otp("Login", email, code)
+    return TxnOut(transaction_id=transaction_id)
 
 
 @router.post("/verify")
-def verify(payload: VerifyIn, session: Session = Depends(get_session)):
-    txn = session.exec(
-        select(AuthTxn).where(AuthTxn.transaction_id == payload.transaction_id)
-    ).first()
-    if not txn:
-        raise HTTPException(status_code=400, detail="Invalid transaction")
-
-    # Expiry check
-    if txn.expires_at and datetime.utcnow() > txn.expires_at:
-        raise HTTPException(status_code=400, detail="Code expired")
-
-    # Code check
-    if txn.otp_code != payload.code:
-        txn.attempts = (txn.attempts or 0) + 1
-        session.add(txn)
-        session.commit()
-        raise HTTPException(status_code=400, detail="Incorrect code")
-
-    # Success — in a real app you'd mint a JWT/cookie here.
-    # Optionally delete the txn or mark it used:
-    # session.delete(txn); session.commit()
+async def verify(payload: VerifyIn):
+    await run_db_write(_verify, payload)
     return {"ok": True}
 
-@router.post("/resend")
-def resend(payload: ResendIn, session: Session = Depends(get_session)):
-
-    txn = session.exec(
-        select(AuthTxn).where(AuthTxn.transaction_id == payload.transaction_id)
-    ).first()
-    if not txn:
-        raise HTTPException(status_code=400, detail="Invalid transaction")
-
-    # Optionally refresh OTP & expiry
-    txn.otp_code = _make_otp()
-    txn.expires_at = datetime.utcnow() + timedelta(minutes=10)
-    txn.attempts = 0
-    session.add(txn)
-    session.commit()
 
-    print(f"[DEBUG] Resend: SMTP_ENABLED={settings.SMTP_ENABLED}, Email={txn.email}")
-    if settings.SMTP_ENABLED:
-        print("[DEBUG] Resend: Sending OTP email (sync)")
-        try:
-            send_otp_email(txn.email, txn.otp_code)
-        except Exception as e:
-            print(f"[ERROR] Resend: Failed to send email: {e}")
-    else:
-        print("[DEBUG] Resend: SMTP disabled, skipping email")
+@router.post("/resend")
+async def resend(payload: ResendIn):
+    email, code = await run_db_write(_resend, payload)
+    await _email_otp("Resend", email, code)
     return {"status": "resent"}
-
-
-
@@ -1,5 +1,9 @@
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, conint
+
+from .config import settings
+
+PageSize = conint(ge=1, le=settings.SEARCH_PAGE_MAX)
 
 class UploadResponse(BaseModel):
     id: int
@@ -10,9 +14,18 @@ class UploadResponse(BaseModel):
 
 class RecruiterQueryRequest(BaseModel):
     prompt: str
-    top_k: int = 50
+    top_k: PageSize = 50                         # page size; more pages via next_cursor
     profile: Optional[str] = None                # "balanced", "cgpa-heavy", etc.
     candidate_ids: Optional[List[int]] = None    # restrict to subset (e.g., "from these resumes")
+    rerank: Optional[bool] = None                # cross-encoder rerank; None = server default
+    explain: bool = False                        # include the execution plan in the response
+
+class RecruiterBatchRequest(BaseModel):
+    queries: List[RecruiterQueryRequest]         # e.g. one per open requisition
+
+class RecruiterPageRequest(BaseModel):
+    cursor: str                                  # next_cursor from a previous response
+    page_size: Optional[PageSize] = None         # defaults to the original top_k
 
 class StructuredFilters(BaseModel):
     min_experience: float = 0
@@ -44,3 +57,9 @@ class RecruiterSearchResponse(BaseModel):
     filters: StructuredFilters
     total_returned: int
     items: List[CandidateOut]
+    total_matched: Optional[int] = None          # ranked candidates across all pages
+    next_cursor: Optional[str] = None            # pass to /recruiters/query/next
+    explain: Optional[Dict[str, Any]] = None     # set when the request asked for explain
+
+class RecruiterBatchResponse(BaseModel):
+    results: List[RecruiterSearchResponse]       # same order as the request queries
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+from .prompt_parser import normalize_prompt
+
+# Monotonic corpus generation: bumped on every ingest/delete so cached results
+# computed against an older corpus can never be served again.
+_generation = 0
+_gen_lock = threading.Lock()
+
+
+def corpus_generation() -> int:
+    return _generation
+
+
+def bump_generation() -> int:
+    global _generation
+    with _gen_lock:
+        _generation += 1
+        return _generation
+
+
+def search_key(
+    prompt: str,
+    profile: Optional[str],
+    candidate_ids: Optional[Iterable[int]],
+    top_k: int,
+    rerank: Optional[bool] = None,
+    explain: bool = False,
+) -> Tuple[Hashable, ...]:
+    ids = tuple(sorted(set(candidate_ids))) if candidate_ids else None
+    return (normalize_prompt(prompt), profile or "", ids, int(top_k), rerank, explain)
+
+
+class ResultCache:
+    """Bounded LRU keyed by (corpus generation, key). Stale generations simply miss."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[int, Hashable], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        k = (corpus_generation(), key)
+        with self._lock:
+            val = self._data.get(k)
+            if val is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(k)
+            self.hits += 1
+            return val
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        gen = corpus_generation() if generation is None else generation
+        with self._lock:
+            self._data[(gen, key)] = value
+            self._data.move_to_end((gen, key))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,296 @@
+"""
+FAISS index <-> candidate table consistency.
+
+The index and the DB are written separately, so they can drift: a crash between
+the DB commit and the index save leaves candidates without vectors, a failed
+commit after an index add leaves orphan vectors, a torn save leaves a shard whose
+vector count and meta list disagree. check() diffs the two id sets; repair()
+fixes what it finds on the live index:
+
+- orphans (vectors whose candidate is gone), superseded duplicates, vectors in
+  the wrong shard and torn shards: the shard is compacted off to the side and
+  hot-swapped in through the IndexWriter (ShardedFaissIndex.swap_shard),
+  searches keep running;
+- missing vectors: the stored text is re-embedded on a small thread pool and
+  added through the IndexWriter. Candidates with no text are reported but left
+  alone (nothing to embed).
+
+    python -m app.services.consistency            # report (API may be running)
+    python -m app.services.consistency --repair   # offline repair (API stopped)
+
+With the API up, use GET /admin/consistency and POST /admin/consistency/repair.
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlmodel import Session, select
+
+from ..config import settings
+from ..db import Candidate, ResumeText, read_engine
+from .index_writer import IndexWriter
+from .indexer import ShardedFaissIndex, load_saved
+from .textstore import load_texts
+
+logger = logging.getLogger("hirex.consistency")
+
+SAMPLE = 20  # ids listed per problem in summaries
+IN_FLIGHT_S = 60  # candidates younger than this may still be waiting for their vector
+
+
+def check(index: ShardedFaissIndex) -> dict:
+    """
+    Full diff (every id). Use summary() for something to log or return over HTTP.
+
+    The index is read before the DB: uploads commit their row first and add the
+    vector afterwards, so every id already in the index is in the DB by the time
+    it is read, and a fresh upload can never look like an orphan. The converse
+    (row committed, vector not yet added) is held back as in_flight, not missing.
+    """
+    indexed: Set[int] = set()
+    duplicates: Dict[int, List[int]] = {}
+    misplaced: Dict[int, List[int]] = {}
+    torn: List[int] = []
+    shard_ids: Dict[int, List[int]] = {}
+    with index.reading():  # between group commits, not halfway through one
+        for key, shard in sorted(dict(index.shards).items()):
+            n = min(shard.index.ntotal, len(shard.meta))
+            if shard.index.ntotal != len(shard.meta):
+                torn.append(key)
+            shard_ids[key] = [m["id"] for m in shard.meta[:n]]
+    for key, ids in shard_ids.items():
+        seen: Set[int] = set()
+        for i in ids:
+            if i in seen:
+                duplicates.setdefault(key, []).append(i)
+            seen.add(i)
+            if index.shard_of(i) != key:
+                misplaced.setdefault(key, []).append(i)
+        indexed |= seen
+
+    cutoff = datetime.utcnow() - timedelta(seconds=IN_FLIGHT_S)
+    with Session(read_engine) as s:
+        db_ids: Set[int] = set(s.exec(select(Candidate.id)).all())
+        with_text: Set[int] = set(s.exec(select(ResumeText.candidate_id).where(ResumeText.size > 0)).all())
+        recent: Set[int] = set(s.exec(select(Candidate.id).where(Candidate.created_at > cutoff)).all())
+
+    unindexed = (db_ids & with_text) - indexed
+    return {
+        "db_candidates": len(db_ids),
+        "indexed_ids": len(indexed),
+        "orphans": sorted(indexed - db_ids),
+        "missing": sorted(unindexed - recent),
+        "in_flight": sorted(unindexed & recent),
+        "no_text": sorted(db_ids - with_text - indexed),
+        "duplicates": duplicates,
+        "misplaced": misplaced,
+        "torn_shards": torn,
+    }
+
+
+def is_consistent(report: dict) -> bool:
+    return not (report["orphans"] or report["missing"] or report["duplicates"]
+                or report["misplaced"] or report["torn_shards"])
+
+
+def summary(report: dict) -> dict:
+    dup = sum(len(v) for v in report["duplicates"].values())
+    mis = sorted(i for v in report["misplaced"].values() for i in v)
+    return {
+        "consistent": is_consistent(report),
+        "db_candidates": report["db_candidates"],
+        "indexed_ids": report["indexed_ids"],
+        "orphans": {"count": len(report["orphans"]), "sample": report["orphans"][:SAMPLE]},
+        "missing": {"count": len(report["missing"]), "sample": report["missing"][:SAMPLE]},
+        "in_flight": len(report["in_flight"]),
+        "no_text": {"count": len(report["no_text"]), "sample": report["no_text"][:SAMPLE]},
+        "duplicates": dup,
+        "misplaced": {"count": len(mis), "sample": mis[:SAMPLE]},
+        "torn_shards": report["torn_shards"],
+    }
+
+
+# -----------------------------------------------------------------------------
+# Repair
+# -----------------------------------------------------------------------------
+class RepairJob:
+    """Progress of one repair; safe to read from another thread while it runs."""
+
+    def __init__(self, workers: int, batch_size: int):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.state = "pending"          # pending | running | done | failed
+        self.before: Optional[dict] = None
+        self.after: Optional[dict] = None
+        self.shards_rebuilt = 0
+        self.to_embed = 0
+        self.embedded = 0
+        self.skipped_empty = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def status(self) -> dict:
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        return {
+            "state": self.state,
+            "shards_rebuilt": self.shards_rebuilt,
+            "to_embed": self.to_embed,
+            "embedded": self.embedded,
+            "skipped_empty": self.skipped_empty,
+            "elapsed_s": round(elapsed, 1),
+            "before": self.before,
+            "after": self.after,
+            "error": self.error,
+        }
+
+
+def _rebuild_shards(writer: IndexWriter, report: dict) -> int:
+    """Compact every shard with orphans / duplicates / strays / a torn save, then swap."""
+    index = writer.index
+    orphans = set(report["orphans"])
+    keys = set(report["duplicates"]) | set(report["misplaced"]) | set(report["torn_shards"])
+    keys |= {index.shard_of(i) for i in orphans}
+    for key, strays in report["misplaced"].items():
+        # move before dropping: re-add under the right shard (latest vector wins there)
+        shard = index.shards.get(key)
+        strays = [i for i in strays if i not in orphans]
+        if shard is not None and strays:
+            found, vecs = shard.vectors_for(strays)
+            with shard.lock:
+                latest = {m["id"]: m for m in shard.meta}
+            writer.add(vecs, [latest[i] for i in found])
+    for key in sorted(keys):
+        shard = index.shards.get(key)
+        if shard is None:
+            continue
+        drop = orphans | set(report["misplaced"].get(key, ()))
+        copy = shard.compacted(drop)  # built here, off the writer thread
+        writer.call(lambda idx, key=key, copy=copy: idx.swap_shard(key, copy))
+    return len(keys)
+
+
+def _embed_missing(
+    writer: IndexWriter,
+    encode: Callable[[Sequence[str]], np.ndarray],
+    ids: List[int],
+    job: RepairJob,
+) -> None:
+    def work(batch: List[int]) -> Tuple[int, int]:
+        with Session(read_engine) as s:
+            texts = load_texts(s, batch)
+            names = dict(s.exec(select(Candidate.id, Candidate.name).where(Candidate.id.in_(batch))).all())
+        todo = [i for i in batch if (texts.get(i) or "").strip() and i in names]
+        if not todo:
+            return 0, len(batch)
+        vecs = encode([texts[i] for i in todo])
+
+        def add_absent(index: ShardedFaissIndex) -> int:
+            # decided on the writer thread: a vector that arrived meanwhile is not duplicated
+            rows = [r for r, i in enumerate(todo) if not index.has(i)]
+            if rows:
+                index.add(vecs[rows], [{"id": todo[r], "name": names[todo[r]]} for r in rows])
+            return len(rows)
+
+        return writer.call(add_absent), len(batch) - len(todo)
+
+    batches = [ids[i: i + job.batch_size] for i in range(0, len(ids), job.batch_size)]
+    with ThreadPoolExecutor(max_workers=job.workers, thread_name_prefix="hirex-repair") as pool:
+        for embedded, skipped in pool.map(work, batches):
+            job.embedded += embedded
+            job.skipped_empty += skipped
+
+
+def repair(
+    writer: IndexWriter,
+    encode: Callable[[Sequence[str]], np.ndarray],
+    job: Optional[RepairJob] = None,
+) -> RepairJob:
+    job = job or RepairJob(settings.INDEX_REPAIR_WORKERS, settings.INDEX_REPAIR_BATCH)
+    job.state, job.started_at = "running", time.time()
+    try:
+        report = check(writer.index)
+        job.before = summary(report)
+        job.shards_rebuilt = _rebuild_shards(writer, report)
+        job.to_embed = len(report["missing"])
+        _embed_missing(writer, encode, report["missing"], job)
+        writer.flush()
+        job.after = summary(check(writer.index))
+        job.state = "done"
+    except Exception as e:
+        job.state, job.error = "failed", f"{type(e).__name__}: {e}"
+        logger.exception("Index repair failed")
+    finally:
+        job.finished_at = time.time()
+    logger.info("Index repair %s: %s", job.state, {k: v for k, v in job.status().items() if k not in ("before", "after")})
+    return job
+
+
+# -----------------------------------------------------------------------------
+# In-process background runner (admin endpoint); one repair at a time
+# -----------------------------------------------------------------------------
+_current: Optional[RepairJob] = None
+_current_lock = threading.Lock()
+
+
+def start_background(
+    writer: IndexWriter,
+    encode: Callable[[Sequence[str]], np.ndarray],
+    workers: Optional[int] = None,
+    on_done: Optional[Callable[[RepairJob], None]] = None,
+) -> Optional[RepairJob]:
+    """Start a repair on a daemon thread; None if one is already running."""
+    global _current
+    with _current_lock:
+        if _current is not None and _current.state == "running":
+            return None
+        job = RepairJob(workers or settings.INDEX_REPAIR_WORKERS, settings.INDEX_REPAIR_BATCH)
+        job.state = "running"  # claim the slot before the thread starts
+        _current = job
+
+    def _target():
+        repair(writer, encode, job)
+        if on_done:
+            on_done(job)
+
+    threading.Thread(target=_target, name="hirex-index-repair", daemon=True).start()
+    return job
+
+
+def current() -> Optional[RepairJob]:
+    return _current
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Check (and repair) the FAISS index against the candidate table")
+    ap.add_argument("--repair", action="store_true", help="fix what is found; stop the API first")
+    ap.add_argument("--workers", type=int, default=settings.INDEX_REPAIR_WORKERS)
+    ap.add_argument("--full", action="store_true", help="print every id, not a sample")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    from ..db import init_db
+    from .embeddings import Embedder
+    init_db()
+    if args.repair:
+        embedder = Embedder(settings.EMBEDDING_MODEL)
+        writer = IndexWriter(ShardedFaissIndex.load(embedder.encode(["test"]).shape[1]))
+        job = repair(writer, embedder.encode, RepairJob(args.workers, settings.INDEX_REPAIR_BATCH))
+        print(json.dumps(job.status(), indent=2))
+        return
+    index = load_saved()
+    if index is None:
+        print("no index on disk yet")
+        return
+    report = check(index)
+    print(json.dumps(report if args.full else summary(report), indent=2))
+
+
+if __name__ == "__main__":
+    main()
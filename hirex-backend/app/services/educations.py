@@ -1,7 +1,8 @@
 import json
-import re
 from typing import List, Dict
 
+from .skills import compiled_terms
+
 ELITE_INSTITUTES = {
     "IIT": ["iit", "i.i.t", "indian institute of technology"],
     "NIT": ["nit", "n.i.t", "national institute of technology"],
@@ -19,22 +20,25 @@ MAJORS = [
     "information technology", "it", "ai", "ml", "data science", "electronics"
 ]
 
+INSTITUTE_PATTERNS = {canon: compiled_terms(variants) for canon, variants in ELITE_INSTITUTES.items()}
+DEGREE_PATTERNS = compiled_terms(DEGREES)
+MAJOR_PATTERNS = compiled_terms(MAJORS)
+
 def extract_institutions(text: str) -> List[str]:
     low = text.lower()
     out = set()
-    for canon, variants in ELITE_INSTITUTES.items():
-        for v in variants:
-            if re.search(rf"\b{re.escape(v)}\b", low):
-                out.add(canon); break
+    for canon, patterns in INSTITUTE_PATTERNS.items():
+        if any(rx.search(low) for _, rx in patterns):
+            out.add(canon)
     return sorted(out)
 
 def extract_degrees(text: str) -> List[str]:
     low = text.lower()
-    return sorted({d for d in DEGREES if re.search(rf"\b{re.escape(d)}\b", low)})
+    return sorted({d for d, rx in DEGREE_PATTERNS if rx.search(low)})
 
 def extract_majors(text: str) -> List[str]:
     low = text.lower()
-    return sorted({m for m in MAJORS if re.search(rf"\b{re.escape(m)}\b", low)})
+    return sorted({m for m, rx in MAJOR_PATTERNS if rx.search(low)})
 
 def to_json(lst: List[str]) -> str:
     return json.dumps(sorted(list(set(lst))), ensure_ascii=False)
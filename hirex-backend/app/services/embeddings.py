@@ -1,9 +1,118 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Sequence, Tuple
+
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from ..config import settings
+from .metrics import EMBED_BATCH, EMBED_LATENCY, EMBED_QUEUE_WAIT
+
+try:
+    import torch
+except Exception:
+    torch = None
+
+_Pending = Tuple[List[str], Future, float]  # (texts, result future, enqueue time)
+
+
+def _torch_threads(requested: int) -> int:
+    """0 = share the cores between uvicorn workers (WEB_CONCURRENCY) instead of each taking all."""
+    if requested:
+        return requested
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1") or 1)
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
 class Embedder:
-    def __init__(self, model_name: str):
+    """
+    Sentence-transformer with dynamic micro-batching. Small concurrent encode calls are
+    queued and coalesced into one forward pass (up to max_batch texts, waiting at most
+    max_wait_ms after the first arrives); each caller gets its own slice back through a
+    future. Calls already at max_batch skip the queue. At most max_concurrency forward
+    passes run at once, on a bounded number of torch threads.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        torch_threads: Optional[int] = None,
+    ):
+        if torch is not None:
+            torch.set_num_threads(_torch_threads(
+                settings.EMBED_TORCH_THREADS if torch_threads is None else torch_threads
+            ))
         self.model = SentenceTransformer(model_name)
+        self.max_batch = max_batch or settings.EMBED_MAX_BATCH
+        self.max_wait = (settings.EMBED_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+        self._infer = threading.BoundedSemaphore(max_concurrency or settings.EMBED_MAX_CONCURRENCY)
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._batcher = threading.Thread(target=self._batch_loop, name="hirex-embed", daemon=True)
+        self._batcher.start()
+
+    # ---- public API ----
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        texts = list(texts)
+        if len(texts) >= self.max_batch:
+            return self._forward(texts)
+        return self._enqueue(texts).result()
+
+    async def aencode(self, texts: Sequence[str]) -> np.ndarray:
+        """encode() for async handlers: waits without blocking the event loop."""
+        texts = list(texts)
+        if len(texts) >= self.max_batch:
+            return await asyncio.to_thread(self._forward, texts)
+        return await asyncio.wrap_future(self._enqueue(texts))
+
+    # ---- internals ----
+    def _forward(self, texts: List[str]) -> np.ndarray:
+        with self._infer:
+            t0 = time.perf_counter()
+            vecs = np.array(self.model.encode(texts, normalize_embeddings=True))
+        EMBED_LATENCY.observe(time.perf_counter() - t0)
+        EMBED_BATCH.observe(len(texts))
+        return vecs
+
+    def _enqueue(self, texts: List[str]) -> Future:
+        fut: Future = Future()
+        self._queue.put((texts, fut, time.perf_counter()))
+        return fut
+
+    def _collect(self) -> List[_Pending]:
+        """Block for the first request, then gather more until the batch cap or wait window."""
+        batch = [self._queue.get()]
+        n = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while n < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            n += len(item[0])
+        return batch
 
-    def encode(self, texts):
-        return np.array(self.model.encode(texts, normalize_embeddings=True))
+    def _batch_loop(self) -> None:
+        while True:
+            batch = self._collect()
+            now = time.perf_counter()
+            for _, _, t_enq in batch:
+                EMBED_QUEUE_WAIT.observe(now - t_enq)
+            try:
+                vecs = self._forward([t for texts, _, _ in batch for t in texts])
+            except Exception as e:
+                for _, fut, _ in batch:
+                    fut.set_exception(e)
+                continue
+            i = 0
+            for texts, fut, _ in batch:
+                fut.set_result(vecs[i: i + len(texts)])
+                i += len(texts)
@@ -0,0 +1,158 @@
+"""
+Resume text -> candidate fields, versioned.
+
+Every candidate row records the EXTRACTOR_VERSION that produced its derived
+fields: "<EXTRACTOR_REVISION>-<lexicon hash>". The hash covers the lexicons
+(skills, aliases, institutes, degrees, majors, roles) and every compiled regex
+in the parser, so extending any of them changes the version automatically and
+app.services.reextract picks the affected rows up. Bump EXTRACTOR_REVISION for
+logic changes the hash cannot see (code in the extract_* functions).
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import educations, parser, roles, skills
+from .skills import (
+    extract_skills as sk_extract,
+    extract_soft_skills as sk_soft,
+    to_json as to_json_list,
+)
+from .educations import (
+    extract_institutions as edu_extract,
+    extract_degrees,
+    extract_majors,
+    to_json as to_json_edu,
+)
+from .roles import extract_roles_from_resume
+
+EXTRACTOR_REVISION = 1
+
+_LEXICONS = {
+    "skills": ("MERN_EXPANSION", "HARD_SKILLS", "ALIASES", "SOFT_SKILLS"),
+    "educations": ("ELITE_INSTITUTES", "DEGREES", "MAJORS"),
+    "roles": ("ROLES", "ROLE_ALIASES", "SKILL_TO_ROLES", "ROLE_TO_CORE_SKILLS"),
+}
+
+
+def _canonical(obj):
+    if isinstance(obj, (set, frozenset)):
+        return sorted(_canonical(x) for x in obj)
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(x) for x in obj]
+    return obj
+
+
+def _lexicon_hash() -> str:
+    modules = {"skills": skills, "educations": educations, "roles": roles}
+    payload = {
+        f"{mod}.{name}": _canonical(getattr(modules[mod], name, None))
+        for mod, names in _LEXICONS.items()
+        for name in names
+    }
+    payload["parser.patterns"] = sorted(
+        f"{name}:{val.flags}:{val.pattern}" for name, val in vars(parser).items() if isinstance(val, re.Pattern)
+    )
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:12]
+
+
+EXTRACTOR_VERSION = f"{EXTRACTOR_REVISION}-{_lexicon_hash()}"
+
+# Columns derived from the text (what re-extraction rewrites); file/identity-of-upload
+# columns (resume_path, file_*, created_at) are never touched.
+DERIVED_FIELDS = (
+    "name", "email", "phone", "location", "linkedin", "github", "portfolio",
+    "years_experience", "cgpa", "project_count", "hackathon_wins", "extracurricular_score",
+    "leadership_score", "por_score", "notice_period_months", "skills", "soft_skills",
+    "institutions", "degrees", "majors", "languages", "certifications", "achievements",
+    "publications", "education_entries", "experience_entries", "projects", "keywords",
+    "education_text", "roles", "extractor_version",
+)
+
+
+def build_candidate_record(text: str, path: str, filename: Optional[str] = None) -> dict:
+    """
+    Candidate columns from resume text. `path` is the stored blob (resume_path);
+    `filename`, the name it was uploaded under, stands in for the name when the
+    text has none (blob paths are content hashes).
+    """
+    display = filename or Path(path).name
+    meta = parser.rough_parse(text or display)
+    skills_ = sk_extract(text or "")
+    soft_sk = sk_soft(text or "")
+    insts = edu_extract(text or "")
+    degrees = extract_degrees(text or "")
+    majors = extract_majors(text or "")
+
+    projects = parser.extract_projects(text or "")
+    exp_entries, computed_years = parser.extract_experience(text or "")
+    cgpa = parser.extract_cgpa(text or "")
+    hackwins = parser.extract_hackathons(text or "")
+    extra = parser.extracurricular_score(text or "")
+    por = parser.por_score(text or "")
+    lead = parser.leadership_score(text or "")
+    certs = parser.extract_certifications(text or "")
+    achv = parser.extract_achievements(text or "")
+    pubs = parser.extract_publications(text or "")
+
+    years = meta.get("years_experience") or computed_years or 0.0
+
+    # derive roles (from titles + skills)
+    roles_ = extract_roles_from_resume(text or "", skills_)
+
+    rec = dict(
+        name=meta.get("name") or Path(display).stem,
+        email=meta.get("email"),
+        phone=meta.get("phone"),
+        location=None,
+        linkedin=meta.get("linkedin"),
+        github=meta.get("github"),
+        portfolio=meta.get("portfolio"),
+        years_experience=years,
+        cgpa=cgpa,
+        project_count=len(projects),
+        hackathon_wins=hackwins,
+        extracurricular_score=extra,
+        leadership_score=lead,
+        por_score=por,
+        notice_period_months=None,
+        skills=to_json_list(skills_),
+        soft_skills=to_json_list(soft_sk),
+        institutions=to_json_edu(insts),
+        degrees=to_json_edu(degrees),
+        majors=to_json_edu(majors),
+        languages="[]",
+        certifications=json.dumps(certs, ensure_ascii=False),
+        achievements=json.dumps(achv, ensure_ascii=False),
+        publications=json.dumps(pubs, ensure_ascii=False),
+        education_entries=json.dumps([], ensure_ascii=False),  # simple for MVP
+        experience_entries=json.dumps(exp_entries, ensure_ascii=False),
+        projects=json.dumps(projects, ensure_ascii=False),
+        keywords="[]",
+        education_text=None,
+        resume_path=path,
+        parsed_text=text or "",
+        roles=json.dumps(roles_, ensure_ascii=False),  # store roles
+        extractor_version=EXTRACTOR_VERSION,
+    )
+    return rec
+
+
+def derive_fields(items: List[Tuple[int, str, str, Optional[str]]]) -> List[Tuple[int, Dict]]:
+    """
+    Process-pool entry point: (id, text, resume_path, file_name) -> (id, derived columns).
+    Top-level and pure so it pickles; a failing document is skipped, not fatal.
+    """
+    out = []
+    for cid, text, path, filename in items:
+        try:
+            rec = build_candidate_record(text, path, filename)
+        except Exception:
+            continue
+        out.append((cid, {k: rec[k] for k in DERIVED_FIELDS}))
+    return out
@@ -0,0 +1,212 @@
+"""
+Single writer for the FAISS index, with group commit.
+
+Handlers never touch the index directly: they submit adds / removes (or a
+maintenance callable) and wait on a future. One thread drains the queue,
+gathering everything that arrives within INDEX_WRITE_MAX_WAIT_MS of the first
+request (up to INDEX_WRITE_MAX_BATCH vectors), applies the group under the
+index's write lock (readers see all of it or none of it) and then saves the
+touched shards once for the whole group. Futures resolve after that save, so an
+acknowledged write is on disk.
+
+Requests are validated before the group is applied, and a request that fails
+fails only its own future. A remove is a group of its own: the compacted shard
+copies are built before the write lock is taken, so searches are not held up
+while they are.
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+from .indexer import FaissIndex, ShardedFaissIndex
+from .metrics import INDEX_COMMIT_LATENCY, INDEX_GROUP_SIZE, INDEX_WRITE_WAIT
+
+# (kind, payload, result future, enqueue time); kind is "add" | "remove" | "call"
+_Op = Tuple[str, object, Future, float]
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class IndexWriter:
+    def __init__(
+        self,
+        index: ShardedFaissIndex,
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ):
+        self.index = index
+        self.max_batch = max_batch or settings.INDEX_WRITE_MAX_BATCH
+        self.max_wait = (settings.INDEX_WRITE_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+        self.groups = 0                 # commits so far (one save each)
+        self.ops = 0                    # requests applied so far
+        self._queue: "queue.Queue[_Op]" = queue.Queue()
+        self._held: Optional[_Op] = None  # a remove that has to open the next group
+        self._thread = threading.Thread(target=self._loop, name="hirex-index-writer", daemon=True)
+        self._thread.start()
+
+    # ---- public API ----
+    def add(self, vectors: np.ndarray, metas: List[dict]) -> None:
+        self._submit("add", (vectors, metas)).result()
+
+    async def aadd(self, vectors: np.ndarray, metas: List[dict]) -> None:
+        """add() for async handlers: waits without blocking the event loop."""
+        await asyncio.wrap_future(self._submit("add", (vectors, metas)))
+
+    def remove(self, ids: Iterable[int]) -> None:
+        self._submit("remove", list(ids)).result()
+
+    def call(self, fn: Callable[[ShardedFaissIndex], object]):
+        """Run fn(index) on the writer thread, inside a group (e.g. swapping in a rebuilt shard)."""
+        return self._submit("call", fn).result()
+
+    def flush(self) -> None:
+        """Wait until everything submitted so far is applied and saved."""
+        self.call(lambda index: None)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    # ---- internals ----
+    def _submit(self, kind: str, payload) -> Future:
+        fut: Future = Future()
+        self._queue.put((kind, payload, fut, time.perf_counter()))
+        return fut
+
+    @staticmethod
+    def _weight(op: _Op) -> int:
+        kind, payload = op[0], op[1]
+        if kind == "add":
+            return len(payload[1])
+        return len(payload) if kind == "remove" else 1
+
+    def _collect(self) -> List[_Op]:
+        """
+        Block for the first request, then gather more until the size cap or wait
+        window. A remove always travels alone (see _prepare).
+        """
+        if self._held is not None:
+            first, self._held = self._held, None
+        else:
+            first = self._queue.get()
+        group = [first]
+        if first[0] == "remove":
+            return group
+        n = self._weight(first)
+        deadline = time.perf_counter() + self.max_wait
+        while n < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                op = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if op[0] == "remove":
+                self._held = op
+                break
+            group.append(op)
+            n += self._weight(op)
+        return group
+
+    def _check_add(self, payload) -> Optional[Exception]:
+        vectors, metas = payload
+        if not isinstance(vectors, np.ndarray) or vectors.ndim != 2:
+            return ValueError("vectors must be a 2-D array")
+        if vectors.shape[0] != len(metas):
+            return ValueError(f"{vectors.shape[0]} vectors for {len(metas)} metas")
+        if len(metas) and vectors.shape[1] != self.index.dim:
+            return ValueError(f"vector dimension {vectors.shape[1]}, index has {self.index.dim}")
+        if not all(isinstance(m, dict) and isinstance(m.get("id"), int) for m in metas):
+            return ValueError("every meta needs an integer 'id'")
+        return None
+
+    def _prepare(self, group: List[_Op]) -> Tuple[List[object], Dict[int, Dict[int, FaissIndex]]]:
+        """
+        Outside the write lock: validate adds and build the compacted copies a
+        remove swaps in. Nothing else mutates the index meanwhile (this is the only
+        writer), so the copies are still current when they are swapped.
+        """
+        results: List[object] = [None] * len(group)
+        copies: Dict[int, Dict[int, FaissIndex]] = {}
+        for i, (kind, payload, _, _) in enumerate(group):
+            try:
+                if kind == "add":
+                    err = self._check_add(payload)
+                    if err is not None:
+                        results[i] = _Failed(err)
+                elif kind == "remove":
+                    copies[i] = self.index.removal_copies(payload)
+            except Exception as e:
+                results[i] = _Failed(e)
+        return results, copies
+
+    def _apply(self, group: List[_Op], results: List[object], copies: Dict[int, Dict[int, FaissIndex]]) -> None:
+        """
+        Apply in submission order; consecutive valid adds go in as one batch. A
+        failing request only fails its own future (its exception is its result).
+        """
+        i = 0
+        while i < len(group):
+            kind, payload = group[i][0], group[i][1]
+            if isinstance(results[i], _Failed):
+                i += 1
+                continue
+            if kind == "add":
+                j = i
+                while j < len(group) and group[j][0] == "add":
+                    j += 1
+                run = [k for k in range(i, j) if not isinstance(results[k], _Failed) and len(group[k][1][1])]
+                if run:
+                    try:
+                        self.index.add(np.vstack([group[k][1][0] for k in run]).astype("float32"),
+                                       [m for k in run for m in group[k][1][1]])
+                    except Exception as e:  # validated above; should not happen
+                        for k in run:
+                            results[k] = _Failed(e)
+                i = j
+                continue
+            try:
+                if kind == "remove":
+                    for key, copy in copies[i].items():
+                        self.index.swap_shard(key, copy)
+                else:
+                    results[i] = payload(self.index)
+            except Exception as e:
+                results[i] = _Failed(e)
+            i += 1
+
+    def _loop(self) -> None:
+        while True:
+            group = self._collect()
+            now = time.perf_counter()
+            for op in group:
+                INDEX_WRITE_WAIT.observe(now - op[3])
+            INDEX_GROUP_SIZE.observe(len(group))
+            results, copies = self._prepare(group)
+            try:
+                with self.index.writing():
+                    self._apply(group, results, copies)
+                t0 = time.perf_counter()
+                self.index.save()  # outside the write lock: searches run during the fsync
+                INDEX_COMMIT_LATENCY.observe(time.perf_counter() - t0)
+            except Exception as e:
+                # not durable, so nobody is acknowledged; what was applied is retried on the next save
+                for op in group:
+                    if not op[2].done():
+                        op[2].set_exception(e)
+                continue
+            self.groups += 1
+            self.ops += len(group)
+            for op, result in zip(group, results):
+                if isinstance(result, _Failed):
+                    op[2].set_exception(result.error)
+                else:
+                    op[2].set_result(result)
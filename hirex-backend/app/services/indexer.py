@@ -1,21 +1,55 @@
+import heapq
 import json
 import os
-from typing import List, Tuple
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 import faiss
 import numpy as np
 from ..config import settings
+from .metrics import FAISS_SEARCH
 
 class FaissIndex:
-    def __init__(self, dim: int):
+    def __init__(self, dim: int, index_path: Optional[str] = None, meta_path: Optional[str] = None):
         self.dim = dim
         self.index = faiss.IndexFlatIP(dim)
         self.meta: List[dict] = []
+        self._pos: Dict[int, int] = {}  # candidate id -> row in the flat index
+        self.index_path = index_path or settings.FAISS_INDEX_PATH
+        self.meta_path = meta_path or settings.FAISS_META_PATH
+        self.lock = threading.RLock()
+        self.retired = False            # replaced by a rebuilt copy; writers must re-resolve the shard
+        self.source_len: Optional[int] = None  # compacted copies: source rows covered (see swap_shard)
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal
+
+    def ids(self) -> List[int]:
+        with self.lock:
+            return [m["id"] for m in self.meta]
 
     def add(self, vectors: np.ndarray, metas: List[dict]) -> None:
         assert vectors.shape[0] == len(metas)
         if vectors.size == 0: return
-        self.index.add(vectors.astype("float32"))
-        self.meta.extend(metas)
+        with self.lock:
+            self.index.add(vectors.astype("float32"))
+            for m in metas:
+                self._pos[m["id"]] = len(self.meta)
+                self.meta.append(m)
+
+    def vectors_for(self, ids: Sequence[int]) -> Tuple[List[int], np.ndarray]:
+        """Stored vectors for the given candidate ids (ids without a vector are skipped)."""
+        with self.lock:
+            found = [i for i in ids if i in self._pos]
+            if not found:
+                return [], np.zeros((0, self.dim), dtype="float32")
+            rows = np.array([self._pos[i] for i in found], dtype="int64")
+            return found, self.index.reconstruct_batch(rows)
 
     def search(self, vectors: np.ndarray, top_k: int) -> Tuple[np.ndarray, List[List[dict]]]:
         if self.index.ntotal == 0:
@@ -32,19 +66,312 @@ class FaissIndex:
             metas.append(row_metas)
         return D, metas
 
+    def compacted(self, drop_ids: Iterable[int] = ()) -> "FaissIndex":
+        """
+        Copy of this index without `drop_ids` and without superseded duplicates
+        (the latest vector per id wins). Built off to the side; swap it in afterwards.
+        """
+        drop = set(drop_ids)
+        with self.lock:
+            n = min(self.index.ntotal, len(self.meta))  # a torn save can leave these unequal
+            keep = [i for i, m in enumerate(self.meta[:n])
+                    if m["id"] not in drop and self._pos.get(m["id"]) == i]
+            vecs = (self.index.reconstruct_batch(np.array(keep, dtype="int64"))
+                    if keep else np.zeros((0, self.dim), dtype="float32"))
+            metas = [self.meta[i] for i in keep]
+            source_len = len(self.meta)
+        out = FaissIndex(self.dim, self.index_path, self.meta_path)
+        out.add(vecs, metas)
+        out.source_len = source_len
+        return out
+
     def save(self) -> None:
-        faiss.write_index(self.index, settings.FAISS_INDEX_PATH)
-        with open(settings.FAISS_META_PATH, "w", encoding="utf-8") as f:
-            for m in self.meta:
-                f.write(json.dumps(m, ensure_ascii=False) + "\n")
+        # Write-then-rename so a crash never leaves a half-written index behind
+        with self.lock:
+            faiss.write_index(self.index, self.index_path + ".tmp")
+            with open(self.meta_path + ".tmp", "w", encoding="utf-8") as f:
+                for m in self.meta:
+                    f.write(json.dumps(m, ensure_ascii=False) + "\n")
+        os.replace(self.index_path + ".tmp", self.index_path)
+        os.replace(self.meta_path + ".tmp", self.meta_path)
 
     @classmethod
-    def load(cls, dim: int) -> "FaissIndex":
-        if os.path.exists(settings.FAISS_INDEX_PATH):
-            idx = cls(dim)
-            idx.index = faiss.read_index(settings.FAISS_INDEX_PATH)
-            if os.path.exists(settings.FAISS_META_PATH):
-                with open(settings.FAISS_META_PATH, "r", encoding="utf-8") as f:
+    def load(cls, dim: int, index_path: Optional[str] = None, meta_path: Optional[str] = None) -> "FaissIndex":
+        idx = cls(dim, index_path, meta_path)
+        if os.path.exists(idx.index_path):
+            idx.index = faiss.read_index(idx.index_path)
+            if os.path.exists(idx.meta_path):
+                with open(idx.meta_path, "r", encoding="utf-8") as f:
                     idx.meta = [json.loads(l) for l in f]
-            return idx
-        return cls(dim)
+                idx._pos = {m["id"]: i for i, m in enumerate(idx.meta)}
+        return idx
+
+
+SHARD_FILE_RE = re.compile(r"^shard_(\d+)\.bin$")
+
+
+class _RWLock:
+    """Many readers or one writer; a waiting writer holds back new readers so it cannot starve."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class ShardedFaissIndex:
+    """
+    The corpus split into FaissIndex shards by candidate-id range
+    (shard = id // FAISS_SHARD_SIZE). Searches fan out over a thread pool and are
+    merged by score; each shard loads, saves, rebuilds and compacts on its own lock,
+    so work on one shard never blocks searches on the others.
+    Same public surface as FaissIndex (add / search / vectors_for / save / load).
+
+    In the API all mutations go through services.index_writer.IndexWriter, which
+    applies each group of them under writing(); searches and vector lookups run
+    under reading(), so they see a group either entirely or not at all.
+    """
+
+    def __init__(self, dim: int, shard_dir: Optional[str] = None, shard_size: Optional[int] = None):
+        self.dim = dim
+        self.shard_dir = Path(shard_dir or settings.FAISS_SHARD_DIR)
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.shard_size = shard_size or settings.FAISS_SHARD_SIZE
+        self.shards: Dict[int, FaissIndex] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()  # guards the shard map only
+        self._rw = _RWLock()           # readers vs. a whole write group (see reading / writing)
+        threads = settings.FAISS_SEARCH_THREADS or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="hirex-shard")
+        if threads > 1:
+            # Parallelism comes from the shard fan-out; keep FAISS itself single-threaded
+            faiss.omp_set_num_threads(1)
+
+    # ---- shard bookkeeping ----
+    def shard_of(self, cand_id: int) -> int:
+        return cand_id // self.shard_size
+
+    def _paths(self, key: int) -> Tuple[str, str]:
+        base = self.shard_dir / f"shard_{key:05d}"
+        return str(base) + ".bin", str(base) + ".jsonl"
+
+    def _shard(self, key: int) -> FaissIndex:
+        with self._lock:
+            shard = self.shards.get(key)
+            if shard is None:
+                shard = self.shards[key] = FaissIndex(self.dim, *self._paths(key))
+            return shard
+
+    def _snapshot(self) -> List[FaissIndex]:
+        with self._lock:
+            return list(self.shards.values())
+
+    def reading(self):
+        return self._rw.read()
+
+    def writing(self):
+        return self._rw.write()
+
+    @property
+    def ntotal(self) -> int:
+        return sum(s.ntotal for s in self._snapshot())
+
+    def ids(self) -> List[int]:
+        with self._rw.read():
+            return [i for s in self._snapshot() for i in s.ids()]
+
+    def has(self, cand_id: int) -> bool:
+        with self._lock:
+            shard = self.shards.get(self.shard_of(cand_id))
+        return shard is not None and cand_id in shard._pos
+
+    # ---- FaissIndex surface ----
+    def add(self, vectors: np.ndarray, metas: List[dict]) -> None:
+        assert vectors.shape[0] == len(metas)
+        if vectors.size == 0: return
+        groups: Dict[int, List[int]] = {}
+        for row, m in enumerate(metas):
+            groups.setdefault(self.shard_of(m["id"]), []).append(row)
+        for key, rows in groups.items():
+            while True:
+                shard = self._shard(key)
+                with shard.lock:
+                    if shard.retired:
+                        continue  # swapped out under us; add to its replacement
+                    shard.add(vectors[rows], [metas[r] for r in rows])
+                break
+            with self._lock:
+                self._dirty.add(key)
+
+    def vectors_for(self, ids: Sequence[int]) -> Tuple[List[int], np.ndarray]:
+        with self._rw.read():
+            return self._vectors_for(ids)
+
+    def _vectors_for(self, ids: Sequence[int]) -> Tuple[List[int], np.ndarray]:
+        groups: Dict[int, List[int]] = {}
+        for i in ids:
+            groups.setdefault(self.shard_of(i), []).append(i)
+        found: List[int] = []
+        parts: List[np.ndarray] = []
+        with self._lock:
+            shards = {k: self.shards.get(k) for k in groups}
+        for key, group in groups.items():
+            if shards[key] is None:
+                continue
+            f, v = shards[key].vectors_for(group)
+            found.extend(f)
+            parts.append(v)
+        if not found:
+            return [], np.zeros((0, self.dim), dtype="float32")
+        return found, np.vstack(parts)
+
+    def search(self, vectors: np.ndarray, top_k: int) -> Tuple[np.ndarray, List[List[dict]]]:
+        t0 = time.perf_counter()
+        try:
+            with self._rw.read():
+                return self._search(vectors, top_k)
+        finally:
+            FAISS_SEARCH.observe(time.perf_counter() - t0)
+
+    def _search(self, vectors: np.ndarray, top_k: int) -> Tuple[np.ndarray, List[List[dict]]]:
+        nq = vectors.shape[0]
+        shards = [s for s in self._snapshot() if s.ntotal]
+        if not shards:
+            return np.zeros((nq, 0), dtype="float32"), [[] for _ in range(nq)]
+        if len(shards) == 1:
+            return shards[0].search(vectors, top_k)
+
+        results = list(self._pool.map(lambda s: s.search(vectors, top_k), shards))
+        merged: List[List[Tuple[float, dict]]] = []
+        for qi in range(nq):
+            hits = (
+                (float(score), m)
+                for D, metas in results
+                for score, m in zip(D[qi].tolist(), metas[qi])
+            )
+            merged.append(heapq.nlargest(top_k, hits, key=lambda h: h[0]))
+        width = max((len(row) for row in merged), default=0)
+        D = np.zeros((nq, width), dtype="float32")
+        for qi, row in enumerate(merged):
+            D[qi, : len(row)] = [score for score, _ in row]
+        return D, [[m for _, m in row] for row in merged]
+
+    def save(self) -> None:
+        """Persist only the shards touched since the last save."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            shards = [self.shards[k] for k in dirty if k in self.shards]
+        try:
+            list(self._pool.map(lambda s: s.save(), shards))
+        except BaseException:
+            with self._lock:
+                self._dirty |= dirty  # still unsaved; the next save retries them
+            raise
+
+    # ---- maintenance ----
+    def remove(self, ids: Iterable[int]) -> None:
+        for key, copy in self.removal_copies(ids).items():
+            self.swap_shard(key, copy)
+
+    def removal_copies(self, ids: Iterable[int]) -> Dict[int, FaissIndex]:
+        """Compacted copies of the shards holding `ids`, without them; swap_shard each one in."""
+        groups: Dict[int, List[int]] = {}
+        for i in ids:
+            groups.setdefault(self.shard_of(i), []).append(i)
+        with self._lock:
+            shards = {k: self.shards.get(k) for k in groups}
+        return {k: shards[k].compacted(g) for k, g in groups.items() if shards[k] is not None}
+
+    def compact(self, key: int, drop_ids: Iterable[int] = ()) -> None:
+        """Rebuild one shard without dropped/superseded vectors, then hot-swap it in."""
+        with self._lock:
+            shard = self.shards.get(key)
+        if shard is None:
+            return
+        self.swap_shard(key, shard.compacted(drop_ids))
+
+    def swap_shard(self, key: int, new_shard: FaissIndex) -> None:
+        """
+        Replace one shard. A compacted copy is brought up to date first: vectors the
+        old shard received after the copy was taken are newer than anything the copy
+        dropped and are carried over; the old shard is then retired so no later
+        write lands on it.
+        """
+        new_shard.index_path, new_shard.meta_path = self._paths(key)
+        with self._lock:
+            old = self.shards.get(key)
+        if old is None:
+            with self._lock:
+                self.shards[key] = new_shard
+                self._dirty.add(key)
+            return
+        with old.lock:
+            if new_shard.source_len is not None:
+                late = list(range(new_shard.source_len, min(old.index.ntotal, len(old.meta))))
+                if late:
+                    new_shard.add(old.index.reconstruct_batch(np.array(late, dtype="int64")),
+                                  [old.meta[i] for i in late])
+            old.retired = True
+            with self._lock:
+                self.shards[key] = new_shard
+                self._dirty.add(key)
+
+    @classmethod
+    def load(cls, dim: int) -> "ShardedFaissIndex":
+        idx = cls(dim)
+        keys = sorted(
+            int(m.group(1))
+            for m in (SHARD_FILE_RE.match(p.name) for p in idx.shard_dir.iterdir())
+            if m
+        )
+        if keys:
+            loaded = idx._pool.map(lambda k: (k, FaissIndex.load(dim, *idx._paths(k))), keys)
+            idx.shards = dict(loaded)
+        elif os.path.exists(settings.FAISS_INDEX_PATH):
+            # One-time migration from the single-file index: route vectors into shards
+            legacy = FaissIndex.load(dim)
+            n = min(legacy.index.ntotal, len(legacy.meta))
+            if n:
+                idx.add(legacy.index.reconstruct_n(0, n), legacy.meta[:n])
+                idx.save()
+        return idx
+
+
+def load_saved() -> Optional[ShardedFaissIndex]:
+    """The index as last saved (dimension read off the files), for offline tools; None if there is none."""
+    shard_dir = Path(settings.FAISS_SHARD_DIR)
+    shards = sorted(p for p in shard_dir.glob("shard_*.bin") if SHARD_FILE_RE.match(p.name)) if shard_dir.is_dir() else []
+    probe = shards[0] if shards else Path(settings.FAISS_INDEX_PATH)
+    if not probe.exists():
+        return None
+    return ShardedFaissIndex.load(faiss.read_index(str(probe)).d)
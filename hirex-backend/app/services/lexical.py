@@ -0,0 +1,91 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+# Tokens keep the punctuation that matters for tech terms ("c++", "c#", "next.js", "ci/cd")
+TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:[./\-][a-z0-9+#]+)*")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "in", "is", "it", "of", "on", "or", "the", "to", "with", "who", "that", "this",
+    "candidate", "candidates", "developer", "developers", "engineer", "engineers",
+    "minimum", "min", "least", "more", "than", "years", "year", "yrs", "experience",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class BM25Index:
+    """In-memory Okapi BM25 over resume text, keyed by candidate id."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_len: Dict[int, int] = {}
+        self.doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._total_len = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, doc_id: int, text: str) -> None:
+        tf = Counter(tokenize(text))
+        with self._lock:
+            if doc_id in self.doc_len:
+                self._remove_locked(doc_id)
+            for term, n in tf.items():
+                self.postings.setdefault(term, {})[doc_id] = n
+            length = sum(tf.values())
+            self.doc_len[doc_id] = length
+            self.doc_terms[doc_id] = tuple(tf)
+            self._total_len += length
+
+    def add_many(self, docs: Iterable[Tuple[int, str]]) -> None:
+        for doc_id, text in docs:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: int) -> None:
+        length = self.doc_len.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_len -= length
+        for term in self.doc_terms.pop(doc_id, ()):
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[term]
+
+    def doc_freq(self, term: str) -> int:
+        return len(self.postings.get(term, {}))
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t not in STOPWORDS]
+        with self._lock:
+            n_docs = len(self.doc_len)
+            if not terms or n_docs == 0:
+                return []
+            avgdl = self._total_len / n_docs or 1.0
+            scores: Dict[int, float] = {}
+            for term in terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                df = len(docs)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in docs.items():
+                    norm = self.k1 * (1.0 - self.b + self.b * self.doc_len[doc_id] / avgdl)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda kv: kv[1])
@@ -0,0 +1,209 @@
+"""
+Dependency-free metrics in the Prometheus text exposition format (v0.0.4).
+Recording is a lock + a few integer adds, so instruments can sit on hot paths;
+callback metrics (index size, cache counters) are only evaluated at scrape time.
+"""
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+Sample = Tuple[str, Mapping[str, str], float]  # (name suffix, labels, value)
+
+_registry: List["_Metric"] = []
+
+
+def _fmt_labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        _registry.append(self)
+
+    def _key(self, labels: Mapping[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(l, "")) for l in self.labels)
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, v in items:
+            yield "", dict(zip(self.labels, key)), v
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)  # first bucket with le >= value (len = +Inf)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = [(k, (list(s[0]), s[1], s[2])) for k, s in self._values.items()]
+        for key, (counts, total, n) in items:
+            base = dict(zip(self.labels, key))
+            acc = 0
+            for le, c in zip((*self.buckets, float("inf")), counts):
+                acc += c
+                yield "_bucket", {**base, "le": _fmt_value(float(le))}, acc
+            yield "_sum", base, total
+            yield "_count", base, n
+
+
+class CallbackMetric(_Metric):
+    """Counter/gauge read from live objects at scrape time; fn yields (labels, value)."""
+
+    def __init__(self, name: str, help: str, kind: str, fn: Callable[[], Iterable[Tuple[Mapping[str, str], float]]]):
+        super().__init__(name, help)
+        self.kind = kind
+        self.fn = fn
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, v in self.fn():
+            yield "", labels, v
+
+
+def render() -> str:
+    """The whole registry in Prometheus text format."""
+    lines: List[str] = []
+    for m in list(_registry):
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        try:
+            for suffix, labels, v in m.samples():
+                lines.append(f"{m.name}{suffix}{_fmt_labels(labels)} {_fmt_value(v)}")
+        except Exception:
+            continue  # a failing callback must not break the scrape
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------------------------------------------------------
+# Instruments
+# -----------------------------------------------------------------------------
+HTTP_REQUESTS = Counter("hirex_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("hirex_http_request_duration_seconds", "HTTP request latency (until the last body chunk).", ("method", "route"))
+STAGE_LATENCY = Histogram("hirex_search_stage_duration_seconds", "Recruiter search pipeline stage latency.", ("stage",))
+
+INGEST_DOCS = Counter("hirex_ingest_documents_total", "Resumes ingested.", ("source", "outcome"))
+PARSE_LATENCY = Histogram("hirex_parse_duration_seconds", "Text extraction latency per file.", ("format",))
+OCR_PAGES = Counter("hirex_ocr_pages_total", "Pages/images run through OCR.")
+OCR_SECONDS = Counter("hirex_ocr_seconds_total", "Time spent in OCR.")
+
+EMBED_BATCH = Histogram("hirex_embedding_batch_size", "Texts per embedding forward pass.", buckets=SIZE_BUCKETS)
+EMBED_LATENCY = Histogram("hirex_embedding_duration_seconds", "Embedding forward-pass latency.")
+EMBED_QUEUE_WAIT = Histogram("hirex_embedding_queue_wait_seconds", "Time a request waited to join a micro-batch.")
+FAISS_SEARCH = Histogram("hirex_faiss_search_duration_seconds", "FAISS search latency (all shards, all queries).")
+INDEX_GROUP_SIZE = Histogram("hirex_index_write_group_size", "Index write requests per group commit.", buckets=SIZE_BUCKETS)
+INDEX_WRITE_WAIT = Histogram("hirex_index_write_queue_wait_seconds", "Time an index write waited to join a group.")
+INDEX_COMMIT_LATENCY = Histogram("hirex_index_commit_duration_seconds", "Index save latency per group commit.")
+
+DB_QUERIES = Counter("hirex_db_queries_total", "SQL statements executed.", ("operation",))
+LOOP_LAG = Histogram("hirex_event_loop_lag_seconds", "How late the event loop wakes a sleeping task.")
+
+
+async def watch_event_loop(interval: float = 0.25) -> None:
+    """Sample scheduling delay forever; sustained lag means blocking work on the loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(0.0, loop.time() - t0 - interval))
+
+
+def instrument_engine(engine) -> None:
+    """Count every statement an SQLAlchemy engine executes, by leading keyword."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        DB_QUERIES.inc(operation=statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: per-route request counts and latency. Labels use the route
+    template (/resumes/{cand_id}/download), never the raw path, to bound cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        t0 = time.perf_counter()
+        status = {"code": 500}
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_LATENCY.observe(time.perf_counter() - t0, method=method, route=path)
+            HTTP_REQUESTS.inc(method=method, route=path, status=status["code"])
@@ -1,6 +1,8 @@
 import os
+import time
 from typing import Optional
 from ..config import settings
+from .metrics import OCR_PAGES, OCR_SECONDS
 
 try:
     import pytesseract
@@ -24,17 +26,23 @@ def ocr_image_path(img_path: str) -> str:
     if not pytesseract or not Image:
         return ""
     _configure_tesseract()
+    t0 = time.perf_counter()
     try:
         im = Image.open(img_path)
         return pytesseract.image_to_string(im) or ""
     except Exception:
         return ""
+    finally:
+        OCR_PAGES.inc()
+        OCR_SECONDS.inc(time.perf_counter() - t0)
 
 
 def ocr_pdf_path(pdf_path: str, max_pages: int = 25) -> str:
     if not pytesseract or not convert_from_path:
         return ""
     _configure_tesseract()
+    t0 = time.perf_counter()
+    images = []
     try:
         images = convert_from_path(pdf_path, dpi=200, first_page=1, last_page=max_pages,
                                    poppler_path=settings.POPPLER_PATH or None)
@@ -45,3 +53,6 @@ def ocr_pdf_path(pdf_path: str, max_pages: int = 25) -> str:
         return "\n".join(chunks)
     except Exception:
         return ""
+    finally:
+        OCR_PAGES.inc(len(images))
+        OCR_SECONDS.inc(time.perf_counter() - t0)
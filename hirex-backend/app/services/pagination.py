@@ -0,0 +1,93 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# One ranked entry: (candidate id, final score, score parts)
+Ranked = Tuple[int, float, Dict[str, float]]
+# Compact scored entry, no parts yet: (candidate id, final score, semantic score)
+Scored = Tuple[int, float, float]
+
+
+class PageState:
+    """
+    Ranking of one search, kept server-side so later pages skip the pipeline.
+    The head (first page / rerank window) is materialized; the tail stays as compact,
+    unordered tuples and is sorted once, the first time a page past the head is read.
+    """
+
+    def __init__(self, head: List[Ranked], tail: List[Scored], context: Dict[str, Any], page_size: int):
+        self.head = head
+        self._tail = tail
+        self._tail_sorted = False
+        self._lock = threading.Lock()
+        self.total = len(head) + len(tail)
+        self.context = context
+        self.page_size = page_size
+        self.expires_at = 0.0
+
+    def window(self, offset: int, size: int) -> Tuple[List[Ranked], List[Scored]]:
+        """Entries [offset, offset + size): head entries first, then tail entries."""
+        end = offset + size
+        head = self.head[offset:end]
+        tail: List[Scored] = []
+        if end > len(self.head):
+            with self._lock:
+                if not self._tail_sorted:
+                    self._tail.sort(key=lambda s: s[1], reverse=True)  # stable: pool order breaks ties
+                    self._tail_sorted = True
+            tail = self._tail[max(0, offset - len(self.head)): end - len(self.head)]
+        return head, tail
+
+
+class CursorStore:
+    """TTL + size bounded store of PageStates. Cursors look like '<token>.<offset>'."""
+
+    def __init__(self, ttl_seconds: int = 600, maxsize: int = 1024):
+        self.ttl = ttl_seconds
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, PageState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, state: PageState) -> str:
+        token = secrets.token_urlsafe(12)
+        now = time.monotonic()
+        state.expires_at = now + self.ttl
+        with self._lock:
+            self._purge_locked(now)
+            self._data[token] = state
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return token
+
+    def get(self, token: str) -> Optional[PageState]:
+        now = time.monotonic()
+        with self._lock:
+            state = self._data.get(token)
+            if state is None:
+                return None
+            if state.expires_at < now:
+                del self._data[token]
+                return None
+            state.expires_at = now + self.ttl  # sliding TTL while a recruiter keeps paging
+            self._data.move_to_end(token)
+            return state
+
+    def _purge_locked(self, now: float) -> None:
+        while self._data:
+            token, state = next(iter(self._data.items()))
+            if state.expires_at >= now:
+                break
+            del self._data[token]
+
+
+def make_cursor(token: str, offset: int) -> str:
+    return f"{token}.{offset}"
+
+
+def parse_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+    token, _, offset = (cursor or "").rpartition(".")
+    if not token or not offset.isdigit():
+        return None
+    return token, int(offset)
@@ -1,9 +1,11 @@
 import re
 import json
+import time
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 
 from . import ocr as ocr_svc
+from .metrics import PARSE_LATENCY
 
 try:
     import pdfplumber
@@ -22,7 +24,12 @@ except Exception:
 
 # ------------ File reading with OCR fallback ------------
 
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"}
+# PARSE_LATENCY "format" label: a fixed set, whatever extension gets uploaded
+_FORMAT_LABELS = {".pdf": "pdf", ".docx": "docx", ".txt": "txt", **{s: "image" for s in IMAGE_SUFFIXES}}
+
 def read_file_text(path: str) -> str:
+    t0 = time.perf_counter()
     p = Path(path)
     suffix = p.suffix.lower()
     text = ""
@@ -49,7 +56,7 @@ def read_file_text(path: str) -> str:
             text = p.read_text(errors="ignore")
         except Exception:
             text = ""
-    elif suffix in {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"}:
+    elif suffix in IMAGE_SUFFIXES:
         text = ocr_svc.ocr_image_path(str(p)) or ""
     else:
         try:
@@ -57,6 +64,7 @@ def read_file_text(path: str) -> str:
         except Exception:
             text = ""
 
+    PARSE_LATENCY.observe(time.perf_counter() - t0, format=_FORMAT_LABELS.get(suffix, "other"))
     return text or ""
 
 
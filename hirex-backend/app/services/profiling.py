@@ -0,0 +1,112 @@
+"""
+Opt-in per-request cProfile capture. Only installed when PROFILING_ENABLED, so the
+disabled path costs nothing; when enabled, a request is profiled if it carries the
+PROFILE_HEADER or wins the PROFILE_SAMPLE_RATE draw.
+
+Output is a pstats dump (<DATA_DIR>/profiles/<utc>_<request id>_<route>.prof), which
+flameprof / snakeviz / gprof2dot turn into flamegraphs. cProfile only sees the event
+loop thread: endpoints that offload to the threadpool show the await, not the work.
+"""
+import cProfile
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+import anyio
+
+from ..config import settings
+
+logger = logging.getLogger("hirex.profiling")
+
+_SAFE_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+# One profiler at a time: overlapping requests on the loop would pollute each other
+_active = threading.Lock()
+
+
+def profile_dir() -> Path:
+    p = Path(settings.PROFILE_DIR)
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def list_profiles() -> List[dict]:
+    """Newest first."""
+    out = []
+    for f in profile_dir().glob("*.prof"):
+        st = f.stat()
+        out.append({"name": f.name, "size": st.st_size, "created": st.st_mtime})
+    return sorted(out, key=lambda p: p["created"], reverse=True)
+
+
+def profile_path(name: str) -> Optional[Path]:
+    """Resolve a listed profile name; anything outside PROFILE_DIR is rejected."""
+    if _SAFE_RE.sub("", name) != name or not name.endswith(".prof"):
+        return None
+    p = profile_dir() / name
+    return p if p.is_file() else None
+
+
+def _prune(keep: int) -> None:
+    for stale in list_profiles()[keep:]:
+        try:
+            (profile_dir() / stale["name"]).unlink()
+        except OSError:
+            pass
+
+
+def _save(prof: cProfile.Profile, name: str) -> None:
+    """Write one profile and drop the oldest beyond PROFILE_KEEP (threadpool: file I/O)."""
+    prof.dump_stats(str(profile_dir() / name))
+    _prune(settings.PROFILE_KEEP)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware wrapping sampled/flagged requests in cProfile."""
+
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.PROFILE_HEADER.lower().encode()
+        self.rate = settings.PROFILE_SAMPLE_RATE
+
+    def _wanted(self, scope) -> bool:
+        for k, v in scope.get("headers", ()):
+            if k == self.header:
+                return v.strip().lower() not in (b"", b"0", b"false")
+        return self.rate > 0 and random.random() < self.rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope) or not _active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = ""
+        for k, v in scope.get("headers", ()):
+            if k == b"x-request-id":
+                request_id = _SAFE_RE.sub("", v.decode("latin-1"))[:64]
+        request_id = request_id or uuid.uuid4().hex[:16]
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                prof.disable()
+            route = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+            slug = _SAFE_RE.sub("_", route).strip("_") or "root"
+            name = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}_{request_id}_{slug}.prof"
+            await anyio.to_thread.run_sync(_save, prof, name)
+            logger.info("profile written: %s", name)
+        finally:
+            _active.release()
@@ -1,62 +1,123 @@
 import re
-from typing import Dict, List
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from .skills import extract_skills
-from .educations import ELITE_INSTITUTES
+from .educations import INSTITUTE_PATTERNS
 from .roles import normalize_role_text, expand_skills_for_roles
 
+# All prompt patterns are compiled once at import
+YEARS_RE = re.compile(r"(\d+)\s*\+?\s*(?:years|yrs|y)\b")
+LOCATION_RE = re.compile(r"\b(?:in|located in)\s+([a-zA-Z][a-zA-Z\s]+)\b")
+MIN_PROJECTS_RE = re.compile(r"(?:more than|>=?|at\s*least|minimum|min)\s*(\d+)\s*(?:projects?)")
+PROJECTS_RE = re.compile(r"(\d+)\s*\+?\s*(?:projects?)")
+CGPA_RES = [
+    re.compile(r"(?:cgpa|gpa)\s*(?:of\s*)?(?:>=|=>|≥|at\s*least|minimum|min|more\s*than|above|over)?\s*([0-9](?:\.[0-9])?)"),
+    re.compile(r"(?:>=|=>|≥|at\s*least|minimum|min|more\s*than|above|over)\s*([0-9](?:\.[0-9])?)\s*(?:cgpa|gpa)"),
+    re.compile(r"([0-9](?:\.[0-9])?)\s*\+?\s*(?:cgpa|gpa)"),
+    re.compile(r"(?:cgpa|gpa)\s*[:=]\s*([0-9](?:\.[0-9])?)"),
+]
+HACKATHONS_RE = re.compile(r"(?:won|wins?)\s*(?:more than|>=?|at\s*least|minimum|min)?\s*(\d+)\s*(?:hackathons?)")
+QUOTED_PHRASE_RE = re.compile(r"(?:about|with|on|titled|named)\s+\"([^\"]+)\"")
+BUILT_PHRASE_RE = re.compile(r"(?:who|candidate).*?(?:built|made|did)\s+([a-z0-9 \-]+?)\s+(?:project|solution|system)")
+
+EXTRACURRICULAR_WORDS = ["extracurricular", "extra curricular", "club", "fest", "volunteer", "community"]
+POR_WORDS = ["position of responsibility", "por", "leadership", "president", "secretary", "team lead"]
+
+
 def _num_0_10(s: str):
     try:
         v = float(s);  return v if 0.0 <= v <= 10.0 else None
     except Exception:
         return None
 
-def parse_prompt(prompt: str) -> Dict:
-    p = prompt.lower()
 
+def normalize_prompt(prompt: str) -> str:
+    return " ".join((prompt or "").lower().split())
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    Immutable, hashable result of planning one recruiter prompt. Carries the
+    structured filters plus the query skills/roles so later stages don't re-extract.
+    """
+    prompt: str                                  # normalized prompt
+    min_experience: float = 0.0
+    must_have_skills: Tuple[str, ...] = ()
+    education_any_of: Tuple[str, ...] = ()
+    location: Optional[str] = None
+    min_projects: int = 0
+    min_cgpa: Optional[float] = None
+    min_hackathon_wins: int = 0
+    contains_phrase: Optional[str] = None
+    require_extracurricular: bool = False
+    require_por: bool = False
+    roles: Tuple[str, ...] = ()                  # canonical role tags (roles_any_of)
+    query_skills: Tuple[str, ...] = ()           # skills named in the prompt (no role expansion)
+
+    def filters(self) -> Dict:
+        """Filter dict in the shape of schemas.StructuredFilters."""
+        return {
+            "min_experience": self.min_experience,
+            "must_have_skills": list(self.must_have_skills),
+            "education_any_of": list(self.education_any_of),
+            "location": self.location,
+            "min_projects": self.min_projects,
+            "min_cgpa": self.min_cgpa,
+            "min_hackathon_wins": self.min_hackathon_wins,
+            "contains_phrase": self.contains_phrase,
+            "require_extracurricular": self.require_extracurricular,
+            "require_por": self.require_por,
+            "roles_any_of": list(self.roles),
+        }
+
+
+def plan_query(prompt: str) -> QueryPlan:
+    """Plan a prompt; repeated (normalized) prompts come straight from an LRU."""
+    return _plan(normalize_prompt(prompt))
+
+
+@lru_cache(maxsize=1024)
+def _plan(p: str) -> QueryPlan:
     # Years
     yrs = 0
-    m = re.search(r"(\d+)\s*\+?\s*(?:years|yrs|y)\b", p)
+    m = YEARS_RE.search(p)
     if m: yrs = int(m.group(1))
 
     # Roles (normalize)
     roles = normalize_role_text(p)
 
     # Skills (from text) + expansion from roles
-    must = extract_skills(p)
-    role_skills = expand_skills_for_roles(roles)
-    for s in role_skills:
+    query_skills = extract_skills(p)
+    must = list(query_skills)
+    for s in expand_skills_for_roles(roles):
         if s not in must:
             must.append(s)
 
     # Education (IIT/NIT/BITS…)
     edu_targets: List[str] = []
-    for canon, variants in ELITE_INSTITUTES.items():
-        if any(re.search(rf"\b{re.escape(v)}\b", p) for v in variants):
+    for canon, patterns in INSTITUTE_PATTERNS.items():
+        if any(rx.search(p) for _, rx in patterns):
             edu_targets.append(canon)
 
     # Location (simple)
     loc = None
-    m2 = re.search(r"\b(?:in|located in)\s+([a-zA-Z][a-zA-Z\s]+)\b", p)
+    m2 = LOCATION_RE.search(p)
     if m2: loc = m2.group(1).strip()
 
     # Projects
     min_projects = 0
-    m3 = re.search(r"(?:more than|>=?|at\s*least|minimum|min)\s*(\d+)\s*(?:projects?)", p)
+    m3 = MIN_PROJECTS_RE.search(p)
     if m3: min_projects = int(m3.group(1))
     else:
-        m3b = re.search(r"(\d+)\s*\+?\s*(?:projects?)", p)
+        m3b = PROJECTS_RE.search(p)
         if m3b: min_projects = max(min_projects, int(m3b.group(1)))
 
     # CGPA (robust)
     min_cgpa = None
-    cgpa_patterns = [
-        r"(?:cgpa|gpa)\s*(?:of\s*)?(?:>=|=>|≥|at\s*least|minimum|min|more\s*than|above|over)?\s*([0-9](?:\.[0-9])?)",
-        r"(?:>=|=>|≥|at\s*least|minimum|min|more\s*than|above|over)\s*([0-9](?:\.[0-9])?)\s*(?:cgpa|gpa)",
-        r"([0-9](?:\.[0-9])?)\s*\+?\s*(?:cgpa|gpa)",
-        r"(?:cgpa|gpa)\s*[:=]\s*([0-9](?:\.[0-9])?)",
-    ]
-    for pat in cgpa_patterns:
-        m4 = re.search(pat, p)
+    for rx in CGPA_RES:
+        m4 = rx.search(p)
         if m4:
             val = _num_0_10(m4.group(1))
             if val is not None:
@@ -64,33 +125,39 @@ def parse_prompt(prompt: str) -> Dict:
 
     # Hackathons
     min_hackathon_wins = 0
-    m5 = re.search(r"(?:won|wins?)\s*(?:more than|>=?|at\s*least|minimum|min)?\s*(\d+)\s*(?:hackathons?)", p)
+    m5 = HACKATHONS_RE.search(p)
     if m5:
         try: min_hackathon_wins = int(m5.group(1))
         except: pass
 
     # Phrase
     contains_phrase = None
-    m6 = re.search(r"(?:about|with|on|titled|named)\s+\"([^\"]+)\"", p)
+    m6 = QUOTED_PHRASE_RE.search(p)
     if m6: contains_phrase = m6.group(1)
     else:
-        m6b = re.search(r"(?:who|candidate).*?(?:built|made|did)\s+([a-z0-9 \-]+?)\s+(?:project|solution|system)", p)
+        m6b = BUILT_PHRASE_RE.search(p)
         if m6b: contains_phrase = m6b.group(1).strip()
 
     # Extras
-    require_extracurricular = any(w in p for w in ["extracurricular", "extra curricular", "club", "fest", "volunteer", "community"])
-    require_por = any(w in p for w in ["position of responsibility", "por", "leadership", "president", "secretary", "team lead"])
-
-    return {
-        "min_experience": float(yrs),
-        "must_have_skills": must,
-        "education_any_of": edu_targets,
-        "location": loc,
-        "min_projects": min_projects,
-        "min_cgpa": min_cgpa,
-        "min_hackathon_wins": min_hackathon_wins,
-        "contains_phrase": contains_phrase,
-        "require_extracurricular": require_extracurricular,
-        "require_por": require_por,
-        "roles_any_of": roles,  # NEW: pass roles through
-    }
+    require_extracurricular = any(w in p for w in EXTRACURRICULAR_WORDS)
+    require_por = any(w in p for w in POR_WORDS)
+
+    return QueryPlan(
+        prompt=p,
+        min_experience=float(yrs),
+        must_have_skills=tuple(must),
+        education_any_of=tuple(edu_targets),
+        location=loc,
+        min_projects=min_projects,
+        min_cgpa=min_cgpa,
+        min_hackathon_wins=min_hackathon_wins,
+        contains_phrase=contains_phrase,
+        require_extracurricular=require_extracurricular,
+        require_por=require_por,
+        roles=tuple(roles),
+        query_skills=tuple(query_skills),
+    )
+
+
+def parse_prompt(prompt: str) -> Dict:
+    return plan_query(prompt).filters()
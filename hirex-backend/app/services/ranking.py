@@ -12,6 +12,22 @@ def _college_norm(institutions):
         best = max(best, COLLEGE_TIERS.get(inst, 0.0))
     return best
 
+def json_list_has(raw, value):
+    """Membership test on a stored JSON string list without json.loads (values are plain tags)."""
+    return f'"{value}"' in (raw or "")
+
+def college_norm_json(institutions_json):
+    """_college_norm straight from the stored JSON column."""
+    return max((tier for inst, tier in COLLEGE_TIERS.items() if json_list_has(institutions_json, inst)), default=0.0)
+
+def fast_score(years, cgpa, institutions_json, extra, weights, semantic_score):
+    """Same blend as compute_score without building the parts dict; used to rank whole pools."""
+    return (weights["semantic"] * semantic_score +
+            weights["exp"] * _norm(years, 10) +
+            weights["cgpa"] * _norm(cgpa, 10) +
+            weights["college"] * college_norm_json(institutions_json) +
+            weights["extra"] * _norm(extra, 5))
+
 def compute_score(item, weights, semantic_score):
     exp_norm = _norm(item.get("years_experience",0), 10)   # cap at 10y
     cgpa_norm = _norm(item.get("cgpa",0), 10)              # /10 scale
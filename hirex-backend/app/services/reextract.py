@@ -0,0 +1,188 @@
+"""
+Background re-extraction: re-derive candidate fields from the stored resume text
+when the extractor version changes (lexicon or parser update). No re-OCR, no
+re-embedding: only the text columns produced by build_candidate_record change.
+
+Stale rows (extractor_version != EXTRACTOR_VERSION) are walked in id order, a
+batch at a time. Each batch's texts are decompressed here, fanned out to a
+process pool and written back in one transaction, stamping the new version, so
+an interrupted run simply continues where it stopped next time.
+
+    python -m app.services.reextract                  # stale rows only
+    python -m app.services.reextract --all --workers 8
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import func, or_, update
+from sqlmodel import Session, select
+
+from ..config import settings
+from ..db import Candidate, engine, read_engine
+from .extraction import EXTRACTOR_VERSION, derive_fields
+from .textstore import load_texts
+
+logger = logging.getLogger("hirex.reextract")
+
+
+class ReextractJob:
+    """Progress of one run; safe to read from another thread while it runs."""
+
+    def __init__(self, batch_size: int, workers: int, all_rows: bool):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.all_rows = all_rows
+        self.version = EXTRACTOR_VERSION
+        self.state = "pending"          # pending | running | done | failed
+        self.total = 0                  # rows to process when the run started
+        self.processed = 0
+        self.updated = 0
+        self.failed = 0
+        self.last_id = 0                # resume point within this run
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def status(self) -> dict:
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        return {
+            "state": self.state,
+            "extractor_version": self.version,
+            "total": self.total,
+            "processed": self.processed,
+            "updated": self.updated,
+            "failed": self.failed,
+            "last_id": self.last_id,
+            "elapsed_s": round(elapsed, 1),
+            "rows_per_s": round(self.processed / elapsed, 1) if elapsed else 0.0,
+            "error": self.error,
+        }
+
+
+def _stale(all_rows: bool):
+    if all_rows:
+        return []
+    return [or_(Candidate.extractor_version.is_(None), Candidate.extractor_version != EXTRACTOR_VERSION)]
+
+
+def count_stale(all_rows: bool = False) -> int:
+    with Session(read_engine) as s:
+        return s.exec(select(func.count()).select_from(Candidate).where(*_stale(all_rows))).one()
+
+
+def _next_batch(after: int, size: int, all_rows: bool) -> List[Tuple[int, str, Optional[str]]]:
+    with Session(read_engine) as s:
+        return s.exec(
+            select(Candidate.id, Candidate.resume_path, Candidate.file_name)
+            .where(Candidate.id > after, *_stale(all_rows))
+            .order_by(Candidate.id)
+            .limit(size)
+        ).all()
+
+
+def _write_batch(results) -> None:
+    if not results:
+        return
+    with Session(engine) as s:
+        s.execute(update(Candidate), [{"id": cid, **fields} for cid, fields in results])
+        s.commit()
+
+
+def run(job: ReextractJob, on_batch: Optional[Callable[[ReextractJob], None]] = None) -> ReextractJob:
+    job.state, job.started_at = "running", time.time()
+    job.total = count_stale(job.all_rows)
+    chunk = max(1, job.batch_size // (job.workers * 4))
+    # spawn: the server process has threads (FAISS, embed batcher) that fork would copy mid-state
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=job.workers, mp_context=ctx) as pool:
+            while True:
+                batch = _next_batch(job.last_id, job.batch_size, job.all_rows)
+                if not batch:
+                    break
+                with Session(read_engine) as s:
+                    texts = load_texts(s, [cid for cid, _, _ in batch])
+                items = [(cid, texts.get(cid, ""), path, name) for cid, path, name in batch]
+                parts = [items[i: i + chunk] for i in range(0, len(items), chunk)]
+                results = [r for part in pool.map(derive_fields, parts) for r in part]
+                _write_batch(results)
+                job.processed += len(batch)
+                job.updated += len(results)
+                job.failed += len(batch) - len(results)
+                job.last_id = batch[-1][0]
+                if on_batch:
+                    on_batch(job)
+        job.state = "done"
+    except Exception as e:
+        job.state, job.error = "failed", f"{type(e).__name__}: {e}"
+        logger.exception("Re-extraction failed after id %s", job.last_id)
+    finally:
+        job.finished_at = time.time()
+    logger.info("Re-extraction %s: %s", job.state, job.status())
+    return job
+
+
+# -----------------------------------------------------------------------------
+# In-process background runner (admin endpoint); one job at a time
+# -----------------------------------------------------------------------------
+_current: Optional[ReextractJob] = None
+_current_lock = threading.Lock()
+
+
+def start_background(
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    all_rows: bool = False,
+    on_done: Optional[Callable[[ReextractJob], None]] = None,
+) -> Optional[ReextractJob]:
+    """Start a run on a daemon thread; None if one is already running."""
+    global _current
+    with _current_lock:
+        if _current is not None and _current.state == "running":
+            return None
+        job = ReextractJob(
+            batch_size or settings.REEXTRACT_BATCH_SIZE,
+            workers or settings.REEXTRACT_WORKERS or os.cpu_count() or 1,
+            all_rows,
+        )
+        job.state = "running"  # claim the slot before the thread starts
+        _current = job
+
+    def _target():
+        run(job)
+        if on_done:
+            on_done(job)
+
+    threading.Thread(target=_target, name="hirex-reextract", daemon=True).start()
+    return job
+
+
+def current() -> Optional[ReextractJob]:
+    return _current
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Re-derive candidate fields with the current extractor")
+    ap.add_argument("--all", action="store_true", help="every row, not just stale ones")
+    ap.add_argument("--batch", type=int, default=settings.REEXTRACT_BATCH_SIZE)
+    ap.add_argument("--workers", type=int, default=settings.REEXTRACT_WORKERS or os.cpu_count() or 1)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    from ..db import init_db
+    init_db()
+    print(f"extractor {EXTRACTOR_VERSION}: {count_stale(args.all)} rows to process")
+    job = ReextractJob(args.batch, args.workers, args.all)
+    run(job, on_batch=lambda j: print(f"  {j.processed}/{j.total} (last id {j.last_id})", flush=True))
+    print(job.status())
+    print("Restart the API (or use POST /admin/reextract) so cached searches and planner stats refresh.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import time
+from typing import Dict, List
+
+from .pagination import Ranked
+from .search import best_snippet
+
+try:
+    from sentence_transformers import CrossEncoder
+except Exception:
+    CrossEncoder = None  # optional
+
+
+class CrossEncoderReranker:
+    """
+    Scores (prompt, resume chunk) pairs with a local cross-encoder on CPU, in small
+    batches, under a hard time budget: each batch is cut to what the remaining
+    budget can still pay for. Whatever doesn't fit keeps the incoming (bi-encoder
+    blend) order.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 8, chunk_chars: int = 512):
+        if CrossEncoder is None:
+            raise RuntimeError("sentence-transformers is required for reranking")
+        self.model = CrossEncoder(model_name, device="cpu")
+        self.batch_size = batch_size
+        self.chunk_chars = chunk_chars
+        # Warm up once so the first request has a real per-pair cost estimate
+        t0 = time.perf_counter()
+        self.model.predict([("warmup", "warmup")] * batch_size, batch_size=batch_size)
+        self._pair_secs = (time.perf_counter() - t0) / batch_size
+
+    def rerank(
+        self,
+        prompt: str,
+        head: List[Ranked],
+        texts: Dict[int, str],
+        budget_ms: float,
+    ) -> List[Ranked]:
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        scored: List[float] = []
+        while len(scored) < len(head):
+            fits = int((deadline - time.perf_counter()) / self._pair_secs)
+            n = min(self.batch_size, fits, len(head) - len(scored))
+            if n <= 0:
+                break
+            batch = head[len(scored): len(scored) + n]
+            pairs = [
+                (prompt, best_snippet(texts.get(cid, ""), prompt, window=self.chunk_chars))
+                for cid, _, _ in batch
+            ]
+            t0 = time.perf_counter()
+            scored.extend(float(s) for s in self.model.predict(pairs, batch_size=n))
+            # EMA of observed per-pair latency sizes the next batch
+            self._pair_secs = 0.7 * self._pair_secs + 0.3 * (time.perf_counter() - t0) / n
+
+        if not scored:
+            return head
+        done = [
+            (cid, score, {**parts, "rerank": round(ce, 4)})
+            for (cid, score, parts), ce in zip(head, scored)
+        ]
+        order = sorted(range(len(done)), key=lambda i: scored[i], reverse=True)
+        return [done[i] for i in order] + head[len(done):]
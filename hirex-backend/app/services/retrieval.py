@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .indexer import ShardedFaissIndex
+from .lexical import BM25Index
+from .tracing import QueryTrace, timed
+
+RRF_K = 60
+
+# Dense (FAISS releases the GIL) and lexical search run side by side
+_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hirex-retrieval")
+
+Hits = List[Tuple[int, float]]
+
+
+def rrf_scores(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> Dict[int, float]:
+    """Reciprocal-rank fusion score per id over several ranked id lists (best first)."""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return fused
+
+
+def rrf_fuse(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[int]:
+    """Reciprocal-rank fusion of several ranked id lists (best first)."""
+    fused = rrf_scores(rankings, k)
+    return sorted(fused, key=lambda d: fused[d], reverse=True)
+
+
+def _dense(
+    index: ShardedFaissIndex, q_vecs: np.ndarray, top_k: int, trace: Optional[QueryTrace] = None
+) -> List[Hits]:
+    """One (multi-query) FAISS search; returns per-query [(id, cosine)]."""
+    with timed(trace, "faiss_search") as rec:
+        D, metas = index.search(q_vecs, top_k=top_k)
+        rec["n_out"] = sum(len(row) for row in metas)
+    return [
+        [(m["id"], float(s)) for s, m in zip(D[qi].tolist(), row)]
+        for qi, row in enumerate(metas)
+    ]
+
+
+def _lexical_many(
+    lexical: BM25Index,
+    prompts: Sequence[str],
+    top_ks: Sequence[int],
+    trace: Optional[QueryTrace] = None,
+) -> List[Hits]:
+    with timed(trace, "bm25_search") as rec:
+        hits = [lexical.search(p, k) for p, k in zip(prompts, top_ks)]
+        rec["n_out"] = sum(len(h) for h in hits)
+    return hits
+
+
+def _fuse(dense_hits: Hits, lex_hits: Hits, top_k: int) -> Tuple[List[int], Dict[int, float]]:
+    # A superseded vector can still be in its shard: keep one (the best) hit per id,
+    # otherwise the id would vote twice in RRF.
+    cosine: Dict[int, float] = {}
+    for doc_id, score in dense_hits:
+        cosine.setdefault(doc_id, score)
+
+    if not lex_hits:
+        return list(cosine)[:top_k], cosine
+    if not cosine:
+        # BM25 alone (e.g. empty vector index): its own scores, scaled to [0, 1]
+        best = lex_hits[0][1] or 1.0
+        return [d for d, _ in lex_hits][:top_k], {d: score / best for d, score in lex_hits}
+
+    # Both sides: the semantic component follows the fused order, on the dense scale
+    # (the top fused hit gets the best cosine of the page)
+    fused = rrf_scores([list(cosine), [d for d, _ in lex_hits]])
+    ids = sorted(fused, key=lambda d: fused[d], reverse=True)[:top_k]
+    scale = max(0.0, max(cosine.values())) / fused[ids[0]]
+    return ids, {d: fused[d] * scale for d in ids}
+
+
+def hybrid_retrieve(
+    index: ShardedFaissIndex,
+    lexical: BM25Index,
+    q_vec: np.ndarray,
+    prompt: str,
+    top_k: int,
+    trace: Optional[QueryTrace] = None,
+) -> Tuple[List[int], Dict[int, float]]:
+    """
+    Run dense + BM25 retrieval in parallel and fuse with RRF.
+    Returns (fused ids, id -> semantic score in [0, 1]). With both retrievers
+    hitting, the score is the normalized RRF score scaled to the page's best
+    cosine, so an exact keyword match can outrank weaker dense hits; with one,
+    it is that retriever's own score (cosine, or BM25 relative to the best hit).
+    """
+    return hybrid_retrieve_many(index, lexical, q_vec, [prompt], [top_k], trace)[0]
+
+
+def hybrid_retrieve_many(
+    index: ShardedFaissIndex,
+    lexical: BM25Index,
+    q_vecs: np.ndarray,
+    prompts: Sequence[str],
+    top_ks: Sequence[int],
+    trace: Optional[QueryTrace] = None,
+) -> List[Tuple[List[int], Dict[int, float]]]:
+    """Batched hybrid_retrieve: a single FAISS call for all queries, one BM25 pass each."""
+    k_max = max(top_ks) if top_ks else 0
+    dense_f = _pool.submit(_dense, index, q_vecs, k_max, trace)
+    lex_f = _pool.submit(_lexical_many, lexical, prompts, top_ks, trace)
+    dense_all, lex_all = dense_f.result(), lex_f.result()
+    with timed(trace, "rrf_fuse") as rec:
+        fused = [
+            _fuse(dense_all[qi][:k], lex_all[qi], k)
+            for qi, k in enumerate(top_ks)
+        ]
+        rec["n_out"] = sum(len(ids) for ids, _ in fused)
+    return fused
@@ -1,6 +1,7 @@
-import re
 from typing import List, Dict, Set
 
+from .skills import compiled_terms
+
 # Canonical role tags (keep simple, readable)
 ROLES: Set[str] = {
     "frontend", "backend", "fullstack", "web", "mobile",
@@ -190,16 +191,19 @@ ROLE_TO_CORE_SKILLS: Dict[str, List[str]] = {
     "engineering-manager": ["leadership", "management"],
 }
 
+ROLE_ALIAS_PATTERNS = compiled_terms(ROLE_ALIASES)
+ROLE_PATTERNS = compiled_terms(sorted(ROLES))
+
 def normalize_role_text(txt: str) -> List[str]:
     low = txt.lower()
     found = set()
     # alias pass
-    for k, v in ROLE_ALIASES.items():
-        if re.search(rf"\b{re.escape(k)}\b", low):
-            found.add(v)
+    for k, rx in ROLE_ALIAS_PATTERNS:
+        if rx.search(low):
+            found.add(ROLE_ALIASES[k])
     # direct canonical tokens
-    for r in ROLES:
-        if re.search(rf"\b{re.escape(r)}\b", low):
+    for r, rx in ROLE_PATTERNS:
+        if rx.search(low):
             found.add(r)
     return sorted(found)
 
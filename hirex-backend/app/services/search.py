@@ -1,6 +1,8 @@
 import json
-from typing import List, Optional
+from typing import Dict, List, Optional
+from sqlalchemy import func, or_
 from ..db import Candidate
+from .prompt_parser import QueryPlan
 
 def apply_filters(
     rows: List[Candidate],
@@ -16,6 +18,7 @@ def apply_filters(
     require_extracurricular: bool,
     require_por: bool,
     roles_any_of: List[str],  # NEW: role filtering
+    texts: Optional[Dict[int, str]] = None,  # resume texts by id; only read for contains_phrase
 ) -> List[Candidate]:
     must = set(must_have or [])
     edu = set(education_any_of or [])
@@ -56,7 +59,7 @@ def apply_filters(
 
         # phrase match in projects or entire text
         if phrase:
-            text_low = (r.parsed_text or "").lower()
+            text_low = ((texts or {}).get(r.id) or "").lower()
             in_projects = any(
                 phrase in (p.get("title", "").lower() + " " + p.get("desc", "").lower())
                 for p in rprojects
@@ -81,3 +84,38 @@ def best_snippet(text: str, phrase_or_query: str, window: int = 220) -> str:
     start = max(0, i - window // 2)
     end = min(len(text), start + window)
     return text[start:end].replace("\n", " ")
+
+
+def _json_has(col, value: str):
+    # JSON list columns are stored as text; a quoted LIKE is a cheap superset match
+    return col.like(f'%{json.dumps(value, ensure_ascii=False)}%')
+
+
+def structured_conditions(plan: QueryPlan) -> list:
+    """
+    SQL predicates equivalent to (or a superset of) apply_filters for this plan, so a
+    selective query can be resolved in the DB before any vector work. Rows still go
+    through apply_filters afterwards for the exact JSON/phrase semantics.
+    """
+    conds = []
+    if plan.min_experience:
+        conds.append(Candidate.years_experience >= plan.min_experience)
+    if plan.min_cgpa is not None:
+        conds.append(Candidate.cgpa >= plan.min_cgpa)
+    if plan.min_projects:
+        conds.append(Candidate.project_count >= plan.min_projects)
+    if plan.min_hackathon_wins:
+        conds.append(Candidate.hackathon_wins >= plan.min_hackathon_wins)
+    if plan.require_extracurricular:
+        conds.append(Candidate.extracurricular_score > 0)
+    if plan.require_por:
+        conds.append(Candidate.por_score > 0)
+    for skill in plan.must_have_skills:
+        conds.append(_json_has(Candidate.skills, skill))
+    if plan.education_any_of:
+        conds.append(or_(*[_json_has(Candidate.institutions, e) for e in plan.education_any_of]))
+    if plan.roles:
+        conds.append(or_(*[_json_has(Candidate.roles, r) for r in plan.roles]))
+    if plan.location:
+        conds.append(func.lower(Candidate.location) == plan.location.lower())
+    return conds
@@ -1,6 +1,6 @@
 import json
 import re
-from typing import List, Tuple
+from typing import Iterable, List, Pattern, Tuple
 
 # add these near HARD_SKILLS / ALIASES
 
@@ -9,7 +9,7 @@ from typing import List, Tuple
 MERN_EXPANSION = {"mern": ["mongodb", "express", "react", "node"]}
 
 def extract_skills(text: str) -> List[str]:
-    out = set(find_terms(text, HARD_SKILLS))
+    out = set(find_terms(text, HARD_SKILL_PATTERNS))
     low = text.lower()
     for k, v in ALIASES.items():
         if re.search(rf"\b{re.escape(k)}\b", low):
@@ -61,24 +61,30 @@ SOFT_SKILLS = [
     "presentation", "time management", "empathy", "adaptability"
 ]
 
-def find_terms(text: str, vocab: List[str]) -> List[str]:
+TermPatterns = Tuple[Tuple[str, Pattern], ...]
+
+def compiled_terms(vocab: Iterable[str]) -> TermPatterns:
+    """Word-bounded pattern per lexicon term; build these once, at import."""
+    return tuple((t, re.compile(rf"\b{re.escape(t)}\b")) for t in vocab)
+
+HARD_SKILL_PATTERNS = compiled_terms(dict.fromkeys(HARD_SKILLS))  # the list repeats a few terms
+ALIAS_PATTERNS = compiled_terms(ALIASES)
+SOFT_SKILL_PATTERNS = compiled_terms(SOFT_SKILLS)
+
+def find_terms(text: str, patterns: TermPatterns) -> List[str]:
     low = text.lower()
-    found = set()
-    for t in vocab:
-        if re.search(rf"\b{re.escape(t)}\b", low):
-            found.add(t)
-    return sorted(found)
+    return sorted({t for t, rx in patterns if rx.search(low)})
 
 def extract_skills(text: str) -> List[str]:
-    out = set(find_terms(text, HARD_SKILLS))
+    out = set(find_terms(text, HARD_SKILL_PATTERNS))
     low = text.lower()
-    for k, v in ALIASES.items():
-        if re.search(rf"\b{re.escape(k)}\b", low):
-            out.add(v)
+    for k, rx in ALIAS_PATTERNS:
+        if rx.search(low):
+            out.add(ALIASES[k])
     return sorted(out)
 
 def extract_soft_skills(text: str) -> List[str]:
-    return find_terms(text, SOFT_SKILLS)
+    return find_terms(text, SOFT_SKILL_PATTERNS)
 
 def to_json(lst: List[str]) -> str:
     return json.dumps(sorted(list(set(lst))), ensure_ascii=False)
@@ -0,0 +1,360 @@
+"""
+Snapshot export / import: candidates, resume texts and embeddings as NumPy
+columns plus a JSON manifest with SHA-256 checksums. Restoring or cloning an
+environment loads the columns in bulk and rebuilds the FAISS shards from the
+stored vectors, so nothing is re-parsed or re-embedded.
+
+Layout of a snapshot directory:
+
+    manifest.json       format, counts, column kinds, embedding model/dim, checksums
+    candidate.npz       one array per column (strings: utf-8 data + offsets; nulls: mask)
+    resume_text.npz     compressed texts exactly as stored (codec per row)
+    embeddings.npy      float32 (n, dim), row i belongs to embedding_ids[i]
+    embedding_ids.npy   int64
+    files/              resume blobs, only with --with-files (named by their sha256)
+
+    python -m app.services.snapshot export /backups/hirex-2024-06-01 [--with-files]
+    python -m app.services.snapshot verify /backups/hirex-2024-06-01
+    python -m app.services.snapshot import /backups/hirex-2024-06-01 [--replace] [--force]
+
+Export can run next to a live API (one read transaction, vectors read from the
+saved shards). Stop the API before importing: it holds the index in memory.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, delete, func, select
+from sqlalchemy.engine import Connection
+
+from ..config import settings
+from ..db import Candidate, ResumeText, engine, read_engine
+from ..utils.files import blob_path, store_stream
+from .extraction import EXTRACTOR_VERSION
+from .indexer import ShardedFaissIndex, load_saved
+
+logger = logging.getLogger("hirex.snapshot")
+
+FORMAT = "hirex-snapshot"
+FORMAT_VERSION = 1
+INSERT_CHUNK = 5000
+_KINDS = {int: "int", bool: "int", float: "float", str: "str", datetime: "datetime", bytes: "bytes"}
+
+
+# -----------------------------------------------------------------------------
+# Columnar encoding (plain NumPy, no pickled objects)
+# -----------------------------------------------------------------------------
+def _kind(col) -> str:
+    try:
+        return _KINDS.get(col.type.python_type, "str")
+    except NotImplementedError:  # sqlmodel's AutoString
+        return "str"
+
+
+def _column_kinds(table) -> Dict[str, str]:
+    return {c.name: _kind(c) for c in table.columns}
+
+
+def _pack(name: str, kind: str, values: list, out: Dict[str, np.ndarray]) -> None:
+    null = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+    if null.any():
+        out[f"{name}.null"] = null
+    if kind == "int":
+        out[name] = np.array([0 if v is None else int(v) for v in values], dtype="int64")
+    elif kind == "float":
+        out[name] = np.array([np.nan if v is None else float(v) for v in values], dtype="float64")
+    else:
+        if kind == "bytes":
+            enc = [v or b"" for v in values]
+        elif kind == "datetime":
+            enc = [v.isoformat().encode() if v is not None else b"" for v in values]
+        else:
+            enc = [v.encode("utf-8") if v is not None else b"" for v in values]
+        offsets = np.zeros(len(enc) + 1, dtype="int64")
+        np.cumsum([len(b) for b in enc], out=offsets[1:])
+        out[f"{name}.offsets"] = offsets
+        out[f"{name}.data"] = np.frombuffer(b"".join(enc), dtype="uint8")
+
+
+def _unpack(name: str, kind: str, arrays) -> list:
+    if kind in ("int", "float"):
+        values = arrays[name].tolist()
+    else:
+        offsets = arrays[f"{name}.offsets"].tolist()
+        buf = arrays[f"{name}.data"].tobytes()
+        raw = [buf[offsets[i]: offsets[i + 1]] for i in range(len(offsets) - 1)]
+        if kind == "bytes":
+            values = raw
+        elif kind == "datetime":
+            values = [datetime.fromisoformat(b.decode()) if b else None for b in raw]
+        else:
+            values = [b.decode("utf-8") for b in raw]
+    if f"{name}.null" in arrays.files:
+        null = arrays[f"{name}.null"].tolist()
+        values = [None if n else v for v, n in zip(values, null)]
+    return values
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# -----------------------------------------------------------------------------
+# Export
+# -----------------------------------------------------------------------------
+def _read_table(conn: Connection, table, order_by) -> Tuple[List[str], List[tuple]]:
+    result = conn.execute(select(table).order_by(order_by))
+    return list(result.keys()), result.all()
+
+
+def export_snapshot(out_dir: str, with_files: bool = False) -> dict:
+    t0 = time.perf_counter()
+    out = Path(out_dir)
+    if out.exists():
+        raise SystemExit(f"{out} already exists")
+    work = out.with_name(out.name + ".partial")
+    if work.exists():
+        shutil.rmtree(work)
+    work.mkdir(parents=True)
+
+    # One read transaction: candidates and texts come from the same DB snapshot
+    with read_engine.connect() as conn, conn.begin():
+        cand_table, text_table = Candidate.__table__, ResumeText.__table__
+        cand_cols, cand_rows = _read_table(conn, cand_table, cand_table.c.id)
+        text_cols, text_rows = _read_table(conn, text_table, text_table.c.candidate_id)
+        schema_version = conn.exec_driver_sql("SELECT MAX(version) FROM schema_migrations").scalar()
+
+    kinds = {"candidate": _column_kinds(cand_table), "resume_text": _column_kinds(text_table)}
+    for fname, table, cols, rows in (
+        ("candidate.npz", "candidate", cand_cols, cand_rows),
+        ("resume_text.npz", "resume_text", text_cols, text_rows),
+    ):
+        arrays: Dict[str, np.ndarray] = {}
+        for i, col in enumerate(cols):
+            _pack(col, kinds[table][col], [r[i] for r in rows], arrays)
+        # texts are already zstd/zlib; compressing them again only costs time
+        (np.savez_compressed if table == "candidate" else np.savez)(work / fname, **arrays)
+
+    ids = [r[cand_cols.index("id")] for r in cand_rows]
+    index = load_saved()
+    if index is not None:
+        found, vecs = index.vectors_for(ids)
+        orphans = len(set(index.ids()) - set(ids))
+        dim = index.dim
+    else:
+        found, vecs, orphans, dim = [], np.zeros((0, 0), dtype="float32"), 0, 0
+    np.save(work / "embeddings.npy", np.ascontiguousarray(vecs, dtype="float32"))
+    np.save(work / "embedding_ids.npy", np.array(found, dtype="int64"))
+
+    n_files = 0
+    if with_files:
+        (work / "files").mkdir()
+        path_i, sha_i = cand_cols.index("resume_path"), cand_cols.index("file_sha256")
+        for r in cand_rows:
+            src = Path(r[path_i])
+            if r[sha_i] and src.exists():
+                dst = work / "files" / f"{r[sha_i]}{src.suffix.lower()}"
+                if not dst.exists():
+                    shutil.copyfile(src, dst)
+                    n_files += 1
+
+    manifest = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "schema_version": schema_version,
+        "extractor_version": EXTRACTOR_VERSION,
+        "embedding": {"model": settings.EMBEDDING_MODEL, "dim": dim, "metric": "inner_product"},
+        "index": {"shard_size": settings.FAISS_SHARD_SIZE},
+        "counts": {
+            "candidates": len(cand_rows),
+            "resume_texts": len(text_rows),
+            "embeddings": len(found),
+            "missing_vectors": len(ids) - len(found),
+            "orphan_vectors_skipped": orphans,
+            "files": n_files,
+        },
+        "columns": kinds,
+        "files": {
+            p.name: {"sha256": _sha256(p), "bytes": p.stat().st_size}
+            for p in sorted(work.iterdir())
+            if p.is_file()
+        },
+    }
+    (work / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(work, out)  # a snapshot directory is either complete or absent
+    logger.info("Exported %s in %.1fs: %s", out, time.perf_counter() - t0, manifest["counts"])
+    return manifest
+
+
+# -----------------------------------------------------------------------------
+# Import
+# -----------------------------------------------------------------------------
+def verify_snapshot(src_dir: str) -> dict:
+    """Manifest of a complete, untampered snapshot; SystemExit otherwise."""
+    src = Path(src_dir)
+    try:
+        manifest = json.loads((src / "manifest.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise SystemExit(f"{src}: no manifest.json")
+    if manifest.get("format") != FORMAT or manifest.get("format_version", 0) > FORMAT_VERSION:
+        raise SystemExit(f"{src}: unsupported snapshot format {manifest.get('format')} v{manifest.get('format_version')}")
+    for name, meta in manifest["files"].items():
+        path = src / name
+        if not path.exists():
+            raise SystemExit(f"{src}: {name} is missing")
+        if path.stat().st_size != meta["bytes"] or _sha256(path) != meta["sha256"]:
+            raise SystemExit(f"{src}: checksum mismatch on {name}")
+    return manifest
+
+
+def _bulk_insert(conn: Connection, table, kinds: Dict[str, str], arrays) -> int:
+    cols = [c.name for c in table.columns if c.name in kinds]
+    extra = sorted(set(kinds) - set(cols))
+    if extra:
+        logger.warning("%s: snapshot columns not in this schema are skipped: %s", table.name, ", ".join(extra))
+    data = [_unpack(c, kinds[c], arrays) for c in cols]
+    n = len(data[0]) if data else 0
+    for start in range(0, n, INSERT_CHUNK):
+        stop = min(start + INSERT_CHUNK, n)
+        conn.execute(table.insert(), [
+            {c: data[j][i] for j, c in enumerate(cols)} for i in range(start, stop)
+        ])
+    return n
+
+
+def _rehome_resume_paths(conn: Connection) -> int:
+    """Point content-addressed rows at this deployment's RESUME_DIR."""
+    rows = conn.execute(
+        select(Candidate.id, Candidate.resume_path, Candidate.file_sha256).where(Candidate.file_sha256.is_not(None))
+    ).all()
+    updates = [
+        {"b_id": cid, "path": str(blob_path(sha, Path(path).suffix))}
+        for cid, path, sha in rows
+        if str(blob_path(sha, Path(path).suffix)) != path
+    ]
+    if updates:
+        table = Candidate.__table__
+        conn.execute(
+            table.update().where(table.c.id == bindparam("b_id")).values(resume_path=bindparam("path")),
+            updates,
+        )
+    return len(updates)
+
+
+def _rebuild_index(ids: np.ndarray, vecs: np.ndarray, names: Dict[int, str], dim: int) -> int:
+    """Write fresh shards off to the side, then swap the directory in."""
+    live = Path(settings.FAISS_SHARD_DIR)
+    staging = live.with_name(live.name + ".import")
+    old = live.with_name(live.name + ".old")
+    for d in (staging, old):
+        if d.exists():
+            shutil.rmtree(d)
+    index = ShardedFaissIndex(dim, shard_dir=str(staging))
+    for start in range(0, len(ids), INSERT_CHUNK):
+        chunk = ids[start: start + INSERT_CHUNK].tolist()
+        index.add(vecs[start: start + INSERT_CHUNK], [{"id": i, "name": names.get(i, "")} for i in chunk])
+    index.save()
+    if live.exists():
+        os.replace(live, old)
+    os.replace(staging, live)
+    shutil.rmtree(old, ignore_errors=True)
+    for legacy in (settings.FAISS_INDEX_PATH, settings.FAISS_META_PATH):
+        if os.path.exists(legacy):  # superseded; would otherwise be migrated into an empty shard dir
+            os.unlink(legacy)
+    return index.ntotal
+
+
+def import_snapshot(src_dir: str, replace: bool = False, force: bool = False) -> dict:
+    t0 = time.perf_counter()
+    src = Path(src_dir)
+    manifest = verify_snapshot(src_dir)
+    model = manifest["embedding"]["model"]
+    if model != settings.EMBEDDING_MODEL and not force:
+        raise SystemExit(
+            f"snapshot vectors come from {model}, this deployment embeds with {settings.EMBEDDING_MODEL} "
+            "(--force to load them anyway)"
+        )
+
+    from ..db import init_db
+    init_db()  # bring the target schema up to date before loading into it
+
+    kinds = manifest["columns"]
+    counts = {}
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(Candidate.__table__)).scalar()
+        if existing and not replace:
+            raise SystemExit(f"target already has {existing} candidates (--replace to overwrite them)")
+        if existing:
+            conn.execute(delete(ResumeText.__table__))
+            conn.execute(delete(Candidate.__table__))
+        with np.load(src / "candidate.npz") as arrays:
+            counts["candidates"] = _bulk_insert(conn, Candidate.__table__, kinds["candidate"], arrays)
+            ids = arrays["id"].tolist()
+            names = dict(zip(ids, _unpack("name", kinds["candidate"]["name"], arrays)))
+        with np.load(src / "resume_text.npz") as arrays:
+            counts["resume_texts"] = _bulk_insert(conn, ResumeText.__table__, kinds["resume_text"], arrays)
+        counts["paths_rehomed"] = _rehome_resume_paths(conn)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE candidate")  # planner stats for the freshly loaded table
+
+    files_dir = src / "files"
+    counts["files"] = 0
+    if files_dir.is_dir():
+        for blob in files_dir.iterdir():
+            with open(blob, "rb") as f:
+                stored = store_stream(f, blob.name)
+            if stored.sha256 != blob.stem:
+                raise SystemExit(f"{blob.name}: content does not match its hash")
+            counts["files"] += 1
+
+    emb_ids = np.load(src / "embedding_ids.npy")
+    vecs = np.load(src / "embeddings.npy", mmap_mode="r")
+    # always: with --replace an empty snapshot must also clear the old shards
+    counts["vectors"] = _rebuild_index(emb_ids, vecs, names, manifest["embedding"]["dim"])
+
+    logger.info("Imported %s in %.1fs: %s", src, time.perf_counter() - t0, counts)
+    return counts
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="HireX snapshot export / import")
+    sub = ap.add_subparsers(dest="command", required=True)
+    ex = sub.add_parser("export", help="write a snapshot of the current deployment")
+    ex.add_argument("path")
+    ex.add_argument("--with-files", action="store_true", help="also copy the resume files")
+    ve = sub.add_parser("verify", help="check a snapshot's manifest and checksums")
+    ve.add_argument("path")
+    im = sub.add_parser("import", help="load a snapshot into this deployment (API stopped)")
+    im.add_argument("path")
+    im.add_argument("--replace", action="store_true", help="overwrite existing candidates")
+    im.add_argument("--force", action="store_true", help="accept vectors from a different embedding model")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "export":
+        manifest = export_snapshot(args.path, with_files=args.with_files)
+        print(json.dumps(manifest["counts"], indent=2))
+    elif args.command == "verify":
+        manifest = verify_snapshot(args.path)
+        print(f"ok: {manifest['created_at']} {json.dumps(manifest['counts'])}")
+    else:
+        print(json.dumps(import_snapshot(args.path, replace=args.replace, force=args.force), indent=2))
+        print("Start the API to rebuild the lexical index and planner stats from the imported rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import json
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Iterable, Mapping
+
+from .prompt_parser import QueryPlan
+
+
+class CorpusStats:
+    """
+    Lightweight per-column statistics over the candidate table, used to estimate how
+    many candidates a QueryPlan's structured filters will match. Filters are treated
+    as independent, so the estimate is N * product of per-filter fractions. Only
+    filters that search.structured_conditions turns into SQL count: the estimate
+    sizes the filter-first SQL query, and the phrase filter only runs afterwards.
+    """
+
+    NUMERIC = ("years_experience", "cgpa", "project_count", "hackathon_wins")
+
+    def __init__(self):
+        self.total = 0
+        self.sorted_vals = {col: [] for col in self.NUMERIC}
+        self.skills: Counter = Counter()
+        self.institutions: Counter = Counter()
+        self.roles: Counter = Counter()
+        self.locations: Counter = Counter()
+        self.extracurricular = 0
+        self.por = 0
+        self._lock = threading.Lock()
+
+    def add(self, row: Mapping) -> None:
+        """Observe one candidate (a record dict or anything with the same keys)."""
+        with self._lock:
+            for col in self.NUMERIC:
+                insort(self.sorted_vals[col], float(row.get(col) or 0))
+            self._observe(row)
+
+    def add_many(self, rows: Iterable[Mapping]) -> None:
+        with self._lock:
+            for row in rows:
+                for col in self.NUMERIC:
+                    self.sorted_vals[col].append(float(row.get(col) or 0))
+                self._observe(row)
+            for vals in self.sorted_vals.values():
+                vals.sort()
+
+    def _observe(self, row: Mapping) -> None:
+        self.total += 1
+        self.skills.update(set(json.loads(row.get("skills") or "[]")))
+        self.institutions.update(set(json.loads(row.get("institutions") or "[]")))
+        self.roles.update(set(json.loads(row.get("roles") or "[]")))
+        if row.get("location"):
+            self.locations[row["location"].lower()] += 1
+        self.extracurricular += 1 if (row.get("extracurricular_score") or 0) > 0 else 0
+        self.por += 1 if (row.get("por_score") or 0) > 0 else 0
+
+    def _frac_at_least(self, col: str, threshold: float) -> float:
+        vals = self.sorted_vals[col]
+        return (len(vals) - bisect_left(vals, threshold)) / len(vals)
+
+    def _frac_any(self, counter: Counter, keys: Iterable[str]) -> float:
+        return min(1.0, sum(counter.get(k, 0) for k in keys) / self.total)
+
+    def selectivity(self, plan: QueryPlan) -> float:
+        """Estimated fraction of the corpus passing the plan's SQL-resolvable filters."""
+        with self._lock:
+            if self.total == 0:
+                return 0.0
+            frac = 1.0
+            if plan.min_experience:
+                frac *= self._frac_at_least("years_experience", plan.min_experience)
+            if plan.min_cgpa is not None:
+                frac *= self._frac_at_least("cgpa", plan.min_cgpa)
+            if plan.min_projects:
+                frac *= self._frac_at_least("project_count", plan.min_projects)
+            if plan.min_hackathon_wins:
+                frac *= self._frac_at_least("hackathon_wins", plan.min_hackathon_wins)
+            for skill in plan.must_have_skills:
+                frac *= self.skills.get(skill, 0) / self.total
+            if plan.education_any_of:
+                frac *= self._frac_any(self.institutions, plan.education_any_of)
+            if plan.roles:
+                frac *= self._frac_any(self.roles, plan.roles)
+            if plan.location:
+                frac *= self.locations.get(plan.location.lower(), 0) / self.total
+            if plan.require_extracurricular:
+                frac *= self.extracurricular / self.total
+            if plan.require_por:
+                frac *= self.por / self.total
+            return frac
+
+
+# Candidate columns CorpusStats needs (kept small: no resume text)
+STATS_COLUMNS = (
+    *CorpusStats.NUMERIC, "skills", "institutions", "roles", "location",
+    "extracurricular_score", "por_score",
+)
@@ -0,0 +1,172 @@
+"""
+Out-of-row resume text. The full text lives in the resume_text table, compressed,
+so the hot candidate table only carries the columns that filtering and ranking
+read. Texts are loaded by id, only where they are needed (snippets, the phrase
+filter, rerank, the BM25 rebuild and re-extraction).
+
+zstd is used when the `zstandard` package is installed, zlib otherwise; the codec
+is stored per row, so a deployment can switch without rewriting old rows.
+"""
+import logging
+import sqlite3
+import zlib
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+
+from ..db import ResumeText
+
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+logger = logging.getLogger("hirex.textstore")
+
+ZSTD_LEVEL = 6
+ZLIB_LEVEL = 6
+
+
+def compress(raw: str) -> Tuple[str, bytes]:
+    data = (raw or "").encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(codec: str, data: bytes) -> str:
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("resume text is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    raise ValueError(f"unknown resume text codec: {codec}")
+
+
+def make_row(candidate_id: int, raw: str) -> ResumeText:
+    codec, data = compress(raw)
+    return ResumeText(candidate_id=candidate_id, codec=codec, size=len((raw or "").encode("utf-8")), data=data)
+
+
+def put_texts(session: Session, items: Iterable[Tuple[int, str]], replace: bool = False) -> None:
+    """Stage (candidate id, text) rows in the caller's transaction; replace=True upserts."""
+    for cid, raw in items:
+        if replace:
+            session.merge(make_row(cid, raw))
+        else:
+            session.add(make_row(cid, raw))
+
+
+def load_texts(session: Session, ids: Iterable[int]) -> Dict[int, str]:
+    """Decompressed texts by candidate id; ids without a stored text are absent."""
+    ids = list(ids)
+    out: Dict[int, str] = {}
+    for start in range(0, len(ids), 500):  # stay under SQLite's bound-parameter limit
+        chunk = ids[start: start + 500]
+        rows = session.exec(
+            select(ResumeText.candidate_id, ResumeText.codec, ResumeText.data)
+            .where(ResumeText.candidate_id.in_(chunk))
+        ).all()
+        for cid, codec, data in rows:
+            out[cid] = decompress(codec, data)
+    return out
+
+
+def iter_texts(session: Session, batch: int = 1000) -> Iterator[Tuple[int, str]]:
+    """Every stored text in id order, a batch at a time (BM25 rebuild, re-extraction)."""
+    last = 0
+    while True:
+        rows = session.exec(
+            select(ResumeText.candidate_id, ResumeText.codec, ResumeText.data)
+            .where(ResumeText.candidate_id > last)
+            .order_by(ResumeText.candidate_id)
+            .limit(batch)
+        ).all()
+        if not rows:
+            return
+        for cid, codec, data in rows:
+            yield cid, decompress(codec, data)
+        last = rows[-1][0]
+
+
+def _rebuild_without(conn: Connection, table: str, column: str) -> None:
+    """
+    DROP COLUMN for SQLite < 3.35: copy the table without the column, drop the
+    old one, rename the copy into place and re-create the table's indexes.
+    """
+    old = Table(table, MetaData(), autoload_with=conn)
+    keep = [c for c in old.columns if c.name != column]
+    index_sql = [r[0] for r in conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :t AND sql IS NOT NULL"),
+        {"t": table},
+    )]
+    tmp = f"{table}__rebuild"
+    conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{tmp}"')
+    Table(tmp, MetaData(), *[c._copy() for c in keep]).create(conn)
+    cols = ", ".join(f'"{c.name}"' for c in keep)
+    conn.exec_driver_sql(f'INSERT INTO "{tmp}" ({cols}) SELECT {cols} FROM "{table}"')
+    conn.exec_driver_sql(f'DROP TABLE "{table}"')
+    conn.exec_driver_sql(f'ALTER TABLE "{tmp}" RENAME TO "{table}"')
+    for sql in index_sql:
+        conn.exec_driver_sql(sql)
+
+
+def _copy_inline_text(engine, batch: int) -> int:
+    moved, last = 0, 0
+    with Session(engine) as session:
+        while True:
+            rows: List[Tuple[int, str]] = session.execute(
+                text("SELECT id, parsed_text FROM candidate WHERE id > :last ORDER BY id LIMIT :n"),
+                {"last": last, "n": batch},
+            ).all()
+            if not rows:
+                return moved
+            put_texts(session, rows, replace=True)  # safe to rerun after a partial move
+            session.commit()
+            moved += len(rows)
+            last = rows[-1][0]
+
+
+def _has_inline_text(conn) -> bool:
+    return "parsed_text" in {c["name"] for c in inspect(conn).get_columns("candidate")}
+
+
+def migrate_inline_text(engine, batch: int = 500) -> int:
+    """
+    One-off move of the legacy candidate.parsed_text column into resume_text,
+    then drop the column and VACUUM so the candidate table is rewritten compact.
+    Returns the number of rows moved (0 when already done).
+
+    Workers starting together may all get here: the copy is an upsert, the drop
+    re-checks the column inside a write transaction (BEGIN IMMEDIATE on the
+    SQLite writer), so only the first worker drops it, and a worker still copying
+    when the column goes away stops there. SQLite
+    before 3.35 has no DROP COLUMN; the table is rebuilt instead.
+    """
+    if not _has_inline_text(engine):
+        return 0
+    try:
+        moved = _copy_inline_text(engine, batch)
+    except OperationalError:
+        if _has_inline_text(engine):
+            raise
+        return 0  # another worker finished the move and dropped the column meanwhile
+    with engine.begin() as conn:
+        if not _has_inline_text(conn):
+            return 0  # another worker finished first
+        if engine.dialect.name == "sqlite" and sqlite3.sqlite_version_info < (3, 35, 0):
+            _rebuild_without(conn, "candidate", "parsed_text")
+        else:
+            conn.exec_driver_sql("ALTER TABLE candidate DROP COLUMN parsed_text")
+    if engine.dialect.name == "sqlite":
+        raw = engine.raw_connection()  # bypasses our BEGIN hook; VACUUM can't run in a transaction
+        try:
+            raw.driver_connection.execute("VACUUM")
+        finally:
+            raw.close()
+    logger.info("Moved %d resume texts out of the candidate table", moved)
+    return moved
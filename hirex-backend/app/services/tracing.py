@@ -0,0 +1,75 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .metrics import STAGE_LATENCY
+
+
+class QueryTrace:
+    """
+    Per-request stage timings for the recruiter search pipeline.
+    Each stage records wall time and candidate counts in/out, plus CPU time when the
+    stage runs synchronously on one thread. thread_time() across an await would also
+    count whatever else the event loop ran meanwhile, so stages that await are opened
+    with cpu=False; work they hand to pools shows up in that pool's own stages.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.stages: List[Dict[str, Any]] = []
+        self.cache_hit = False
+        self.plan: Optional[Dict[str, Any]] = None
+        self._wall0 = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, n_in: Optional[int] = None, cpu: bool = True) -> Iterator[Dict[str, Any]]:
+        """Time a block; the caller may set rec["n_out"] (or other fields) on the yielded dict."""
+        rec: Dict[str, Any] = {"stage": name}
+        if n_in is not None:
+            rec["n_in"] = n_in
+        tid, w0, c0 = threading.get_ident(), time.perf_counter(), time.thread_time()
+        try:
+            yield rec
+        finally:
+            wall = time.perf_counter() - w0
+            STAGE_LATENCY.observe(wall, stage=name)
+            rec["wall_ms"] = round(wall * 1000, 3)
+            if cpu and threading.get_ident() == tid:
+                rec["cpu_ms"] = round((time.thread_time() - c0) * 1000, 3)
+            self.stages.append(rec)
+
+    def record(self, name: str, wall_s: float, cpu_s: float, **fields: Any) -> None:
+        """Add a stage timed elsewhere (e.g. inside a worker thread)."""
+        STAGE_LATENCY.observe(wall_s, stage=name)
+        self.stages.append(
+            {"stage": name, **fields, "wall_ms": round(wall_s * 1000, 3), "cpu_ms": round(cpu_s * 1000, 3)}
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict(self.plan or {})
+        out.update(
+            endpoint=self.endpoint,
+            cache_hit=self.cache_hit,
+            total_wall_ms=round((time.perf_counter() - self._wall0) * 1000, 3),
+            total_cpu_ms=round(sum(st.get("cpu_ms", 0.0) for st in self.stages), 3),
+            stages=list(self.stages),
+        )
+        return out
+
+    def log(self, logger: logging.Logger) -> Dict[str, Any]:
+        summary = self.summary()
+        logger.info("query trace: %s", json.dumps(summary, ensure_ascii=False))
+        return summary
+
+
+@contextmanager
+def timed(trace: Optional[QueryTrace], name: str, n_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """trace.stage() that tolerates trace=None (callers outside a request)."""
+    if trace is None:
+        yield {}
+    else:
+        with trace.stage(name, n_in) as rec:
+            yield rec
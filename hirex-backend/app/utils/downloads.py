@@ -0,0 +1,142 @@
+"""
+Conditional + ranged file responses (Starlette 0.38's FileResponse does neither).
+
+- ETag / If-None-Match -> 304 with no body
+- Range: bytes=a-b | a- | -n (single range) -> 206; unsatisfiable -> 416;
+  If-Range with a stale or weak validator falls back to the full file
+- Body goes out zero-copy when the server offers the ASGI `http.response.zerocopy`
+  or `http.response.pathsend` extension; otherwise it is streamed in chunks read
+  off the event loop.
+"""
+import os
+import re
+from typing import Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.responses import Response
+
+CHUNK = 1 << 16
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as RFC 9110 requires for If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == bare:
+            return True
+    return False
+
+
+def if_range_matches(if_range: str, etag: str) -> bool:
+    """Strong comparison, as RFC 9110 requires for If-Range: weak tags never match."""
+    tag = if_range.strip()
+    return tag == etag and not etag.startswith("W/")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single byte range, None to send the whole file,
+    or (-1, -1) when the range cannot be satisfied. Multi-range requests are
+    answered with the whole file, which RFC 9110 allows.
+    """
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m:
+        return None
+    first, last = m.groups()
+    if not first and not last:
+        return None
+    if not first:                       # suffix: last N bytes
+        n = int(last)
+        if n == 0:
+            return (-1, -1)
+        return (max(0, size - n), size - 1)
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return (-1, -1)
+    return (start, end)
+
+
+class ResumeFileResponse(Response):
+    def __init__(
+        self,
+        path: str,
+        request_headers: Mapping[str, str],
+        *,
+        size: int,
+        etag: str,
+        media_type: str,
+        filename: str,
+        max_age: int = 0,
+    ):
+        super().__init__(media_type=media_type)
+        self.path = path
+        self.span: Optional[Tuple[int, int]] = None
+        h = self.headers
+        h["etag"] = etag
+        h["accept-ranges"] = "bytes"
+        h["cache-control"] = f"private, max-age={max_age}"
+        h["content-disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            self.status_code = 304
+            del h["content-type"]
+            del h["content-length"]
+            return
+        if_range = request_headers.get("if-range")
+        span = parse_range(request_headers.get("range"), size)
+        if span is not None and if_range and not if_range_matches(if_range, etag):
+            span = None  # the client's partial copy is stale: send everything
+        if span == (-1, -1):
+            self.status_code = 416
+            h["content-range"] = f"bytes */{size}"
+            h["content-length"] = "0"
+            return
+        if span is not None:
+            self.status_code = 206
+            h["content-range"] = f"bytes {span[0]}-{span[1]}/{size}"
+        self.span = span or (0, size - 1)
+        h["content-length"] = str(self.span[1] - self.span[0] + 1)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.span is None or scope.get("method") == "HEAD" or self.status_code in (304, 416):
+            await send({"type": "http.response.body", "body": b""})
+            return
+        start, end = self.span
+        count = end - start + 1
+        if count <= 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        extensions = scope.get("extensions") or {}
+
+        if "http.response.zerocopy" in extensions:
+            # the extension takes the file object; the send returns once the server is
+            # done with it, so it stays open until then
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopy", "file": f, "offset": start, "count": count})
+            return
+        if "http.response.pathsend" in extensions and self.status_code == 200:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+            return
+
+        async with await anyio.open_file(self.path, "rb") as f:
+            await f.seek(start)
+            remaining = count
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:  # file shrank underneath us; terminate the body anyway
+            await send({"type": "http.response.body", "body": b""})
@@ -1,11 +1,101 @@
-import shutil
+"""
+Content-addressed resume store. Files are named by their SHA-256 and sharded two
+levels deep (RESUME_DIR/ab/cd/abcd...<ext>), so identical uploads share one blob,
+same-named uploads never overwrite each other and no directory grows unbounded.
+The extension is kept because the parser dispatches on it.
+"""
+import hashlib
+import mimetypes
+import os
+import tempfile
 from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
 from fastapi import UploadFile
 from ..config import settings
 
-def save_upload(file: UploadFile) -> str:
-    dest = Path(settings.RESUME_DIR) / file.filename
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    with dest.open("wb") as f:
-        shutil.copyfileobj(file.file, f)
-    return str(dest)
+CHUNK = 1 << 16
+
+# Leading bytes -> MIME type for files whose extension doesn't settle it. Text and
+# .docx go by extension: a .txt starting with "BM" is still text.
+_MAGIC = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"BM", "image/bmp"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+)
+_EXT_MIME = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+}
+
+
+class StoredFile(NamedTuple):
+    path: str       # absolute blob path (what Candidate.resume_path points at)
+    sha256: str
+    size: int
+    mime: str
+    filename: str   # original name, used for Content-Disposition
+
+
+def sniff_mime(head: bytes, filename: str) -> str:
+    ext = Path(filename).suffix.lower()
+    if ext in _EXT_MIME:
+        return _EXT_MIME[ext]
+    for magic, mime in _MAGIC:
+        if head.startswith(magic):
+            return mime
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def blob_path(sha256: str, ext: str) -> Path:
+    return Path(settings.RESUME_DIR) / sha256[:2] / sha256[2:4] / f"{sha256}{ext.lower()}"
+
+
+def store_stream(src: BinaryIO, filename: str) -> StoredFile:
+    """Copy a stream into the store, hashing on the way; an existing blob is reused."""
+    tmp_dir = Path(settings.RESUME_DIR) / ".tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    h = hashlib.sha256()
+    size, head = 0, b""
+    fd, tmp = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as dst:
+            while True:
+                chunk = src.read(CHUNK)
+                if not chunk:
+                    break
+                if len(head) < 16:
+                    head += chunk[:16]
+                h.update(chunk)
+                dst.write(chunk)
+                size += len(chunk)
+        digest = h.hexdigest()
+        dest = blob_path(digest, Path(filename).suffix)
+        if dest.exists():
+            os.unlink(tmp)
+        else:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, dest)  # atomic: readers never see a partial blob
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return StoredFile(str(dest), digest, size, sniff_mime(head, filename), Path(filename).name)
+
+
+def save_upload(file: UploadFile) -> StoredFile:
+    return store_stream(file.file, file.filename or "upload")
+
+
+def file_fields(stored: StoredFile) -> dict:
+    """Candidate columns describing the stored resume file."""
+    return {
+        "resume_path": stored.path,
+        "file_sha256": stored.sha256,
+        "file_size": stored.size,
+        "mime_type": stored.mime,
+        "file_name": stored.filename,
+    }
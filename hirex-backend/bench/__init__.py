@@ -0,0 +1,7 @@
+"""
+Reproducible benchmarks for HireX hot paths.
+
+    python -m bench.corpus --scale 10k --out ./bench_corpus   # just the synthetic resumes
+    python -m bench.run --scale 1k --out bench_1k.json        # all benchmarks -> JSON
+    python -m bench.compare base.json head.json               # diff two runs
+"""
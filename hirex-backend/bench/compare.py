@@ -0,0 +1,43 @@
+"""
+Compare two bench.run result files (e.g. base commit vs. head):
+
+    python -m bench.compare base.json head.json [--threshold 0.1]
+
+Prints p50 per benchmark and the relative change; exits 1 if any benchmark
+regressed by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Diff two benchmark result files")
+    ap.add_argument("base")
+    ap.add_argument("head")
+    ap.add_argument("--threshold", type=float, default=0.10, help="allowed p50 slowdown (0.10 = 10%%)")
+    args = ap.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+    print(f"base {base['meta'].get('commit')}  ->  head {head['meta'].get('commit')}")
+
+    regressed = []
+    for name, h in head["results"].items():
+        b = base["results"].get(name)
+        if not b or not b.get("p50_ms"):
+            print(f"{name:<48} {h.get('p50_ms', 0):>10.3f} ms   (new)")
+            continue
+        delta = (h["p50_ms"] - b["p50_ms"]) / b["p50_ms"]
+        flag = ""
+        if delta > args.threshold:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(f"{name:<48} {b['p50_ms']:>10.3f} -> {h['p50_ms']:>10.3f} ms  {delta:+7.1%}{flag}")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Synthetic resume corpus for benchmarks.
+
+Resumes follow the section layout the parser expects (Education / Experience /
+Projects / Skills / Achievements / Certifications) with realistic names, institutes,
+CGPAs, date ranges and skills drawn from the app's own lexicons, so every extractor
+does real work. Output is deterministic for a given seed.
+
+    python -m bench.corpus --scale 10k --out ./bench_corpus [--formats txt,docx,pdf]
+"""
+import argparse
+import random
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+FORMATS = ("txt", "docx", "pdf")
+
+FIRST = ["Aarav", "Vivaan", "Aditya", "Ananya", "Diya", "Ishaan", "Kavya", "Rohan", "Sara", "Meera",
+         "Arjun", "Nisha", "Kabir", "Riya", "Dev", "Priya", "Omar", "Lena", "Tom", "Maria"]
+LAST = ["Sharma", "Patel", "Iyer", "Reddy", "Gupta", "Khan", "Singh", "Nair", "Das", "Mehta",
+        "Smith", "Garcia", "Chen", "Kumar", "Joshi", "Rao", "Bose", "Verma", "Menon", "Ali"]
+INSTITUTES = ["IIT Bombay", "IIT Delhi", "IIT Madras", "NIT Trichy", "NIT Surathkal", "BITS Pilani",
+              "Delhi University", "Anna University", "VIT Vellore", "Pune University", "Jadavpur University"]
+DEGREES = ["B.Tech", "M.Tech", "B.E", "BSc", "MCA", "MS", "PhD"]
+MAJORS = ["Computer Science", "ECE", "Information Technology", "Electrical", "Data Science", "Mechanical"]
+COMPANIES = ["Flipkart", "Razorpay", "Infosys", "TCS", "Zomato", "Swiggy", "Google", "Microsoft",
+             "Amazon", "Freshworks", "Atlassian", "Paytm", "Ola", "Zoho", "a seed-stage startup"]
+TITLES = ["Backend Engineer", "Frontend Developer", "Full Stack Engineer", "ML Engineer",
+          "Data Engineer", "DevOps Engineer", "Site Reliability Engineer", "Android Developer",
+          "Software Engineer", "Research Scientist", "iOS Developer", "Security Engineer"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+PROJECT_KINDS = ["payment gateway", "chat application", "recommendation engine", "inventory system",
+                 "fraud detection model", "search service", "ride sharing app", "log analytics pipeline",
+                 "e-commerce platform", "resume parser", "image classifier", "IoT dashboard"]
+VERBS = ["Designed", "Built", "Scaled", "Migrated", "Optimised", "Led", "Shipped", "Owned", "Automated"]
+EXTRAS = ["Core team member of the coding club", "Volunteer at a community NGO",
+          "Event organizer for the annual tech fest", "Captain of the college football team",
+          "Open source contributor", "President of the robotics society"]
+CERTS = ["AWS Certified Solutions Architect", "Google Professional Data Engineer",
+         "Certified Kubernetes Administrator", "Oracle Java SE Programmer", "Azure Fundamentals"]
+
+
+def _skill_pool() -> List[str]:
+    from app.services.skills import HARD_SKILLS
+    return sorted(set(HARD_SKILLS) - {"c", "mern", "mongo"})
+
+
+def resume_text(rng: random.Random, i: int) -> str:
+    skills = _skill_pool()
+    name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+    handle = name.lower().replace(" ", ".") + str(i)
+    lines = [
+        name,
+        f"{handle}@example.com | +91 9{rng.randrange(10**8, 10**9)} | Bengaluru",
+        f"linkedin.com/in/{handle.replace('.', '-')} | github.com/{handle.replace('.', '')}",
+        "",
+        "Summary",
+        f"{rng.choice(TITLES)} who enjoys {rng.choice(PROJECT_KINDS)}s and clean APIs.",
+        "",
+        "Education",
+    ]
+    grad = rng.randint(2008, 2024)
+    lines += [
+        f"{rng.choice(DEGREES)} in {rng.choice(MAJORS)}, {rng.choice(INSTITUTES)}",
+        f"{grad - 4} - {grad} | CGPA: {rng.uniform(6.0, 9.9):.1f}/10",
+        "",
+        "Experience",
+    ]
+    year = grad
+    for _ in range(rng.randint(0, 4)):
+        start_m, span = rng.randrange(12), rng.randint(6, 40)
+        end_year = year + (start_m + span) // 12
+        end = "Present" if end_year >= 2025 else f"{MONTHS[(start_m + span) % 12]} {end_year}"
+        lines.append(f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}")
+        lines.append(f"{MONTHS[start_m]} {year} - {end}")
+        for _ in range(rng.randint(1, 3)):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(PROJECT_KINDS)} using "
+                         f"{', '.join(rng.sample(skills, 3))}")
+        lines.append("")
+        if end == "Present":
+            break
+        year = end_year
+    lines.append("Projects")
+    for _ in range(rng.randint(1, 5)):
+        kind = rng.choice(PROJECT_KINDS)
+        lines.append(f"{kind.title()}")
+        lines.append(f"- {rng.choice(VERBS)} a {kind} with {' and '.join(rng.sample(skills, 2))}")
+        lines.append("")
+    lines.append("Skills")
+    lines.append(", ".join(rng.sample(skills, rng.randint(4, 12))))
+    lines.append("")
+    lines.append("Achievements")
+    if rng.random() < 0.3:
+        lines.append(f"- {rng.randint(1, 4)} hackathons won")
+    lines += [f"- {e}" for e in rng.sample(EXTRAS, rng.randint(0, 2))]
+    lines.append("")
+    if rng.random() < 0.4:
+        lines.append("Certifications")
+        lines += [f"- {c}" for c in rng.sample(CERTS, rng.randint(1, 2))]
+        lines.append("")
+    return "\n".join(lines)
+
+
+def resumes(n: int, seed: int = 0) -> Iterator[str]:
+    rng = random.Random(seed)
+    for i in range(n):
+        yield resume_text(rng, i)
+
+
+# -----------------------------------------------------------------------------
+# Writers (no extra dependencies: DOCX/PDF are assembled by hand)
+# -----------------------------------------------------------------------------
+_DOCX_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    "</Relationships>"
+)
+
+
+def write_docx(path: Path, text: str) -> None:
+    paras = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>'
+        for line in text.splitlines()
+    )
+    doc = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{paras}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _DOCX_TYPES)
+        zf.writestr("_rels/.rels", _DOCX_RELS)
+        zf.writestr("word/document.xml", doc)
+
+
+def _pdf_escape(s: str) -> str:
+    s = s.encode("latin-1", "replace").decode("latin-1")
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, text: str, lines_per_page: int = 56) -> None:
+    """Text-layer PDF (Helvetica 10pt), so pdfplumber extracts it without OCR."""
+    lines = text.splitlines() or [""]
+    pages = [lines[i: i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    n = len(pages)
+    # objects: 1 catalog, 2 pages, 3 font, then (page, content) per page
+    kids = " ".join(f"{4 + 2 * p} 0 R" for p in range(n))
+    objs: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {n} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for p, page in enumerate(pages):
+        body = "BT /F1 10 Tf 12 TL 50 800 Td " + " ".join(f"({_pdf_escape(l)}) '" for l in page) + " ET"
+        stream = body.encode("latin-1")
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * p} 0 R >>".encode()
+        )
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, obj in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def write_txt(path: Path, text: str) -> None:
+    path.write_text(text, encoding="utf-8")
+
+
+WRITERS = {"txt": write_txt, "docx": write_docx, "pdf": write_pdf}
+
+
+def generate(out_dir: str, n: int, formats: Sequence[str] = FORMATS, seed: int = 0) -> List[Tuple[Path, str]]:
+    """
+    Write n resumes into out_dir, cycling through `formats`.
+    Returns [(path, source text)] so callers can skip re-reading for ground truth.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    written = []
+    for i, text in enumerate(resumes(n, seed)):
+        fmt = formats[i % len(formats)]
+        path = out / f"resume_{i:06d}.{fmt}"
+        WRITERS[fmt](path, text)
+        written.append((path, text))
+    return written
+
+
+def parse_scale(s: str) -> int:
+    return SCALES.get(s.lower()) or int(s)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Write a synthetic resume corpus")
+    ap.add_argument("--scale", default="1k", help="1k, 10k, 100k or an explicit count")
+    ap.add_argument("--out", default="bench_corpus")
+    ap.add_argument("--formats", default=",".join(FORMATS))
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    n = parse_scale(args.scale)
+    generate(args.out, n, tuple(args.formats.split(",")), args.seed)
+    print(f"wrote {n} resumes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
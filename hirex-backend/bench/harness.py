@@ -0,0 +1,88 @@
+"""Timing helpers and the JSON result document shared by all benchmarks."""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+
+def summarize(samples_s: List[float], items: int = 1) -> Dict[str, Any]:
+    """Latency stats in ms for a list of per-call durations; throughput in items/s."""
+    vals = sorted(samples_s)
+    mean = statistics.fmean(vals) if vals else 0.0
+    return {
+        "calls": len(vals),
+        "items_per_call": items,
+        "mean_ms": round(mean * 1000, 4),
+        "p50_ms": round(_percentile(vals, 0.50) * 1000, 4),
+        "p95_ms": round(_percentile(vals, 0.95) * 1000, 4),
+        "p99_ms": round(_percentile(vals, 0.99) * 1000, 4),
+        "min_ms": round(vals[0] * 1000, 4) if vals else 0.0,
+        "max_ms": round(vals[-1] * 1000, 4) if vals else 0.0,
+        "items_per_s": round(items / mean, 2) if mean else None,
+    }
+
+
+def measure(
+    fn: Callable[[], Any],
+    *,
+    items: int = 1,
+    repeat: int = 5,
+    warmup: int = 1,
+    setup: Optional[Callable[[], Any]] = None,
+) -> Dict[str, Any]:
+    """Run fn `repeat` times (after `warmup` untimed runs); setup() runs untimed before each call."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, items)
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+class Report:
+    """Collects named results and writes one JSON document per run."""
+
+    def __init__(self, **meta):
+        self.meta = {
+            "commit": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            **meta,
+        }
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, result: Dict[str, Any], **extra) -> None:
+        self.results[name] = {**result, **extra}
+        print(f"{name:<48} p50 {result.get('p50_ms', 0):>10.3f} ms   "
+              f"{result.get('items_per_s') or 0:>12.1f} items/s", flush=True)
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"meta": self.meta, "results": self.results}, f, indent=2)
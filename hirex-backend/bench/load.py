@@ -0,0 +1,381 @@
+"""
+Mixed-workload load generator: single uploads, ZIP uploads, recruiter queries and
+OTP auth flows at configurable ratios, with outgoing mail captured by a local sink.
+
+    # in-process (httpx ASGI transport on this event loop)
+    python -m bench.load --duration 30 --concurrency 16 --mix query=6,upload=1,zip=0.2,auth=0.5
+
+    # against a local uvicorn started for the run (same sink, throwaway DATA_DIR)
+    python -m bench.load --spawn --port 8765 --duration 30
+
+    # or start the server yourself and point at it
+    python -m bench.load serve --port 8765
+    python -m bench.load --url http://127.0.0.1:8765
+
+By default two phases run back to back -- "baseline" (queries only) and "mixed" --
+so the report shows how query latency degrades under concurrent ingestion.
+Per endpoint: throughput and p50/p95/p99; per phase: event-loop lag.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .corpus import FORMATS, generate
+from .harness import Report, summarize
+from .run import PROMPTS, _isolate
+
+OTP_RE = re.compile(r"\b(\d{6})\b")
+PHASES = ("baseline", "mixed")
+
+
+# -----------------------------------------------------------------------------
+# SMTP sink: replaces utils.mailer._send_email inside the app process
+# -----------------------------------------------------------------------------
+def install_mail_sink(path: str, latency_s: float = 0.0) -> None:
+    """Route every outgoing mail to a JSONL file (after `latency_s`, to mimic a relay)."""
+    from app.config import settings
+    from app.utils import mailer
+
+    lock = threading.Lock()
+
+    def _sink(to: str, subject: str, html: Optional[str] = None, text: Optional[str] = None):
+        if latency_s:
+            time.sleep(latency_s)
+        m = OTP_RE.search(text or html or "")
+        line = json.dumps({"to": to, "subject": subject, "code": m.group(1) if m else None})
+        with lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    mailer._send_email = _sink
+    settings.SMTP_ENABLED = True  # settings are already loaded: the environment is not read again
+
+
+class SinkReader:
+    """Tails the sink file; latest OTP per recipient."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self.codes: Dict[str, str] = {}
+
+    def code_for(self, email: str) -> Optional[str]:
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                f.seek(self.offset)
+                for line in f:
+                    rec = json.loads(line)
+                    if rec.get("code"):
+                        self.codes[rec["to"]] = rec["code"]
+                self.offset = f.tell()
+        return self.codes.get(email)
+
+
+# -----------------------------------------------------------------------------
+# Measurement
+# -----------------------------------------------------------------------------
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.samples.setdefault(endpoint, []).append(seconds)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+class LagMonitor:
+    """Client-side loop lag; in-process this *is* the app's loop."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+        self._t0 = 0.0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._t0 = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - self._t0 - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # A sleep still pending at the end was starved for the remainder of the phase
+        overdue = asyncio.get_running_loop().time() - self._t0 - self.interval
+        if overdue > 0:
+            self.samples.append(overdue)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def _scrape_lag(text: str) -> Tuple[Dict[float, float], float, float]:
+    """Cumulative buckets, sum and count of hirex_event_loop_lag_seconds from /metrics."""
+    buckets: Dict[float, float] = {}
+    total = count = 0.0
+    for line in text.splitlines():
+        if not line.startswith("hirex_event_loop_lag_seconds"):
+            continue
+        name, value = line.rsplit(" ", 1)
+        if "_bucket" in name:
+            le = name.split('le="', 1)[1].split('"', 1)[0]
+            buckets[float("inf") if le == "+Inf" else float(le)] = float(value)
+        elif name.endswith("_sum"):
+            total = float(value)
+        elif name.endswith("_count"):
+            count = float(value)
+    return buckets, total, count
+
+
+def _lag_from_scrapes(before: str, after: str) -> Dict[str, object]:
+    b0, s0, c0 = _scrape_lag(before)
+    b1, s1, c1 = _scrape_lag(after)
+    n = c1 - c0
+    if n <= 0:
+        return {"samples": 0}
+
+    def q(p: float):
+        for le in sorted(b1):
+            if b1[le] - b0.get(le, 0.0) >= p * n:
+                return le * 1000 if le != float("inf") else "+Inf"
+        return None
+
+    return {"samples": int(n), "mean_ms": round((s1 - s0) / n * 1000, 3),
+            "p50_le_ms": q(0.50), "p99_le_ms": q(0.99), "source": "server /metrics histogram"}
+
+
+# -----------------------------------------------------------------------------
+# Workload
+# -----------------------------------------------------------------------------
+class Workload:
+    def __init__(self, client, sink: SinkReader, files: List[Path], zip_size: int, rec: Recorder):
+        self.client = client
+        self.sink = sink
+        self.files = files
+        self.zip_size = zip_size
+        self.rec = rec
+        self.seq = 0
+        self.accounts: List[Tuple[str, str]] = []
+
+    def _next(self) -> int:
+        self.seq += 1
+        return self.seq
+
+    async def _call(self, endpoint: str, method: str, url: str, **kw):
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.request(method, url, **kw)
+            ok = r.status_code < 400
+        except Exception:
+            r, ok = None, False
+        self.rec.add(endpoint, time.perf_counter() - t0, ok)
+        return r
+
+    async def query(self, rng: random.Random):
+        body = {"prompt": rng.choice(PROMPTS), "top_k": rng.randint(5, 50)}
+        await self._call("POST /recruiters/query", "POST", "/recruiters/query", json=body)
+
+    async def upload(self, rng: random.Random):
+        p = rng.choice(self.files)
+        name = f"load_{self._next()}_{p.name}"
+        await self._call("POST /resumes/upload", "POST", "/resumes/upload",
+                         files={"file": (name, p.read_bytes(), "application/octet-stream")})
+
+    async def zip(self, rng: random.Random):
+        buf = io.BytesIO()
+        batch = self._next()
+        with zipfile.ZipFile(buf, "w") as zf:
+            for i, p in enumerate(rng.sample(self.files, min(self.zip_size, len(self.files)))):
+                zf.writestr(f"z{batch}_{i}_{p.name}", p.read_bytes())
+        await self._call("POST /recruiters/resumes/upload-zip", "POST", "/recruiters/resumes/upload-zip",
+                         files={"zipfile_upload": (f"load_{batch}.zip", buf.getvalue(), "application/zip")})
+
+    async def auth(self, rng: random.Random):
+        if self.accounts and rng.random() < 0.5:
+            email, password = rng.choice(self.accounts)
+            r = await self._call("POST /auth/login", "POST", "/auth/login",
+                                 json={"email": email, "password": password})
+        else:
+            email, password = f"load{self._next()}_{rng.randrange(10**9)}@example.com", "hunter22"
+            r = await self._call("POST /auth/register", "POST", "/auth/register",
+                                 json={"email": email, "password": password})
+            if r is not None and r.status_code < 400:
+                self.accounts.append((email, password))
+        if r is None or r.status_code >= 400:
+            return
+        code = None
+        for _ in range(50):  # the handlers await the send, so the code is normally there already
+            code = self.sink.code_for(email)
+            if code:
+                break
+            await asyncio.sleep(0.01)
+        await self._call("POST /auth/verify", "POST", "/auth/verify",
+                         json={"transaction_id": r.json()["transaction_id"], "code": code or "000000"})
+
+
+async def run_phase(work: Workload, mix: Dict[str, float], duration: float, concurrency: int, seed: int):
+    ops = [op for op, w in mix.items() if w > 0]
+    weights = [mix[op] for op in ops]
+    deadline = time.perf_counter() + duration
+
+    async def worker(i: int):
+        rng = random.Random(seed * 1000 + i)
+        while time.perf_counter() < deadline:
+            await getattr(work, rng.choices(ops, weights)[0])(rng)
+            await asyncio.sleep(0)  # in-process calls may never suspend; let other tasks run
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+
+def parse_mix(s: str) -> Dict[str, float]:
+    mix = {"query": 0.0, "upload": 0.0, "zip": 0.0, "auth": 0.0}
+    for part in filter(None, s.split(",")):
+        op, _, w = part.partition("=")
+        if op not in mix:
+            raise SystemExit(f"unknown op in --mix: {op} (expected {', '.join(mix)})")
+        mix[op] = float(w or 1)
+    return mix
+
+
+async def _wait_healthy(client, timeout: float = 120.0) -> None:
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit("server did not become healthy")
+
+
+async def main_async(args) -> None:
+    import httpx
+
+    work_dir = Path(args.workdir or tempfile.mkdtemp(prefix="hirex-load-"))
+    sink_path = str(work_dir / "mail_sink.jsonl")
+    files = [p for p, _ in generate(str(work_dir / "corpus"), args.pool, tuple(args.formats.split(",")), args.seed)]
+
+    server = None
+    remote = bool(args.url or args.spawn)
+    if args.spawn:
+        env = dict(os.environ)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "bench.load", "serve", "--port", str(args.port),
+             "--workdir", str(work_dir), "--smtp-latency-ms", str(args.smtp_latency_ms)],
+            env=env,
+        )
+        args.url = f"http://127.0.0.1:{args.port}"
+    if remote:
+        client = httpx.AsyncClient(base_url=args.url, timeout=300)
+        await _wait_healthy(client)
+    else:
+        _isolate(work_dir)
+        install_mail_sink(sink_path, args.smtp_latency_ms / 1000)
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://inproc", timeout=300)
+
+    report = Report(mode="remote" if remote else "in-process", url=args.url, concurrency=args.concurrency,
+                    duration_s=args.duration, mix=args.mix, seed_docs=args.seed_docs)
+    try:
+        rec = Recorder()
+        work = Workload(client, SinkReader(sink_path), files, args.zip_size, rec)
+        # Seed a corpus so queries have something to rank
+        seeded = 0
+        while seeded < args.seed_docs:
+            work.zip_size = min(500, args.seed_docs - seeded)
+            await work.zip(random.Random(seeded))
+            seeded += work.zip_size
+        work.zip_size = args.zip_size
+
+        mixed = parse_mix(args.mix)
+        for phase in args.phases.split(","):
+            mix = {"query": 1.0} if phase == "baseline" else mixed
+            work.rec = rec = Recorder()
+            lag = LagMonitor()
+            before = (await client.get("/metrics")).text if remote else ""
+            if not remote:
+                lag.start()
+            t0 = time.perf_counter()
+            await run_phase(work, mix, args.duration, args.concurrency, args.seed)
+            wall = time.perf_counter() - t0
+            if remote:
+                loop_lag = _lag_from_scrapes(before, (await client.get("/metrics")).text)
+            else:
+                await lag.stop()
+                loop_lag = {**summarize(lag.samples), "source": "in-process sleep overshoot"}
+            overall = summarize([s for v in rec.samples.values() for s in v])
+            overall["items_per_s"] = round(overall["calls"] / wall, 2)
+            report.add(f"{phase}:ALL", overall, wall_s=round(wall, 2), event_loop_lag=loop_lag)
+            for endpoint, samples in sorted(rec.samples.items()):
+                res = summarize(samples)
+                res["items_per_s"] = round(len(samples) / wall, 2)  # endpoint throughput, not 1/latency
+                report.add(f"{phase}:{endpoint}", res, errors=rec.errors.get(endpoint, 0))
+    finally:
+        await client.aclose()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+    report.write(args.out)
+    print(f"results -> {args.out}")
+
+
+def serve(argv: List[str]) -> None:
+    """uvicorn with the mail sink installed and a throwaway DATA_DIR."""
+    ap = argparse.ArgumentParser(prog="bench.load serve")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workdir", default=None)
+    ap.add_argument("--smtp-latency-ms", type=float, default=50.0)
+    args = ap.parse_args(argv)
+    work_dir = Path(args.workdir or tempfile.mkdtemp(prefix="hirex-load-"))
+    _isolate(work_dir)
+    install_mail_sink(str(work_dir / "mail_sink.jsonl"), args.smtp_latency_ms / 1000)
+
+    import uvicorn
+    from app.main import app
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["serve"]:
+        serve(sys.argv[2:])
+        return
+    ap = argparse.ArgumentParser(description="HireX mixed-workload load test")
+    ap.add_argument("--url", default=None, help="target a running server instead of in-process")
+    ap.add_argument("--spawn", action="store_true", help="start a local uvicorn for the run")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--duration", type=float, default=30.0, help="seconds per phase")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--mix", default="query=6,upload=1,zip=0.2,auth=0.5")
+    ap.add_argument("--phases", default=",".join(PHASES))
+    ap.add_argument("--seed-docs", type=int, default=500, help="resumes ingested before the phases")
+    ap.add_argument("--zip-size", type=int, default=20)
+    ap.add_argument("--pool", type=int, default=300, help="distinct synthetic resumes to upload from")
+    ap.add_argument("--formats", default=",".join(FORMATS))
+    ap.add_argument("--smtp-latency-ms", type=float, default=50.0)
+    ap.add_argument("--workdir", default=None)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="load_results.json")
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
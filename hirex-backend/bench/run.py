@@ -0,0 +1,240 @@
+"""
+Hot-path benchmarks over a synthetic corpus. Everything runs against a throwaway
+DATA_DIR, so a real deployment's DB and index are never touched.
+
+    python -m bench.run --scale 1k --out bench_1k.json
+    python -m bench.run --scale 10k --only faiss,filters --out faiss_10k.json
+    python -m bench.compare base.json head.json
+"""
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from .corpus import FORMATS, generate, parse_scale
+from .harness import Report, measure
+
+PROMPTS = [
+    "backend engineer with 3 years experience in python and kubernetes",
+    "mern developers from iit",
+    "ml engineer pytorch cgpa 8.5",
+    "frontend developer react typescript",
+    "candidates who built payment gateway project",
+    "devops engineer aws terraform docker",
+    "data engineer kafka spark airflow from nit",
+    "won 2 hackathons",
+]
+
+
+def _isolate(work: Path) -> None:
+    """Point the app at the bench directory before anything imports app.config."""
+    data = work / "data"
+    os.environ.update(
+        DATA_DIR=str(data),
+        RESUME_DIR=str(data / "resumes"),
+        DB_URL=f"sqlite:///{data / 'hirex.db'}",
+        FAISS_INDEX_PATH=str(data / "faiss_index.bin"),
+        FAISS_META_PATH=str(data / "faiss_meta.jsonl"),
+        FAISS_SHARD_DIR=str(data / "faiss_shards"),
+        PROFILE_DIR=str(data / "profiles"),
+    )
+
+
+def _sample(ctx: dict, k: int) -> list:
+    written = ctx["written"]
+    return written if len(written) <= k else random.Random(0).sample(written, k)
+
+
+def _records(ctx: dict) -> List[dict]:
+    """Candidate records for the whole corpus (built once, from the source texts)."""
+    if "records" not in ctx:
+        from app.services.extraction import build_candidate_record
+        ctx["records"] = [build_candidate_record(text, str(path)) for path, text in ctx["written"]]
+    return ctx["records"]
+
+
+# -----------------------------------------------------------------------------
+# Benchmarks
+# -----------------------------------------------------------------------------
+def bench_parse(ctx: dict, report: Report) -> None:
+    from app.services.parser import read_file_text
+    for fmt in FORMATS:
+        files = [str(p) for p, _ in _sample(ctx, ctx["sample"] * len(FORMATS)) if p.suffix == "." + fmt]
+        if files:
+            report.add(f"read_file_text[{fmt}]",
+                       measure(lambda: [read_file_text(f) for f in files], items=len(files), repeat=ctx["repeat"]))
+
+
+def bench_record(ctx: dict, report: Report) -> None:
+    from app.services.extraction import build_candidate_record
+    docs = [(str(p), t) for p, t in _sample(ctx, ctx["sample"])]
+    report.add("build_candidate_record",
+               measure(lambda: [build_candidate_record(t, p) for p, t in docs], items=len(docs), repeat=ctx["repeat"]))
+
+
+def bench_extractors(ctx: dict, report: Report) -> None:
+    from app.services.skills import extract_skills, extract_soft_skills
+    from app.services.educations import extract_institutions, extract_degrees, extract_majors
+    from app.services.roles import extract_roles_from_resume
+    texts = [t for _, t in _sample(ctx, ctx["sample"])]
+    skills = [extract_skills(t) for t in texts]
+    extractors: Dict[str, Callable] = {
+        "extract_skills": lambda: [extract_skills(t) for t in texts],
+        "extract_soft_skills": lambda: [extract_soft_skills(t) for t in texts],
+        "extract_institutions": lambda: [extract_institutions(t) for t in texts],
+        "extract_degrees": lambda: [extract_degrees(t) for t in texts],
+        "extract_majors": lambda: [extract_majors(t) for t in texts],
+        "extract_roles_from_resume": lambda: [extract_roles_from_resume(t, s) for t, s in zip(texts, skills)],
+    }
+    for name, fn in extractors.items():
+        report.add(name, measure(fn, items=len(texts), repeat=ctx["repeat"]))
+
+
+def bench_embed(ctx: dict, report: Report) -> None:
+    from app.main import _embedder
+    texts = [t for _, t in _sample(ctx, 256)]
+    for bs in (1, 8, 32):
+        batch = (texts * bs)[:bs]
+        report.add(f"Embedder.encode[batch={bs}]", measure(lambda: _embedder.encode(batch), items=bs, repeat=ctx["repeat"]))
+
+
+def bench_faiss(ctx: dict, report: Report) -> None:
+    from app.services.indexer import FaissIndex, ShardedFaissIndex
+    n, dim = ctx["n"], ctx["dim"]
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((n, dim)).astype("float32")
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    metas = [{"id": i + 1, "name": f"c{i}"} for i in range(n)]
+    base = Path(ctx["work"]) / "faiss_bench"
+    base.mkdir(exist_ok=True)
+    paths = (str(base / "flat.bin"), str(base / "flat.jsonl"))
+
+    holder = {}
+    report.add("FaissIndex.add", measure(
+        lambda: holder["idx"].add(vecs, metas), items=n, repeat=ctx["repeat"],
+        setup=lambda: holder.update(idx=FaissIndex(dim, *paths)),
+    ))
+    idx = holder["idx"]
+    for nq in (1, 16):
+        q = vecs[:nq]
+        report.add(f"FaissIndex.search[nq={nq},k=200]", measure(lambda: idx.search(q, 200), items=nq, repeat=ctx["repeat"] * 4))
+    report.add("FaissIndex.save", measure(idx.save, items=n, repeat=ctx["repeat"]))
+    report.add("FaissIndex.load", measure(lambda: FaissIndex.load(dim, *paths), items=n, repeat=ctx["repeat"]))
+
+    sharded = ShardedFaissIndex(dim, str(base / "shards"), shard_size=max(1, n // 4))
+    sharded.add(vecs, metas)
+    report.add("ShardedFaissIndex.search[shards=4,nq=1,k=200]",
+               measure(lambda: sharded.search(vecs[:1], 200), repeat=ctx["repeat"] * 4))
+
+
+def bench_filters(ctx: dict, report: Report) -> None:
+    from app.db import Candidate
+    from app.services.prompt_parser import plan_query
+    from app.services.search import apply_filters
+    records = _records(ctx)
+    rows = [Candidate(id=i, **r) for i, r in enumerate(records, start=1)]
+    texts = {i: r["parsed_text"] for i, r in enumerate(records, start=1)}
+    for prompt in PROMPTS:
+        f = plan_query(prompt).filters()
+        kwargs = dict(
+            min_experience=f["min_experience"], must_have=f["must_have_skills"],
+            education_any_of=f["education_any_of"], location=f["location"],
+            min_projects=f["min_projects"], min_cgpa=f["min_cgpa"],
+            min_hackathon_wins=f["min_hackathon_wins"], contains_phrase=f["contains_phrase"],
+            require_extracurricular=f["require_extracurricular"], require_por=f["require_por"],
+            roles_any_of=f["roles_any_of"], texts=texts,
+        )
+        report.add(f"apply_filters[{prompt[:32]}]",
+                   measure(lambda: apply_filters(rows, **kwargs), items=len(rows), repeat=ctx["repeat"]),
+                   matched=len(apply_filters(rows, **kwargs)))
+
+
+def bench_e2e(ctx: dict, report: Report) -> None:
+    from fastapi.testclient import TestClient
+    from app.main import app, _search_cache
+
+    client = TestClient(app)
+    written = ctx["written"]
+    chunk = 1000
+    t0 = time.perf_counter()
+    for start in range(0, len(written), chunk):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            for p, _ in written[start: start + chunk]:
+                zf.write(p, p.name)
+        r = client.post("/recruiters/resumes/upload-zip",
+                        files={"zipfile_upload": (f"bench_{start}.zip", buf.getvalue(), "application/zip")})
+        r.raise_for_status()
+    elapsed = time.perf_counter() - t0
+    report.add("ingest[upload-zip]", {"calls": 1, "items_per_call": len(written),
+                                      "p50_ms": round(elapsed * 1000, 2),
+                                      "items_per_s": round(len(written) / elapsed, 2)})
+
+    for prompt in PROMPTS:
+        body = {"prompt": prompt, "top_k": 10}
+        report.add(f"/recruiters/query[cold:{prompt[:28]}]", measure(
+            lambda: client.post("/recruiters/query", json=body).raise_for_status(),
+            repeat=ctx["repeat"], setup=_search_cache.clear,
+        ))
+    body = {"prompt": PROMPTS[0], "top_k": 10}
+    report.add("/recruiters/query[cached]", measure(
+        lambda: client.post("/recruiters/query", json=body).raise_for_status(), repeat=ctx["repeat"] * 4,
+    ))
+
+
+BENCHES: Dict[str, Callable[[dict, Report], None]] = {
+    "parse": bench_parse,
+    "record": bench_record,
+    "extractors": bench_extractors,
+    "embed": bench_embed,
+    "faiss": bench_faiss,
+    "filters": bench_filters,
+    "e2e": bench_e2e,
+}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="HireX hot-path benchmarks")
+    ap.add_argument("--scale", default="1k", help="1k, 10k, 100k or an explicit count")
+    ap.add_argument("--only", default="", help="comma-separated subset of: " + ",".join(BENCHES))
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--workdir", default=None, help="defaults to a fresh temp dir")
+    ap.add_argument("--formats", default=",".join(FORMATS))
+    ap.add_argument("--sample", type=int, default=200, help="docs per call for per-document benchmarks")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--dim", type=int, default=384, help="vector dim for the FAISS benchmarks")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    n = parse_scale(args.scale)
+    work = Path(args.workdir or tempfile.mkdtemp(prefix="hirex-bench-"))
+    _isolate(work)
+    selected = [b for b in (args.only.split(",") if args.only else BENCHES) if b]
+    unknown = set(selected) - set(BENCHES)
+    if unknown:
+        ap.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    report = Report(scale=n, seed=args.seed, formats=args.formats, benchmarks=selected)
+    ctx = {
+        "n": n,
+        "work": work,
+        "written": generate(str(work / "corpus"), n, tuple(args.formats.split(",")), args.seed),
+        "sample": args.sample,
+        "repeat": args.repeat,
+        "dim": args.dim,
+    }
+    for name in selected:
+        BENCHES[name](ctx, report)
+    report.write(args.out)
+    print(f"results -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Test setup. Settings and the DB engines are built when app.config / app.db are
+first imported, so the environment points them at a throwaway directory before
+any test module imports the app. Unit tests build the index, writer and encoder
+themselves; the `api` fixture imports app.main with a bag-of-words stand-in for
+sentence-transformers, so no model is downloaded.
+
+    cd hirex-backend && python -m pytest -q
+"""
+import os
+import re
+import shutil
+import sys
+import tempfile
+import types
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+_DATA = tempfile.mkdtemp(prefix="hirex-tests-")
+os.environ.update(
+    DATA_DIR=_DATA,
+    RESUME_DIR=f"{_DATA}/resumes",
+    DB_URL=f"sqlite:///{_DATA}/hirex.db",
+    FAISS_INDEX_PATH=f"{_DATA}/faiss_index.bin",
+    FAISS_META_PATH=f"{_DATA}/faiss_meta.jsonl",
+    FAISS_SHARD_DIR=f"{_DATA}/faiss_shards",
+    FAISS_SEARCH_THREADS="2",
+)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlmodel import Session  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.db import Candidate, ResumeText, engine, init_db  # noqa: E402
+from app.services.index_writer import IndexWriter  # noqa: E402
+from app.services.indexer import ShardedFaissIndex  # noqa: E402
+from app.services.textstore import put_texts  # noqa: E402
+
+DIM = 8
+
+
+def fake_encode(texts):
+    """Deterministic unit vectors per text (stands in for the embedding model)."""
+    out = np.empty((len(texts), DIM), dtype="float32")
+    for i, t in enumerate(texts):
+        v = np.random.default_rng(zlib.crc32(t.encode())).standard_normal(DIM)
+        out[i] = v / np.linalg.norm(v)
+    return out
+
+
+class FakeSentenceTransformer:
+    """Hashed bag-of-words unit vectors: prompts sharing words with a resume land near it."""
+
+    def __init__(self, name, **kwargs):
+        pass
+
+    def encode(self, texts, **kwargs):
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        out = np.zeros((len(texts), 64), dtype="float32")
+        for i, t in enumerate(texts):
+            for w in re.findall(r"\w+", t.lower()):
+                out[i, zlib.crc32(w.encode()) % 64] += 1
+            out[i] /= np.linalg.norm(out[i]) or 1.0
+        return out
+
+
+def add_candidates(n: int, start: int = 1):
+    """Insert n candidates (ids start..start+n-1) with stored text; returns {id: text}."""
+    texts = {i: f"candidate {i} python engineer" for i in range(start, start + n)}
+    with Session(engine) as s:
+        s.add_all(Candidate(id=i, name=f"cand{i}", resume_path=f"{_DATA}/resumes/{i}.txt") for i in texts)
+        s.flush()
+        put_texts(s, texts.items())
+        s.commit()
+    return texts
+
+
+RESUMES = {
+    "alice.txt": "Alice Smith\nalice@x.com\nEducation\nIIT Bombay CGPA 9.2\nExperience\n"
+                 "Backend engineer 5 years grpc go kubernetes\n",
+    "bob.txt": "Bob Jones\nbob@x.com\nEducation\nNIT Trichy CGPA 8.1\nSkills\n"
+               "react node mongodb express 3 years\n",
+    "carol.txt": "Carol King\ncarol@x.com\nIIT Delhi CGPA 9.5\npython pytorch ml engineer 2 years\n",
+}
+
+
+def upload(client, resumes=RESUMES):
+    """Upload text resumes through the API; returns {file name: candidate id}."""
+    ids = {}
+    for name, text in resumes.items():
+        r = client.post("/resumes/upload", files={"file": (name, text.encode(), "text/plain")})
+        assert r.status_code == 200, r.text
+        ids[name] = r.json()["id"]
+    return ids
+
+
+@pytest.fixture
+def db():
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(ResumeText.__table__.delete())
+        conn.execute(Candidate.__table__.delete())
+    return engine
+
+
+@pytest.fixture
+def index():
+    shutil.rmtree(settings.FAISS_SHARD_DIR, ignore_errors=True)
+    return ShardedFaissIndex(DIM)
+
+
+@pytest.fixture
+def writer(index):
+    return IndexWriter(index, max_wait_ms=20)
+
+
+@pytest.fixture
+def sentence_transformers(monkeypatch):
+    """A stand-in sentence_transformers module, for code that imports the real one."""
+    fake = types.ModuleType("sentence_transformers")
+    fake.SentenceTransformer = FakeSentenceTransformer
+    monkeypatch.setitem(sys.modules, "sentence_transformers", fake)
+    return fake
+
+
+@pytest.fixture
+def api(db, sentence_transformers, monkeypatch):
+    """app.main on the fake embedding model, with an empty index, lexical index and cache."""
+    shutil.rmtree(settings.FAISS_SHARD_DIR, ignore_errors=True)  # no 8-dim shards from unit tests
+    Path(settings.FAISS_SHARD_DIR).mkdir(parents=True)
+    from fastapi.testclient import TestClient
+
+    from app import main
+    from app.services.lexical import BM25Index
+    from app.services.stats import CorpusStats
+
+    main._writer.remove(main._index.ids())
+    monkeypatch.setattr(main, "_lexical", BM25Index())
+    monkeypatch.setattr(main, "_stats", CorpusStats())
+    main._search_cache.clear()
+    return TestClient(main.app)
@@ -0,0 +1,48 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models_auth import AuthTxn, User
+from app.routes import auth
+
+
+@pytest.fixture
+def client(db):
+    with engine.begin() as conn:
+        conn.execute(AuthTxn.__table__.delete())
+        conn.execute(User.__table__.delete())
+    app = FastAPI()
+    app.include_router(auth.router)
+    return TestClient(app)
+
+
+def _otp(transaction_id):
+    with Session(engine) as s:
+        return s.exec(select(AuthTxn.otp_code).where(AuthTxn.transaction_id == transaction_id)).one()
+
+
+def test_register_login_verify(client, monkeypatch):
+    writes = []
+    real = auth.run_db_write
+
+    async def spy(fn, *args):
+        writes.append((fn.__name__, args))
+        return await real(fn, *args)
+
+    monkeypatch.setattr(auth, "run_db_write", spy)
+    r = client.post("/auth/register", json={"email": "a@x.com", "password": "secret1"})
+    assert r.status_code == 200
+    assert client.post("/auth/register", json={"email": "a@x.com", "password": "secret1"}).status_code == 400
+
+    assert client.post("/auth/login", json={"email": "a@x.com", "password": "wrong-pw"}).status_code == 400
+    assert client.post("/auth/login", json={"email": "b@x.com", "password": "secret1"}).status_code == 400
+    txn = client.post("/auth/login", json={"email": "a@x.com", "password": "secret1"}).json()["transaction_id"]
+    assert client.post("/auth/verify", json={"transaction_id": txn, "code": _otp(txn)}).json() == {"ok": True}
+
+    # the writer slot only ever sees the finished hash, never the password (bcrypt ran before it)
+    assert all("secret1" not in map(str, args) for _, args in writes)
+    assert [name for name, _ in writes[:1]] == ["_register"] and writes[0][1][1].startswith("$2")
+    with Session(engine) as s:
+        assert len(s.exec(select(AuthTxn).where(AuthTxn.purpose == "login")).all()) == 1
@@ -0,0 +1,19 @@
+from conftest import upload
+
+
+def test_batch_matches_single_queries_and_keeps_the_cache_clean(api):
+    from app import main
+
+    upload(api)
+    prompts = ["grpc backend", "python engineer", "react developer"]
+    single = [api.post("/recruiters/query", json={"prompt": p, "top_k": 2}).json() for p in prompts]
+
+    r = api.post("/recruiters/query/batch",
+                 json={"queries": [{"prompt": p, "top_k": 2, "explain": True} for p in prompts]})
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [[i["id"] for i in res["items"]] for res in results] == [[i["id"] for i in s["items"]] for s in single]
+    assert all(res["explain"]["batch"] for res in results)
+
+    # the explained responses went out as copies: what the cache holds has no per-request plan
+    assert all(resp.explain is None for resp in main._search_cache._data.values())
@@ -0,0 +1,29 @@
+import pytest
+
+from app.services import parser
+from app.services.extraction import build_candidate_record
+from bench.corpus import generate
+
+
+def test_corpus_is_reproducible(tmp_path):
+    a = generate(str(tmp_path / "a"), 6, ("txt",), seed=3)
+    b = generate(str(tmp_path / "b"), 6, ("txt",), seed=3)
+    assert [t for _, t in a] == [t for _, t in b]
+    assert len({t for _, t in a}) == 6
+    assert [t for _, t in generate(str(tmp_path / "c"), 6, ("txt",), seed=4)] != [t for _, t in a]
+
+
+def _lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+@pytest.mark.parametrize("fmt", ["txt", "docx", "pdf"])
+def test_generated_files_parse_back_to_the_source(tmp_path, fmt):
+    for path, source in generate(str(tmp_path), 3, (fmt,), seed=1):
+        text = parser.read_file_text(str(path))
+        assert _lines(text) == _lines(source)
+        # PDF text extraction drops blank lines; compare fields on the text as laid out
+        truth = build_candidate_record("\n".join(_lines(source)) if fmt == "pdf" else source, str(path))
+        parsed = build_candidate_record(text, str(path))
+        for field in ("name", "email", "skills", "institutions", "cgpa", "years_experience"):
+            assert parsed[field] == truth[field], (fmt, field)
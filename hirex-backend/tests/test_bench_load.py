@@ -0,0 +1,27 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.models_auth import AuthTxn, User
+from app.routes import auth
+from app.utils import mailer
+from bench.load import SinkReader, install_mail_sink
+
+
+def test_mail_sink_captures_otps_the_app_sends(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SMTP_ENABLED", False)
+    monkeypatch.setattr(mailer, "_send_email", mailer._send_email)  # restored afterwards
+    with db.begin() as conn:
+        conn.execute(AuthTxn.__table__.delete())
+        conn.execute(User.__table__.delete())
+    sink = str(tmp_path / "mail.jsonl")
+    install_mail_sink(sink)
+    assert settings.SMTP_ENABLED
+
+    app = FastAPI()
+    app.include_router(auth.router)
+    client = TestClient(app)
+    txn = client.post("/auth/register", json={"email": "load@x.com", "password": "secret1"}).json()["transaction_id"]
+    code = SinkReader(sink).code_for("load@x.com")
+    assert code and len(code) == 6
+    assert client.post("/auth/verify", json={"transaction_id": txn, "code": code}).json() == {"ok": True}
@@ -0,0 +1,13 @@
+from app.config import DATA_PATHS, Settings
+
+
+def test_data_paths_follow_the_configured_data_dir(tmp_path, monkeypatch):
+    for field in DATA_PATHS:
+        monkeypatch.delenv(field, raising=False)
+    monkeypatch.setenv("FAISS_META_PATH", "/elsewhere/meta.jsonl")
+    s = Settings(_env_file=None, DATA_DIR=str(tmp_path))
+    assert s.RESUME_DIR == f"{tmp_path}/resumes"
+    assert s.FAISS_SHARD_DIR == f"{tmp_path}/faiss_shards"
+    assert s.FAISS_INDEX_PATH == f"{tmp_path}/faiss_index.bin"
+    assert s.PROFILE_DIR == f"{tmp_path}/profiles"
+    assert s.FAISS_META_PATH == "/elsewhere/meta.jsonl"  # set explicitly: left alone
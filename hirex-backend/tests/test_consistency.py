@@ -0,0 +1,33 @@
+from app.services import consistency
+
+from conftest import add_candidates, fake_encode
+
+
+def test_check_then_repair_fixes_a_drifted_index(db, index, writer, monkeypatch):
+    monkeypatch.setattr(consistency, "IN_FLIGHT_S", 0)  # rows just inserted count as missing
+    texts = add_candidates(6)
+    ids = sorted(texts)
+    writer.add(fake_encode([texts[i] for i in ids[:4]]), [{"id": i, "name": f"cand{i}"} for i in ids[:4]])
+    # drift: an orphan vector, a superseded duplicate; ids 5 and 6 never got a vector
+    writer.add(fake_encode(["gone"]), [{"id": 999, "name": "ghost"}])
+    writer.add(fake_encode([texts[1]]), [{"id": 1, "name": "cand1"}])
+
+    report = consistency.check(index)
+    assert report["orphans"] == [999]
+    assert report["missing"] == [5, 6]
+    assert report["duplicates"] == {index.shard_of(1): [1]}
+    assert not consistency.is_consistent(report)
+
+    job = consistency.repair(writer, fake_encode)
+    assert job.state == "done", job.error
+    assert job.embedded == 2 and job.shards_rebuilt == 1
+    assert job.after["consistent"]
+    assert sorted(index.ids()) == ids
+    assert index.ntotal == len(ids)  # the duplicate row is gone, not just shadowed
+
+
+def test_fresh_rows_are_in_flight_not_missing(db, index):
+    add_candidates(2)
+    report = consistency.check(index)
+    assert report["missing"] == [] and report["in_flight"] == [1, 2]
+    assert consistency.is_consistent(report)
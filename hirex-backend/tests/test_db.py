@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.db import _make_engines
+
+
+@pytest.fixture
+def engines(tmp_path):
+    writer, reader = _make_engines(f"sqlite:///{tmp_path / 'wal.db'}")
+    with writer.begin() as c:
+        c.exec_driver_sql("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+        c.exec_driver_sql("INSERT INTO t (v) VALUES ('a')")
+    return writer, reader
+
+
+def test_wal_profile_and_read_only_pool(engines):
+    writer, reader = engines
+    with writer.connect() as c:
+        assert c.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+    with reader.connect() as c:
+        assert c.exec_driver_sql("PRAGMA query_only").scalar() == 1
+        with pytest.raises(OperationalError):
+            c.exec_driver_sql("INSERT INTO t (v) VALUES ('b')")
+    assert writer.pool.size() == 1
+
+
+def test_readers_see_the_last_commit_while_a_write_is_open(engines):
+    writer, reader = engines
+    in_txn, release = threading.Event(), threading.Event()
+
+    def slow_write():
+        with writer.begin() as c:
+            c.exec_driver_sql("INSERT INTO t (v) VALUES ('b')")
+            in_txn.set()
+            release.wait(5)
+
+    t = threading.Thread(target=slow_write)
+    t.start()
+    assert in_txn.wait(5)
+    try:
+        with reader.connect() as c:  # does not wait for the writer
+            assert c.exec_driver_sql("SELECT count(*) FROM t").scalar() == 1
+    finally:
+        release.set()
+        t.join()
+    with reader.connect() as c:
+        assert c.exec_driver_sql("SELECT count(*) FROM t").scalar() == 2
@@ -0,0 +1,91 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.utils.downloads import ResumeFileResponse, etag_matches, if_range_matches, parse_range
+from app.utils.files import sniff_mime
+
+BODY = bytes(range(256)) * 4  # 1024 bytes
+ETAG = '"abc123"'
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=1000-", (1000, 1023)),
+    ("bytes=-24", (1000, 1023)),
+    ("bytes=-5000", (0, 1023)),
+    ("bytes=1000-5000", (1000, 1023)),
+    ("bytes=1024-", (-1, -1)),
+    ("bytes=-0", (-1, -1)),
+    ("bytes=5-1", (-1, -1)),
+    ("bytes=0-1,5-9", None),  # multi-range: whole file
+    ("items=0-1", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, len(BODY)) == expected
+
+
+def test_etag_matches_weakly():
+    assert etag_matches(ETAG, ETAG)
+    assert etag_matches(f'W/{ETAG}', ETAG)
+    assert etag_matches(f'"x", {ETAG}', ETAG)
+    assert etag_matches("*", ETAG)
+    assert not etag_matches('"other"', ETAG)
+    assert not etag_matches(None, ETAG)
+
+
+def test_if_range_matches_strongly():
+    assert if_range_matches(ETAG, ETAG)
+    assert not if_range_matches(f"W/{ETAG}", ETAG)
+    assert not if_range_matches(f"W/{ETAG}", f"W/{ETAG}")
+    assert not if_range_matches("Wed, 21 Oct 2015 07:28:00 GMT", ETAG)
+
+
+@pytest.mark.parametrize("head, filename, expected", [
+    (b"BM text that starts like a bitmap", "notes.txt", "text/plain"),
+    (b"PK\x03\x04", "cv.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    (b"%PDF-1.7", "cv.pdf", "application/pdf"),
+    (b"BM\x36\x00", "scan.bmp", "image/bmp"),
+    (b"\x89PNG\r\n\x1a\n", "scan", "image/png"),
+])
+def test_sniff_mime(head, filename, expected):
+    assert sniff_mime(head, filename) == expected
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "r.pdf"
+    path.write_bytes(BODY)
+
+    def download(request):
+        return ResumeFileResponse(str(path), request.headers, size=len(BODY), etag=ETAG,
+                                  media_type="application/pdf", filename="r.pdf")
+
+    return TestClient(Starlette(routes=[Route("/f", download, methods=["GET", "HEAD"])]))
+
+
+def test_full_partial_and_conditional_responses(client):
+    r = client.get("/f")
+    assert r.status_code == 200 and r.content == BODY and r.headers["etag"] == ETAG
+    assert r.headers["content-disposition"].startswith("attachment;")
+
+    r = client.get("/f", headers={"Range": "bytes=10-19"})
+    assert r.status_code == 206 and r.content == BODY[10:20]
+    assert r.headers["content-range"] == "bytes 10-19/1024"
+
+    r = client.get("/f", headers={"If-None-Match": ETAG})
+    assert r.status_code == 304 and r.content == b""
+
+    r = client.get("/f", headers={"Range": "bytes=2000-"})
+    assert r.status_code == 416 and r.headers["content-range"] == "bytes */1024"
+
+    r = client.get("/f", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert r.status_code == 200 and r.content == BODY
+
+    r = client.get("/f", headers={"Range": "bytes=0-9", "If-Range": f"W/{ETAG}"})
+    assert r.status_code == 200 and r.content == BODY
+
+    r = client.get("/f", headers={"Range": "bytes=0-9", "If-Range": ETAG})
+    assert r.status_code == 206 and r.content == BODY[:10]
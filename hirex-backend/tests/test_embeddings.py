@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from conftest import FakeSentenceTransformer
+
+
+class RecordingModel(FakeSentenceTransformer):
+    def __init__(self, name, **kwargs):
+        self.batches = []
+        self.fail = False
+
+    def encode(self, texts, **kwargs):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model down")
+        return super().encode(texts)
+
+
+@pytest.fixture
+def embedder(sentence_transformers, monkeypatch):
+    from app.services import embeddings
+
+    monkeypatch.setattr(embeddings, "SentenceTransformer", RecordingModel)
+    return embeddings.Embedder("fake", max_batch=8, max_wait_ms=50, max_concurrency=1, torch_threads=1)
+
+
+def test_concurrent_calls_share_one_forward_pass(embedder):
+    prompts = [f"query {i}" for i in range(5)]
+
+    async def many():
+        return await asyncio.gather(*(embedder.aencode([p]) for p in prompts))
+
+    out = asyncio.run(many())
+    assert len(embedder.model.batches) == 1 and sorted(embedder.model.batches[0]) == prompts
+    for p, vec in zip(prompts, out):
+        assert np.allclose(vec, FakeSentenceTransformer("x").encode([p]))
+
+
+def test_full_batches_skip_the_queue_and_errors_reach_every_caller(embedder):
+    texts = [f"doc {i}" for i in range(8)]
+    assert embedder.encode(texts).shape == (8, 64)
+    assert embedder.model.batches == [texts]
+
+    embedder.model.fail = True
+    errors = []
+
+    def call(i):
+        try:
+            embedder.encode([f"q{i}"])
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == ["model down"] * 3
@@ -0,0 +1,51 @@
+import json
+
+from sqlmodel import Session
+
+from app.db import Candidate
+from app.services import reextract
+from app.services.extraction import EXTRACTOR_VERSION, build_candidate_record, derive_fields
+
+from conftest import add_candidates
+
+BLOB = "/data/resumes/ab/" + "ab" * 32 + ".pdf"  # content-addressed store path
+
+
+def test_name_falls_back_to_the_uploaded_filename_not_the_blob():
+    rec = build_candidate_record("", BLOB, "Jane Doe.pdf")
+    assert rec["name"].startswith("Jane Doe")
+    assert rec["resume_path"] == BLOB
+
+
+def test_reextraction_keeps_the_uploaded_filename_fallback():
+    [(cid, fields)] = derive_fields([(7, "", BLOB, "Jane Doe.pdf")])
+    assert cid == 7 and fields["name"].startswith("Jane Doe")
+    assert fields["extractor_version"] == EXTRACTOR_VERSION
+
+
+def _versions(eng):
+    with eng.connect() as c:
+        return dict(c.exec_driver_sql("SELECT id, extractor_version FROM candidate").all())
+
+
+def test_reextract_updates_only_stale_rows_in_batches(db):
+    add_candidates(5)
+    assert reextract.count_stale() == 5
+
+    batches = []
+    job = reextract.run(reextract.ReextractJob(batch_size=2, workers=1, all_rows=False),
+                        on_batch=lambda j: batches.append(j.last_id))
+    assert (job.state, job.processed, job.updated, job.failed) == ("done", 5, 5, 0)
+    assert batches == [2, 4, 5]
+    assert set(_versions(db).values()) == {EXTRACTOR_VERSION}
+    with Session(db) as s:
+        assert json.loads(s.get(Candidate, 3).skills) == ["python"]
+
+    # a row derived by an older extractor is the only one picked up next time
+    with db.begin() as c:
+        c.exec_driver_sql("UPDATE candidate SET extractor_version = 'old' WHERE id = 4")
+    assert reextract.count_stale() == 1
+    job = reextract.run(reextract.ReextractJob(batch_size=2, workers=1, all_rows=False))
+    assert (job.processed, job.updated) == (1, 1)
+    assert _versions(db)[4] == EXTRACTOR_VERSION
+    assert reextract.count_stale(all_rows=True) == 5
@@ -0,0 +1,81 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from conftest import DIM
+
+
+def _vecs(n, dim=DIM, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype("float32")
+
+
+def _count_saves(index, monkeypatch):
+    saves = []
+    real = index.save
+    monkeypatch.setattr(index, "save", lambda: (saves.append(1), real())[1])
+    return saves
+
+
+def test_concurrent_adds_commit_in_groups(index, writer, monkeypatch):
+    saves = _count_saves(index, monkeypatch)
+
+    async def burst():
+        await asyncio.gather(*(writer.aadd(_vecs(1, seed=i), [{"id": i, "name": f"c{i}"}]) for i in range(1, 101)))
+
+    asyncio.run(burst())
+    assert sorted(index.ids()) == list(range(1, 101))
+    assert len(saves) == writer.groups  # one save per group
+    assert writer.groups < 100          # and the burst was actually grouped
+    assert writer.ops == 100
+
+
+def test_failing_request_fails_only_itself(index, writer):
+    futs = [
+        writer._submit("add", (_vecs(1), [{"id": 1, "name": "ok"}])),
+        writer._submit("add", (_vecs(1, dim=DIM * 2), [{"id": 2, "name": "wrong dim"}])),
+        writer._submit("add", (_vecs(2), [{"id": 3, "name": "two vectors, one meta"}])),
+        writer._submit("add", (_vecs(1), [{"name": "no id"}])),
+        writer._submit("call", lambda idx: 1 / 0),
+        writer._submit("add", (_vecs(1), [{"id": 4, "name": "ok"}])),
+    ]
+    futs[0].result(timeout=5)
+    futs[5].result(timeout=5)
+    for f in futs[1:4]:
+        with pytest.raises(ValueError):
+            f.result(timeout=5)
+    with pytest.raises(ZeroDivisionError):
+        futs[4].result(timeout=5)
+    assert sorted(index.ids()) == [1, 4]
+
+
+def test_remove_runs_in_its_own_group(index, writer):
+    writer.add(_vecs(3), [{"id": i, "name": f"c{i}"} for i in (1, 2, 3)])
+    before = writer.groups
+    futs = [
+        writer._submit("add", (_vecs(1, seed=4), [{"id": 4, "name": "c4"}])),
+        writer._submit("remove", [2]),
+        writer._submit("add", (_vecs(1, seed=5), [{"id": 5, "name": "c5"}])),
+    ]
+    for f in futs:
+        f.result(timeout=5)
+    assert sorted(index.ids()) == [1, 3, 4, 5]
+    assert writer.groups - before == 3
+
+
+def test_save_failure_fails_the_group_and_is_retried(index, writer, monkeypatch):
+    real = index.save
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        real()
+
+    monkeypatch.setattr(index, "save", flaky)
+    with pytest.raises(OSError):
+        writer.add(_vecs(1), [{"id": 1, "name": "c1"}])
+    writer.flush()  # the next group's save writes the shard the failed one left dirty
+    reloaded = type(index).load(DIM)
+    assert reloaded.ids() == [1]
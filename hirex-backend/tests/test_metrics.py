@@ -0,0 +1,26 @@
+from app.services import metrics
+
+from conftest import upload
+
+
+def test_histogram_buckets_are_cumulative():
+    h = metrics.Histogram("test_latency_seconds", "Test.", ("stage",), buckets=(0.01, 0.1, 1.0))
+    for v in (0.005, 0.01, 0.05, 2.0):
+        h.observe(v, stage="x")
+    samples = {(s, labels.get("le")): v for s, labels, v in h.samples()}
+    assert [samples["_bucket", le] for le in ("0.01", "0.1", "1.0", "+Inf")] == [2, 3, 3, 4]
+    assert samples["_count", None] == 4 and samples["_sum", None] == 2.065
+
+
+def test_metrics_endpoint_labels_routes_by_template(api):
+    [cid] = upload(api, {"a.txt": "Alice\npython engineer\n"}).values()
+    api.get(f"/resumes/{cid}/download")
+    api.post("/recruiters/query", json={"prompt": "python"})
+
+    r = api.get("/metrics")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = r.text
+    assert 'hirex_http_requests_total{method="GET",route="/resumes/{cand_id}/download",status="200"}' in body
+    assert f"/resumes/{cid}/download" not in body
+    assert 'hirex_search_stage_duration_seconds_count{stage="embed"}' in body
+    assert "hirex_faiss_vectors 1" in body
@@ -0,0 +1,92 @@
+import threading
+import types
+
+import pytest
+from sqlalchemy import Column, MetaData, Table, inspect
+from sqlmodel import Session
+
+from app import migrations
+from app.db import Candidate, ResumeText, _make_engines
+from app.services import textstore
+
+
+def test_upgrade_is_recorded_and_runs_once(db):
+    with db.begin() as conn:
+        applied = migrations.applied_versions(conn)
+    assert sorted(applied) == [m.version for m in migrations.MIGRATIONS]
+    assert migrations.upgrade(db) == []
+
+
+def test_column_migrations_add_their_own_columns(tmp_path):
+    added = {"file_sha256", "file_size", "mime_type", "file_name", "extractor_version"}
+    eng, _ = _make_engines(f"sqlite:///{tmp_path / 'old.db'}")
+    old = Table("candidate", MetaData(), *(
+        Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+        for c in Candidate.__table__.columns if c.name not in added
+    ))
+    old.create(eng)
+    ResumeText.__table__.create(eng)
+
+    assert migrations.upgrade(eng) == [m.version for m in migrations.MIGRATIONS]
+    with eng.connect() as c:
+        cols = {col["name"] for col in inspect(c).get_columns("candidate")}
+        indexes = {ix["name"] for ix in inspect(c).get_indexes("candidate")}
+    assert cols == {c.name for c in Candidate.__table__.columns}
+    assert {"ix_candidate_file_sha256", "ix_candidate_extractor_version"} <= indexes
+
+
+def _legacy_db(path, rows=3000):
+    """A candidate table from before resume text moved out of row."""
+    eng, _ = _make_engines(f"sqlite:///{path}")
+    with eng.begin() as c:
+        c.exec_driver_sql(
+            "CREATE TABLE candidate (id INTEGER NOT NULL, name VARCHAR NOT NULL, "
+            "parsed_text VARCHAR NOT NULL, resume_path VARCHAR NOT NULL, PRIMARY KEY (id))"
+        )
+        c.exec_driver_sql("CREATE INDEX ix_candidate_resume_path ON candidate (resume_path)")
+        c.exec_driver_sql(
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+            "INSERT INTO candidate SELECT i, 'c' || i, 'text ' || i, 'p' || i FROM n",
+            (rows,),
+        )
+    ResumeText.__table__.create(eng)
+    return eng
+
+
+def _assert_moved(eng, rows=3000):
+    with eng.connect() as c:
+        assert [col["name"] for col in inspect(c).get_columns("candidate")] == ["id", "name", "resume_path"]
+        assert [ix["name"] for ix in inspect(c).get_indexes("candidate")] == ["ix_candidate_resume_path"]
+        assert c.exec_driver_sql("SELECT count(*) FROM candidate").scalar() == rows
+    with Session(eng) as s:
+        assert textstore.load_texts(s, [1, rows]) == {1: "text 1", rows: f"text {rows}"}
+
+
+@pytest.mark.parametrize("sqlite_version", [(3, 40, 1), (3, 31, 1)], ids=["drop-column", "table-rebuild"])
+def test_inline_text_migration(tmp_path, monkeypatch, sqlite_version):
+    monkeypatch.setattr(textstore, "sqlite3", types.SimpleNamespace(sqlite_version_info=sqlite_version))
+    eng = _legacy_db(tmp_path / "legacy.db")
+    assert textstore.migrate_inline_text(eng) == 3000
+    _assert_moved(eng)
+    assert textstore.migrate_inline_text(eng) == 0
+
+
+def test_inline_text_migration_from_concurrent_workers(tmp_path):
+    path = tmp_path / "legacy.db"
+    _legacy_db(path)
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(textstore.migrate_inline_text(_make_engines(f"sqlite:///{path}")[0]))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert sorted(results)[-1] == 3000
+    _assert_moved(_make_engines(f"sqlite:///{path}")[0])
@@ -0,0 +1,34 @@
+from app.services.pagination import CursorStore, PageState, make_cursor, parse_cursor
+
+
+def _state(page_size=2):
+    head = [(1, 0.9, {}), (2, 0.8, {})]
+    tail = [(3, 0.5, 0.1), (4, 0.7, 0.2), (5, 0.6, 0.3)]  # unordered until first read
+    return PageState(head, tail, {"prompt": "p"}, page_size)
+
+
+def test_window_walks_head_then_sorted_tail():
+    state = _state()
+    assert state.total == 5
+    assert state.window(0, 2) == ([(1, 0.9, {}), (2, 0.8, {})], [])
+    head, tail = state.window(1, 3)
+    assert [e[0] for e in head] == [2] and [e[0] for e in tail] == [4, 5]
+    assert state.window(4, 10) == ([], [(3, 0.5, 0.1)])
+    assert state.window(5, 2) == ([], [])
+
+
+def test_cursor_round_trip_and_garbage():
+    assert parse_cursor(make_cursor("abc.def", 40)) == ("abc.def", 40)
+    for bad in ("", "abc", "abc.", ".4", "abc.-1", None):
+        assert parse_cursor(bad) is None
+
+
+def test_store_expires_and_evicts():
+    store = CursorStore(ttl_seconds=60, maxsize=2)
+    a, b = store.put(_state()), store.put(_state())
+    assert store.get(a) is not None  # a is now most recent
+    c = store.put(_state())
+    assert store.get(b) is None and store.get(a) is not None and store.get(c) is not None
+
+    expired = CursorStore(ttl_seconds=-1)
+    assert expired.get(expired.put(_state())) is None
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from app.config import settings
+from app.services.prompt_parser import plan_query
+from app.services.stats import CorpusStats
+
+from conftest import upload
+
+
+def _row(years, cgpa, skills):
+    return {"years_experience": years, "cgpa": cgpa, "skills": json.dumps(skills)}
+
+
+def test_selectivity_estimates_from_column_stats():
+    stats = CorpusStats()
+    stats.add_many([_row(1, 7.0, ["python"]), _row(3, 8.0, ["python", "go"]),
+                    _row(5, 9.0, ["go"]), _row(8, 9.5, ["java"])])
+    assert stats.selectivity(plan_query("candidates with cgpa 9")) == pytest.approx(0.5)
+    assert stats.selectivity(plan_query("go developer with cgpa 9")) == pytest.approx(0.25)
+    assert CorpusStats().selectivity(plan_query("cgpa 9")) == 0.0
+
+
+def _plan(api, prompt):
+    r = api.post("/recruiters/query", json={"prompt": prompt, "top_k": 5, "explain": True})
+    assert r.status_code == 200
+    return r.json()["explain"]["plan"], [i["id"] for i in r.json()["items"]]
+
+
+def test_planner_goes_filter_first_only_for_selective_sql_filters(api, monkeypatch):
+    from app import main
+
+    ids = upload(api)
+    plan, found = _plan(api, "candidates with cgpa 9")
+    assert plan == "filter-first"
+    assert sorted(found) == sorted([ids["alice.txt"], ids["carol.txt"]])
+
+    assert _plan(api, "team player")[0] == "vector-first"  # no SQL-resolvable filter
+
+    main._search_cache.clear()
+    monkeypatch.setattr(settings, "PLANNER_FILTER_FIRST_MAX", 1)  # estimate of 2 is over the cap
+    plan, found = _plan(api, "candidates with cgpa 9")
+    assert plan == "vector-first"
+    assert sorted(found) == sorted([ids["alice.txt"], ids["carol.txt"]])
+
+
+def test_filter_first_falls_back_when_the_estimate_was_low(api, monkeypatch):
+    from app import main
+
+    upload(api)
+    monkeypatch.setattr(main, "_stats", CorpusStats())  # estimates 0 matches
+    monkeypatch.setattr(settings, "PLANNER_FILTER_FIRST_MAX", 1)
+    plan, found = _plan(api, "candidates with cgpa 8")
+    assert plan == "vector-first (filter-first over cap)"
+    assert len(found) == 3
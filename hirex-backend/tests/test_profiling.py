@@ -0,0 +1,36 @@
+import threading
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.config import settings
+from app.services import profiling
+
+
+def test_profiles_are_written_and_pruned_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_KEEP", 2)
+    loop_threads, save_threads = set(), []
+    real_save = profiling._save
+
+    def spy(prof, name):
+        save_threads.append(threading.get_ident())
+        real_save(prof, name)
+
+    monkeypatch.setattr(profiling, "_save", spy)
+
+    async def hello(request):
+        loop_threads.add(threading.get_ident())
+        return PlainTextResponse("hi")
+
+    app = profiling.ProfilingMiddleware(Starlette(routes=[Route("/hello", hello)]))
+    with TestClient(app) as client:
+        for i in range(3):
+            r = client.get("/hello", headers={settings.PROFILE_HEADER: "1", "x-request-id": f"req{i}"})
+            assert r.headers["x-request-id"] == f"req{i}"
+        assert client.get("/hello").status_code == 200  # no header, no sampling: not profiled
+
+    assert len(save_threads) == 3 and not loop_threads & set(save_threads)
+    assert [p["name"].split("_")[1] for p in profiling.list_profiles()] == ["req2", "req1"]
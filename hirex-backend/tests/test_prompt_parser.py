@@ -0,0 +1,21 @@
+import pytest
+
+from app.services.prompt_parser import _plan, parse_prompt, plan_query
+
+
+def test_plan_is_memoized_per_normalized_prompt():
+    _plan.cache_clear()
+    first = plan_query("Python developers with 3 years experience")
+    again = plan_query("  python   DEVELOPERS with 3 years experience ")
+    assert again is first
+    assert _plan.cache_info().hits == 1 and _plan.cache_info().misses == 1
+    with pytest.raises(AttributeError):
+        first.min_experience = 5  # shared between requests: must stay immutable
+
+
+def test_plan_carries_filters_and_query_skills():
+    plan = plan_query("python developers from iit with cgpa 8.5 and 3 years experience")
+    assert plan.query_skills == ("python",)
+    assert plan.min_experience == 3 and plan.min_cgpa == 8.5
+    assert "IIT" in plan.education_any_of
+    assert parse_prompt(plan.prompt) == plan.filters()
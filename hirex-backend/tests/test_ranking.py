@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from app.services.ranking import compute_score, fast_score
+from app.services.ranking_profiles import DEFAULT_PROFILE, PROFILES
+
+from conftest import upload
+
+
+@pytest.mark.parametrize("row", [
+    {"years_experience": 4, "cgpa": 8.4, "institutions": ["NIT", "IIT"], "extracurricular_score": 2},
+    {"years_experience": 14, "cgpa": None, "institutions": [], "extracurricular_score": 9},
+    {"years_experience": None, "cgpa": 7.0, "institutions": ["BITS"], "extracurricular_score": 0},
+])
+def test_fast_score_matches_compute_score(row):
+    weights = PROFILES[DEFAULT_PROFILE]
+    full, _ = compute_score(row, weights, 0.42)
+    lean = fast_score(row["years_experience"], row["cgpa"], json.dumps(row["institutions"]),
+                      row["extracurricular_score"], weights, 0.42)
+    assert lean == pytest.approx(full)
+
+
+def test_paging_returns_the_same_ranking_as_one_big_page(api):
+    upload(api, {f"r{i}.txt": f"Candidate {i}\npython engineer {i % 7} years CGPA {5 + i % 5}\n" for i in range(12)})
+    query = {"prompt": "python engineer", "top_k": 12}
+    whole = [i["id"] for i in api.post("/recruiters/query", json=query).json()["items"]]
+    assert len(whole) == 12
+
+    r = api.post("/recruiters/query", json={**query, "top_k": 5}).json()
+    paged = [i["id"] for i in r["items"]]
+    while r["next_cursor"]:
+        r = api.post("/recruiters/query/next", json={"cursor": r["next_cursor"]}).json()
+        paged += [i["id"] for i in r["items"]]
+    assert paged == whole
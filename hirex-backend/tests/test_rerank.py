@@ -0,0 +1,55 @@
+import re
+import time
+
+import pytest
+
+from app.services import rerank
+
+
+class SlowCrossEncoder:
+    """Scores a pair by the number in its text; each pair costs PAIR_S."""
+
+    PAIR_S = 0.005
+
+    def __init__(self, name, **kwargs):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32, **kwargs):
+        self.calls.append(len(pairs))
+        time.sleep(self.PAIR_S * len(pairs))
+        return [float((re.findall(r"\d+", text) or [0])[-1]) for _, text in pairs]
+
+
+@pytest.fixture
+def reranker(monkeypatch):
+    monkeypatch.setattr(rerank, "CrossEncoder", SlowCrossEncoder)
+    return rerank.CrossEncoderReranker("fake", batch_size=4)
+
+
+def _head(n):
+    return [(cid, 1.0 - cid / 100, {"blend": 0}) for cid in range(n)]
+
+
+def test_rerank_reorders_the_head_by_cross_encoder_score(reranker):
+    texts = {cid: f"resume score {cid}" for cid in range(6)}
+    out = reranker.rerank("prompt", _head(6), texts, budget_ms=1000)
+    assert [cid for cid, _, _ in out] == [5, 4, 3, 2, 1, 0]
+    assert out[0][2]["rerank"] == 5.0
+
+
+def test_rerank_stops_at_the_budget_and_keeps_the_rest_in_order(reranker):
+    texts = {cid: f"resume score {cid}" for cid in range(40)}
+    t0 = time.perf_counter()
+    out = reranker.rerank("prompt", _head(40), texts, budget_ms=50)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    done = [cid for cid, _, parts in out if "rerank" in parts]
+    assert 0 < len(done) < 40
+    assert elapsed_ms < 50 + 2 * SlowCrossEncoder.PAIR_S * 1000 * 4  # a batch over, plus slack
+    assert done == sorted(done, reverse=True)
+    assert [cid for cid, _, _ in out[len(done):]] == list(range(len(done), 40))
+
+
+def test_rerank_with_no_budget_left_returns_the_head_untouched(reranker):
+    head = _head(5)
+    assert reranker.rerank("prompt", head, {}, budget_ms=0) == head
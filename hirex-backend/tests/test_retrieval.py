@@ -0,0 +1,34 @@
+import pytest
+
+from app.services.lexical import BM25Index
+from app.services.retrieval import _fuse, hybrid_retrieve, rrf_fuse
+
+from conftest import fake_encode
+
+
+def test_rrf_fuse_rewards_agreement():
+    assert rrf_fuse([[1, 2], [2, 3]]) == [2, 1, 3]
+
+
+def test_keyword_match_outranks_weaker_dense_hits():
+    dense = [(1, 0.9), (2, 0.5), (3, 0.4), (4, 0.3)]
+    ids, sem = _fuse(dense, [(4, 12.0)], top_k=4)
+    assert ids == [4, 1, 2, 3]
+    assert sem[4] == pytest.approx(0.9)  # the top fused hit carries the best cosine
+    assert [sem[d] for d in ids] == sorted(sem.values(), reverse=True)
+
+
+def test_single_retriever_keeps_its_own_scores():
+    ids, sem = _fuse([], [(5, 8.0), (6, 2.0)], top_k=5)
+    assert ids == [5, 6] and sem == {5: 1.0, 6: 0.25}
+
+    # a superseded vector still in its shard counts once, with its best cosine
+    ids, sem = _fuse([(1, 0.8), (2, 0.6), (1, 0.5)], [], top_k=5)
+    assert ids == [1, 2] and sem == {1: 0.8, 2: 0.6}
+
+
+def test_hybrid_retrieve_with_an_empty_vector_index(index):
+    lexical = BM25Index()
+    lexical.add_many([(1, "python django engineer"), (2, "java spring engineer")])
+    ids, sem = hybrid_retrieve(index, lexical, fake_encode(["django"]), "django", top_k=5)
+    assert ids == [1] and sem == {1: 1.0}
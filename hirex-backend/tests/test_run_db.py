@@ -0,0 +1,37 @@
+import threading
+import time
+
+import anyio
+
+from app.db import run_db, run_db_write
+
+
+def test_writes_run_one_at_a_time_and_reads_do_not_queue_behind_them():
+    lock = threading.Lock()
+    active, peak, order = [0], [0], []
+
+    def write(i):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        order.append(f"w{i}")
+
+    def read():
+        order.append("r")
+        return threading.get_ident()
+
+    async def main():
+        async with anyio.create_task_group() as tg:
+            for i in range(3):
+                tg.start_soon(run_db_write, write, i)
+            await anyio.sleep(0.01)
+            reader = await run_db(read)
+        return reader
+
+    reader = anyio.run(main)
+    assert peak[0] == 1
+    assert order[0] == "r"  # answered while the first write still held the writer slot
+    assert reader != threading.get_ident()
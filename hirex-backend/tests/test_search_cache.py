@@ -0,0 +1,31 @@
+from conftest import RESUMES, upload
+
+QUERY = {"prompt": "python engineer", "top_k": 5}
+
+
+def test_repeat_search_is_cached_until_an_upload(api):
+    from app import main
+
+    upload(api, {"alice.txt": RESUMES["alice.txt"], "bob.txt": RESUMES["bob.txt"]})
+    first = api.post("/recruiters/query", json=QUERY).json()
+    hits = main._search_cache.hits
+    assert api.post("/recruiters/query", json=QUERY).json() == first
+    assert main._search_cache.hits == hits + 1
+
+    # a new resume bumps the corpus generation: the next search is recomputed and sees it
+    [carol] = upload(api, {"carol.txt": RESUMES["carol.txt"]}).values()
+    fresh = api.post("/recruiters/query", json=QUERY).json()
+    assert main._search_cache.hits == hits + 1
+    assert carol in [item["id"] for item in fresh["items"]]
+    assert carol not in [item["id"] for item in first["items"]]
+
+
+def test_cache_key_normalizes_the_prompt(api):
+    from app import main
+
+    upload(api)
+    api.post("/recruiters/query", json=QUERY)
+    hits = main._search_cache.hits
+    r = api.post("/recruiters/query", json={**QUERY, "prompt": "  Python   ENGINEER "})
+    assert main._search_cache.hits == hits + 1
+    assert r.json()["query"] == "  Python   ENGINEER "
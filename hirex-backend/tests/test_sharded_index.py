@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services.indexer import ShardedFaissIndex
+
+from conftest import DIM, fake_encode
+
+
+def _fill(index, n):
+    ids = list(range(1, n + 1))
+    vecs = fake_encode([f"doc {i}" for i in ids])
+    index.add(vecs, [{"id": i} for i in ids])
+    return ids, vecs
+
+
+@pytest.mark.usefixtures("index")  # empty shard dir
+def test_sharded_search_matches_brute_force(monkeypatch):
+    monkeypatch.setattr(settings, "FAISS_SHARD_SIZE", 7)
+    index = ShardedFaissIndex(DIM)
+    ids, vecs = _fill(index, 40)
+    assert len(index.shards) == 6 and index.ntotal == 40
+
+    queries = fake_encode(["query a", "query b"])
+    D, metas = index.search(queries, top_k=5)
+    sims = queries @ vecs.T
+    for qi in range(2):
+        best = np.argsort(-sims[qi])[:5]
+        assert [m["id"] for m in metas[qi]] == [ids[i] for i in best]
+        assert np.allclose(D[qi], sims[qi][best], atol=1e-5)
+
+
+@pytest.mark.usefixtures("index")
+def test_only_touched_shards_are_saved_and_load_back(monkeypatch):
+    monkeypatch.setattr(settings, "FAISS_SHARD_SIZE", 10)
+    index = ShardedFaissIndex(DIM)
+    _fill(index, 25)
+    index.save()
+    first = {p.name: p.stat().st_mtime_ns for p in index.shard_dir.glob("*.bin")}
+    assert len(first) == 3
+
+    index.add(fake_encode(["late"]), [{"id": 26}])
+    index.save()
+    after = {p.name: p.stat().st_mtime_ns for p in index.shard_dir.glob("*.bin")}
+    assert [n for n in after if after[n] != first[n]] == ["shard_00002.bin"]
+
+    loaded = ShardedFaissIndex.load(DIM)
+    assert sorted(loaded.ids()) == list(range(1, 27))
+    found, vecs = loaded.vectors_for([3, 26])
+    assert found == [3, 26] and np.allclose(vecs, fake_encode(["doc 3", "late"]))
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.db import Candidate, engine
+from app.services import snapshot
+from app.services.indexer import ShardedFaissIndex, load_saved
+from app.services.textstore import load_texts
+
+from conftest import DIM, add_candidates, fake_encode
+
+
+def _state():
+    with Session(engine) as s:
+        rows = [(c.id, c.name, c.skills) for c in s.exec(select(Candidate).order_by(Candidate.id)).all()]
+        texts = load_texts(s, [r[0] for r in rows])
+    return rows, texts
+
+
+def test_export_import_round_trip(db, index, writer, tmp_path):
+    texts = add_candidates(5)
+    ids = sorted(texts)
+    vecs = fake_encode([texts[i] for i in ids])
+    writer.add(vecs, [{"id": i, "name": f"cand{i}"} for i in ids])
+    before = _state()
+
+    manifest = snapshot.export_snapshot(str(tmp_path / "snap"))
+    assert manifest["counts"]["candidates"] == 5
+    snapshot.verify_snapshot(str(tmp_path / "snap"))
+
+    # lose everything, then restore it
+    add_candidates(2, start=100)
+    counts = snapshot.import_snapshot(str(tmp_path / "snap"), replace=True)
+    assert counts["candidates"] == 5 and counts["vectors"] == 5
+    assert _state() == before
+    restored = load_saved()
+    found, got = restored.vectors_for(ids)
+    assert found == ids
+    np.testing.assert_allclose(got, vecs, rtol=1e-6)
+
+
+def test_import_of_an_empty_snapshot_clears_the_index(db, index, writer, tmp_path):
+    snapshot.export_snapshot(str(tmp_path / "empty"))
+    texts = add_candidates(3)
+    writer.add(fake_encode(list(texts.values())), [{"id": i, "name": f"cand{i}"} for i in texts])
+    assert os.listdir(settings.FAISS_SHARD_DIR)
+
+    counts = snapshot.import_snapshot(str(tmp_path / "empty"), replace=True)
+    assert counts["candidates"] == 0 and counts["vectors"] == 0
+    assert ShardedFaissIndex.load(DIM).ntotal == 0
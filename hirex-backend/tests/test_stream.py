@@ -0,0 +1,34 @@
+import json
+
+from conftest import upload
+
+QUERY = {"prompt": "python engineer", "top_k": 2}
+
+
+def _ndjson(r):
+    return [json.loads(line) for line in r.text.splitlines() if line]
+
+
+def test_stream_matches_the_plain_endpoint(api):
+    upload(api)
+    plain = api.post("/recruiters/query", json=QUERY).json()
+
+    for attempt in ("cold", "cached"):
+        r = api.post("/recruiters/query/stream", json={**QUERY, "explain": True})
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        events = _ndjson(r)
+        assert [e["event"] for e in events] == ["filters"] + ["item"] * len(plain["items"]) + ["done"]
+        assert events[0]["filters"] == plain["filters"]
+        assert [e["item"] for e in events[1:-1]] == plain["items"]
+        assert [e["rank"] for e in events[1:-1]] == list(range(1, len(plain["items"]) + 1))
+        assert events[-1]["total_matched"] == plain["total_matched"]
+        assert events[-1]["explain"]["cache_hit"] is (attempt == "cached")
+
+
+def test_stream_speaks_sse_when_asked(api):
+    upload(api)
+    r = api.post("/recruiters/query/stream", json=QUERY, headers={"Accept": "text/event-stream"})
+    assert r.headers["content-type"].startswith("text/event-stream")
+    blocks = [b for b in r.text.split("\n\n") if b]
+    assert blocks[0].startswith("event: filters\ndata: {")
+    assert blocks[-1].startswith("event: done\n")
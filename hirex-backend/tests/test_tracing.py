@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+from app.services.tracing import QueryTrace
+
+
+def _spin(seconds):
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+def test_awaiting_stages_do_not_count_other_coroutines_cpu():
+    trace = QueryTrace("test")
+
+    async def busy_neighbour():
+        _spin(0.05)  # another request's CPU, on the same loop thread
+
+    async def handler():
+        with trace.stage("parse"):
+            _spin(0.01)
+        with trace.stage("embed", cpu=False):
+            await asyncio.gather(asyncio.sleep(0), busy_neighbour())
+
+    asyncio.run(handler())
+    parse, embed = trace.stages
+    assert parse["cpu_ms"] >= 10
+    assert "cpu_ms" not in embed and embed["wall_ms"] >= 50
+    assert trace.summary()["total_cpu_ms"] == parse["cpu_ms"]
+
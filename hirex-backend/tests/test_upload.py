@@ -0,0 +1,62 @@
+import asyncio
+import io
+import zipfile
+
+from sqlmodel import Session
+
+from app.db import Candidate, engine
+
+from conftest import RESUMES, upload
+
+
+def _zip(files):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, text in files.items():
+            zf.writestr(name, text)
+    return buf.getvalue()
+
+
+def test_zip_upload_keeps_ids_and_records_paired(api, monkeypatch):
+    from app import main
+
+    real = main._insert_candidates
+
+    def first_row_lost(records):
+        return [None] + real(records)[1:]
+
+    monkeypatch.setattr(main, "_insert_candidates", first_row_lost)
+    r = api.post("/recruiters/resumes/upload-zip",
+                 files={"zipfile_upload": ("batch.zip", _zip({**RESUMES, "notes.md": "skipped"}), "application/zip")})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["accepted"] == 3 and len(body["inserted_ids"]) == 2
+
+    with Session(engine) as s:
+        names = {cid: s.get(Candidate, cid).name for cid in body["inserted_ids"]}
+    vectors = {m["id"]: m["name"] for shard in main._index.shards.values() for m in shard.meta}
+    assert vectors == names
+    assert set(main._lexical.doc_len) == set(names)
+    assert main._stats.total == 2
+
+
+def test_search_state_is_updated_off_the_event_loop_once_per_upload(api, monkeypatch):
+    from app import main
+
+    calls = []
+    real = main._add_to_search_state
+
+    def spy(added):
+        try:
+            asyncio.get_running_loop()
+            on_loop = True
+        except RuntimeError:
+            on_loop = False
+        calls.append((len(added), on_loop))
+        real(added)
+
+    monkeypatch.setattr(main, "_add_to_search_state", spy)
+    upload(api, {"alice.txt": RESUMES["alice.txt"]})
+    api.post("/recruiters/resumes/upload-zip", files={"zipfile_upload": ("b.zip", _zip(RESUMES), "application/zip")})
+    assert calls == [(1, False), (3, False)]
+    assert len(main._lexical) == 4 and main._stats.total == 4